@@ -1,4 +1,4 @@
-""
+"""
 Git2WP Command Line Interface
 """
 import os
@@ -17,6 +17,8 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from git2wp import catfile, gitlog, wordpress
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -70,11 +72,19 @@ class Config:
             'wordpress_token': os.getenv('WORDPRESS_TOKEN', ''),
             'git_path': os.getenv('GIT_PATH', str(Path.home() / 'github')),
             'api_url': os.getenv('API_URL', 'http://localhost:3001'),
+            'git_backend': os.getenv('GIT_BACKEND', 'subprocess').lower(),
+            'wordpress_timeout': int(os.getenv('WORDPRESS_TIMEOUT', '30000')) / 1000,
+            'wordpress_retries': int(os.getenv('WORDPRESS_RETRIES', '3')),
+            'wordpress_rate': float(os.getenv('WORDPRESS_RATE', '0')),
+            'wordpress_max_concurrency': int(os.getenv('WORDPRESS_MAX_CONCURRENCY', '8')),
         })
 
 class GitUtils:
     """Git repository utilities"""
     
+    def __init__(self, backend: str = 'subprocess'):
+        self.backend = backend
+    
     @staticmethod
     def is_git_repo(path: str) -> bool:
         """Check if a path is a Git repository"""
@@ -89,38 +99,13 @@ class GitUtils:
         except subprocess.CalledProcessError:
             return False
     
-    @staticmethod
-    def get_commit_info(repo_path: str, commit_hash: str = 'HEAD') -> Dict[str, Any]:
+    def get_commit_info(self, repo_path: str, commit_hash: str = 'HEAD') -> Dict[str, Any]:
         """Get information about a specific commit"""
         try:
-            # Get commit details
-            result = subprocess.run(
-                ['git', '-C', repo_path, 'show', '--no-patch', 
-                 '--format={"hash":"%H","short_hash":"%h","author":"%an","email":"%ae","date":"%ad","subject":"%s","body":"%b"}',
-                 commit_hash],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            commit_info = json.loads(result.stdout.decode())
-            
-            # Get changed files
-            result = subprocess.run(
-                ['git', '-C', repo_path, 'diff', '--name-status', f'{commit_hash}^..{commit_hash}'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            changed_files = [line.split('\t') for line in result.stdout.decode().splitlines()]
-            
-            commit_info['changed_files'] = [
-                {'status': status, 'path': path} 
-                for status, path in changed_files if path
-            ]
-            
-            return commit_info
-            
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+            if self.backend == 'catfile':
+                return catfile.get_reader(repo_path).commit_info(commit_hash)
+            return gitlog.get_commit(repo_path, commit_hash)
+        except (gitlog.GitError, OSError) as e:
             logger.error(f"Error getting commit info: {e}")
             return {}
 
@@ -129,28 +114,28 @@ class WordPressPublisher:
     
     def __init__(self, config: Config):
         self.config = config
-        self.session = requests.Session()
+        token = config.config.get('wordpress_token', '')
         
-        # Set up authentication
-        if config.config.get('wordpress_token'):
-            self.session.headers.update({
-                'Authorization': f'Bearer {config.config["wordpress_token"]}'
-            })
-        elif config.config.get('wordpress_username') and config.config.get('wordpress_password'):
-            self.session.auth = (
-                config.config['wordpress_username'], 
-                config.config['wordpress_password']
-            )
+        # A bearer token takes precedence over username/password
+        self.client = wordpress.get_client(
+            config.config.get('wordpress_url', ''),
+            '' if token else config.config.get('wordpress_username', ''),
+            '' if token else config.config.get('wordpress_password', ''),
+            token,
+            timeout=config.config.get('wordpress_timeout', wordpress.DEFAULT_TIMEOUT),
+            retries=config.config.get('wordpress_retries', wordpress.DEFAULT_RETRIES),
+            rate=config.config.get('wordpress_rate', 0.0),
+            max_concurrency=config.config.get(
+                'wordpress_max_concurrency', wordpress.DEFAULT_MAX_CONCURRENCY
+            ),
+        )
     
     def test_connection(self) -> bool:
         """Test connection to WordPress"""
         try:
-            response = self.session.get(
-                f"{self.config.config['wordpress_url']}/wp-json",
-                timeout=10
-            )
+            response = self.client.get('')
             return response.status_code == 200
-        except requests.RequestException as e:
+        except (wordpress.WordPressError, requests.RequestException) as e:
             logger.error(f"Error connecting to WordPress: {e}")
             return False
     
@@ -164,11 +149,7 @@ class WordPressPublisher:
                 **kwargs
             }
             
-            response = self.session.post(
-                f"{self.config.config['wordpress_url']}/wp-json/wp/v2/posts",
-                json=data,
-                timeout=30
-            )
+            response = self.client.create_post(data)
             
             if response.status_code == 201:
                 return response.json()
@@ -176,7 +157,7 @@ class WordPressPublisher:
                 logger.error(f"Failed to create post: {response.text}")
                 return {}
                 
-        except requests.RequestException as e:
+        except (wordpress.WordPressError, requests.RequestException) as e:
             logger.error(f"Error creating WordPress post: {e}")
             return {}
 
@@ -252,7 +233,7 @@ def cli(ctx, verbose):
     ctx.obj = {}
     ctx.obj['config'] = Config()
     ctx.obj['config'].load_env()
-    ctx.obj['git'] = GitUtils()
+    ctx.obj['git'] = GitUtils(ctx.obj['config'].config['git_backend'])
     ctx.obj['wp'] = WordPressPublisher(ctx.obj['config'])
 
 @cli.command()
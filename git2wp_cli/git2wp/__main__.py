@@ -2,27 +2,24 @@
 """
 Git2WP - A command-line tool for publishing Git repository changes to WordPress.
 """
-import base64
+import itertools
 import json
 import os
 import re
 import subprocess
 import sys
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
 import click
-import requests
-from dotenv import load_dotenv
 
-# Import the git2text module
-from . import git2text
+# Commands import the heavier modules (requests, asyncio, sqlite, the LLM
+# client) when they need them, so --help, scan and hooks start quickly.
+from . import config, gitlog, metrics, scanner, tracing
 
-# Load environment variables
-load_dotenv(Path.home() / ".config" / "git2wp" / ".env")
+if TYPE_CHECKING:
+    from . import commitindex, jobqueue, ledger, taxonomy, wordpress
 
-import click
 
 # Colors for console output
 class Colors:
@@ -32,36 +29,20 @@ class Colors:
     BLUE = "\033[94m"
     END = "\033[0m"
 
-# Load environment variables from .env file in the current directory or home config
-env_path = Path.home() / ".config" / "git2wp" / ".env"
-if env_path.exists():
-    print(f"{Colors.YELLOW}Loading environment from: {env_path}{Colors.END}")
-    load_dotenv(env_path, override=True)
-    
-    # Debug: Print loaded environment variables
-    print(f"{Colors.YELLOW}=== Loaded Environment Variables ==={Colors.END}")
-    for key in ["WORDPRESS_URL", "WORDPRESS_USERNAME", "WORDPRESS_PASSWORD", 
-               "WORDPRESS_AUTH_METHOD", "GIT_PATH"]:
-        value = os.getenv(key, "[Not Set]")
-        masked_value = value if key != "WORDPRESS_PASSWORD" else "*" * len(value) if value else "[Not Set]"
-        print(f"{key}: {masked_value}")
-    print(f"{Colors.YELLOW}=================================={Colors.END}")
-
-# Configuration
-CONFIG = {
-    "wordpress_url": os.getenv("WORDPRESS_URL", "").rstrip("/"),
-    "wordpress_username": os.getenv("WORDPRESS_USERNAME", ""),
-    "wordpress_password": os.getenv("WORDPRESS_PASSWORD", ""),
-    "wordpress_token": os.getenv("WORDPRESS_TOKEN", ""),
-    "wordpress_application_password": os.getenv("WORDPRESS_APPLICATION_PASSWORD", ""),
-    "auth_method": os.getenv("WORDPRESS_AUTH_METHOD", "basic").lower(),
-    "git_path": os.getenv("GIT_PATH", str(Path.home() / "github")),
-    "wordpress_debug": os.getenv("WORDPRESS_DEBUG", "false").lower() == "true",
-}
+
+# Configuration, parsed and validated once from ~/.config/git2wp/.env and the environment
+try:
+    CONFIG = config.get_config()
+except config.ConfigError as e:
+    print(f"{Colors.RED}Configuration error: {e}{Colors.END}", file=sys.stderr)
+    sys.exit(2)
 
 
 def is_git_repo(path: str) -> bool:
     """Check if a path is a Git repository."""
+    if scanner.find_git_dir(path):
+        return True
+    # Fall back to git for subdirectories of a working tree and bare repos
     try:
         result = subprocess.run(
             ["git", "-C", path, "rev-parse", "--is-inside-work-tree"],
@@ -74,149 +55,134 @@ def is_git_repo(path: str) -> bool:
         return False
 
 
+@tracing.traced("git.commit_info")
+def read_commit_info(repo_path: str, commit_hash: str = "HEAD") -> Dict[str, Any]:
+    """Get information about a specific commit.
+
+    Raises:
+        GitError: If the commit cannot be read
+        OSError: If git cannot be run
+    """
+    if CONFIG["git_backend"] == "catfile":
+        from . import catfile
+
+        commit_info = catfile.get_reader(repo_path).commit_info(commit_hash)
+    else:
+        commit_info = gitlog.get_commit(repo_path, commit_hash)
+    # Like index rows, so summaries can read the commit's diff
+    commit_info["repo_path"] = repo_path
+    return commit_info
+
+
 def get_commit_info(repo_path: str, commit_hash: str = "HEAD") -> Dict[str, Any]:
-    """Get information about a specific commit."""
+    """Like :func:`read_commit_info`, but exit with an error message on failure."""
     try:
-        # Get commit details
-        result = subprocess.run(
-            [
-                "git",
-                "-C",
-                repo_path,
-                "show",
-                "--no-patch",
-                '--format={"hash":"%H","short_hash":"%h","author":"%an","email":"%ae","date":"%ad","subject":"%s","body":"%b"}',
-                commit_hash,
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=True,
-        )
-        commit_info = json.loads(result.stdout.decode())
-
-        # Get changed files
-        result = subprocess.run(
-            [
-                "git",
-                "-C",
-                repo_path,
-                "diff",
-                "--name-status",
-                f"{commit_hash}^..{commit_hash}",
-                "--"  # Explicitly separate options from paths
-            ],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            check=True,
-            text=True
+        return read_commit_info(repo_path, commit_hash)
+    except (gitlog.GitError, OSError) as e:
+        print(
+            f"{Colors.RED}Error getting commit info: {e}{Colors.END}", file=sys.stderr
         )
-        
-        # Parse the output of git diff --name-status
-        changed_files = []
-        for line in result.stdout.splitlines():
-            if not line.strip():
-                continue
-                
-            # Split on the first tab to separate status from path
-            parts = line.strip().split('\t', 1)
-            if len(parts) == 2:
-                status, path = parts
-                changed_files.append({"status": status, "path": path})
-            else:
-                # If there's no tab, it's probably just a path (unlikely but possible)
-                changed_files.append({"status": "M", "path": line.strip()})
-        
-        commit_info["changed_files"] = changed_files
+        sys.exit(1)
 
-        return commit_info
 
-    except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
+def iter_commit_infos(
+    repo_path: str,
+    rev_range: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+):
+    """Stream information about every commit in a range, oldest first."""
+    revisions = [rev_range] if rev_range else None
+    try:
+        for commit_info in gitlog.iter_commits(
+            repo_path, revisions, since=since, until=until, extra_args=["--reverse"]
+        ):
+            commit_info["repo_path"] = repo_path
+            yield commit_info
+    except (gitlog.GitError, OSError) as e:
         print(
-            f"{Colors.RED}Error getting commit info: {e}{Colors.END}", file=sys.stderr
+            f"{Colors.RED}Error reading commit range: {e}{Colors.END}", file=sys.stderr
         )
         sys.exit(1)
 
 
-def get_auth_headers():
-    """Get authentication headers based on the configured method."""
-    auth_headers = {}
-    
-    # Debug: Print the configuration being used
-    print(f"{Colors.YELLOW}=== Debug: WordPress Configuration ==={Colors.END}")
-    print(f"URL: {CONFIG.get('wordpress_url')}")
-    print(f"Username: {CONFIG.get('wordpress_username')}")
-    print(f"Password: {'*' * len(CONFIG.get('wordpress_password', '')) if CONFIG.get('wordpress_password') else 'None'}")
-    print(f"Auth Method: {CONFIG.get('auth_method', 'basic')}")
-    print(f"Debug Mode: {CONFIG.get('wordpress_debug', False)}")
-    
-    # Always use basic authentication with the token as the password
-    username = CONFIG.get("wordpress_username", "").strip()
-    password = CONFIG.get("wordpress_password", "").strip()
-    
-    if not username or not password:
-        print(f"{Colors.RED}Error: Missing WordPress username or password in configuration{Colors.END}")
-        return auth_headers
-    
+def open_commit_index() -> "commitindex.CommitIndex":
+    """Open the local commit index in the data directory."""
+    from . import commitindex
+
+    return commitindex.CommitIndex(os.path.join(CONFIG["data_dir"], "commits.db"))
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO date (``YYYY-MM-DD[THH:MM[:SS]]``) into a local timestamp."""
+    if not value:
+        return None
     try:
-        # Create the Basic Auth header
-        credentials = f"{username}:{password}"
-        token = base64.b64encode(credentials.encode('utf-8')).decode('utf-8')
-        auth_headers["Authorization"] = f"Basic {token}"
-        
-        # Debug information
-        print(f"{Colors.YELLOW}Using Basic Auth with username: {username}")
-        print(f"Auth Header: {auth_headers['Authorization'][:30]}...")
-        
-        # Add User-Agent to help with debugging
-        auth_headers["User-Agent"] = "Git2WP/1.0"
-        
-    except Exception as e:
-        print(f"{Colors.RED}Error creating auth header: {str(e)}{Colors.END}")
-        import traceback
-        print(f"{Colors.RED}Stack Trace:\n{traceback.format_exc()}{Colors.END}")
-    
-    # Add Content-Type header for all requests
-    auth_headers["Content-Type"] = "application/json"
-    
-    return auth_headers
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise click.BadParameter(f"Expected an ISO date (YYYY-MM-DD), got {value!r}")
+
+
+def get_wordpress_client() -> "wordpress.WordPressClient":
+    """Return the shared, pooled WordPress client for the configured site."""
+    from . import wordpress
+
+    return wordpress.get_client(
+        CONFIG["wordpress_url"],
+        CONFIG["wordpress_username"],
+        CONFIG["wordpress_password"],
+        CONFIG["wordpress_token"],
+        timeout=CONFIG["wordpress_timeout"],
+        retries=CONFIG["wordpress_retries"],
+        rate=CONFIG["wordpress_rate"],
+        max_concurrency=CONFIG["wordpress_max_concurrency"],
+    )
+
+
+_taxonomy_caches: Dict[str, "taxonomy.TaxonomyCache"] = {}
+
+
+def get_taxonomy_cache() -> "taxonomy.TaxonomyCache":
+    """Return the persistent category/tag cache for the configured site."""
+    from . import taxonomy
+
+    cache = _taxonomy_caches.get(CONFIG["wordpress_url"])
+    if cache is None:
+        cache = _taxonomy_caches[CONFIG["wordpress_url"]] = taxonomy.TaxonomyCache(
+            get_wordpress_client(),
+            os.path.join(CONFIG["data_dir"], "taxonomy-cache.json"),
+            ttl=CONFIG["taxonomy_ttl"],
+        )
+    return cache
 
 
 def test_wordpress_connection():
     """Test connection to WordPress."""
-    try:
-        import requests
-        from requests.exceptions import RequestException
+    from . import wordpress
 
+    try:
         if not CONFIG["wordpress_url"]:
             click.echo(f"{Colors.RED}Error: WORDPRESS_URL is not set in the configuration.{Colors.END}")
             return False
 
-        # Get authentication headers
-        auth_headers = get_auth_headers()
-        
-        if not auth_headers:
+        client = get_wordpress_client()
+
+        if not client.has_auth:
             click.echo(f"{Colors.YELLOW}Warning: No valid authentication method configured.{Colors.END}")
             # Try unauthenticated request to check if the API is accessible
             try:
-                response = requests.get(
-                    f"{CONFIG['wordpress_url']}/wp-json/",
-                    timeout=10,
-                )
+                response = client.get("/")
                 if response.status_code == 200:
                     click.echo(f"{Colors.YELLOW}WordPress API is accessible but authentication is required for full access.{Colors.END}")
                     return False
-            except RequestException:
+            except wordpress.WordPressError:
                 pass
                 
             click.echo(f"{Colors.RED}Error: Please configure authentication in ~/.config/git2wp/.env{Colors.END}")
             return False
 
         # Test authentication by accessing the users/me endpoint
-        response = requests.get(
-            f"{CONFIG['wordpress_url']}/wp-json/wp/v2/users/me",
-            headers=auth_headers,
-            timeout=10,
-        )
+        response = client.current_user()
 
         if response.status_code == 200:
             user_data = response.json()
@@ -233,85 +199,71 @@ def test_wordpress_connection():
         return False
 
 
-def publish_to_wordpress(title: str, content: str, status: str = "draft"):
-    """Publish content to WordPress."""
+def build_post_data(title: str, content: str, status: str = "draft") -> Dict[str, Any]:
+    """Return the ``/wp/v2/posts`` body for a post."""
+    # Set default title if empty or contains only whitespace
+    if not title or not title.strip():
+        title = f"Git Commit - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+        
+    # Ensure status is one of the valid WordPress statuses
+    valid_statuses = ['publish', 'future', 'draft', 'pending', 'private']
+    if status.lower() not in valid_statuses:
+        if CONFIG.get("wordpress_debug", False):
+            print(f"{Colors.YELLOW}Warning: Invalid status '{status}'. Defaulting to 'draft'.{Colors.END}")
+        status = 'draft'
+    
+    # Resolve the default category from the cached taxonomy
+    default_category_id = 1  # Fallback to 1 if we can't fetch categories
     try:
-        import requests
-        from requests.exceptions import RequestException
-        import json
+        with tracing.span("wordpress.categories"):
+            default_category_id = get_taxonomy_cache().default_category_id() or 1
+    except Exception as e:
+        if CONFIG.get("wordpress_debug", False):
+            print(f"{Colors.YELLOW}Warning: Could not fetch categories: {str(e)}{Colors.END}")
+    
+    return {
+        "title": title,
+        "content": content,
+        "status": status,
+        "categories": [default_category_id]
+    }
+
 
+@tracing.traced("wordpress.publish")
+def publish_to_wordpress(
+    title: str, content: str, status: str = "draft", post_id: Optional[int] = None
+):
+    """Publish content to WordPress, updating post ``post_id`` if given."""
+    import requests
+
+    from . import wordpress
+
+    try:
         if not CONFIG["wordpress_url"]:
             click.echo(f"{Colors.RED}Error: WORDPRESS_URL is not set in the configuration.{Colors.END}")
             return None
 
-        # Get authentication headers
-        auth_headers = get_auth_headers()
-        if not auth_headers:
+        client = get_wordpress_client()
+        if not client.has_auth:
             click.echo(f"{Colors.RED}Error: No valid authentication method configured.{Colors.END}")
             return None
 
-        # Set default title if empty or contains only whitespace
-        if not title or not title.strip():
-            title = f"Git Commit - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-            
-        # Ensure status is one of the valid WordPress statuses
-        valid_statuses = ['publish', 'future', 'draft', 'pending', 'private']
-        if status.lower() not in valid_statuses:
-            if CONFIG.get("wordpress_debug", False):
-                print(f"{Colors.YELLOW}Warning: Invalid status '{status}'. Defaulting to 'draft'.{Colors.END}")
-            status = 'draft'
-        
-        # Get default category ID from WordPress
-        default_category_id = 1  # Fallback to 1 if we can't fetch categories
-        try:
-            # Try to get categories from WordPress
-            categories_response = requests.get(
-                f"{CONFIG['wordpress_url']}/wp-json/wp/v2/categories",
-                headers=auth_headers,
-                timeout=10
-            )
-            
-            if categories_response.status_code == 200:
-                categories = categories_response.json()
-                # Find the 'Uncategorized' category or use the first available
-                for category in categories:
-                    if category.get('slug') == 'uncategorized':
-                        default_category_id = category['id']
-                        break
-                else:
-                    if categories:  # If no 'uncategorized' but we have categories
-                        default_category_id = categories[0]['id']
-        except Exception as e:
-            if CONFIG.get("wordpress_debug", False):
-                print(f"{Colors.YELLOW}Warning: Could not fetch categories: {str(e)}{Colors.END}")
-        
-        # Prepare the post data
-        post_data = {
-            "title": title,
-            "content": content,
-            "status": status,
-            "categories": [default_category_id]
-        }
-
-        # Add Content-Type header
-        headers = {"Content-Type": "application/json"}
-        headers.update(auth_headers)
-
+        if post_id:
+            # Only the generated fields change; status and categories are kept
+            path = f"/wp/v2/posts/{post_id}"
+            post_data = {"title": title, "content": content}
+        else:
+            path = "/wp/v2/posts"
+            post_data = build_post_data(title, content, status)
 
         # Debug: Print request details
         click.echo(f"{Colors.BLUE}=== WordPress API Request ==={Colors.END}")
-        click.echo(f"URL: {CONFIG['wordpress_url']}/wp-json/wp/v2/posts")
-        click.echo(f"Headers: {json.dumps(headers, indent=2)}")
+        click.echo(f"URL: {client.api_url(path)}")
         click.echo(f"Data: {json.dumps(post_data, indent=2)}")
 
         # Make the API request
         try:
-            response = requests.post(
-                f"{CONFIG['wordpress_url']}/wp-json/wp/v2/posts",
-                headers=headers,
-                json=post_data,
-                timeout=30,
-            )
+            response = client.post(path, json=post_data)
 
             # Debug: Print response details
             click.echo(f"{Colors.BLUE}=== WordPress API Response ==={Colors.END}")
@@ -319,7 +271,7 @@ def publish_to_wordpress(title: str, content: str, status: str = "draft"):
             click.echo(f"Headers: {json.dumps(dict(response.headers), indent=2)}")
             click.echo(f"Response: {response.text[:1000]}")
 
-            if response.status_code == 201:
+            if response.status_code in (200, 201):
                 post_data = response.json()
                 click.echo(f"{Colors.GREEN}✓ Successfully published post: {post_data.get('link', 'N/A')}{Colors.END}")
                 return post_data
@@ -335,11 +287,8 @@ def publish_to_wordpress(title: str, content: str, status: str = "draft"):
                 
                 return None
                 
-        except RequestException as e:
+        except (wordpress.WordPressError, requests.RequestException) as e:
             click.echo(f"{Colors.RED}Error making request to WordPress: {str(e)}{Colors.END}")
-            if hasattr(e, 'response') and e.response is not None:
-                click.echo(f"Status Code: {e.response.status_code}")
-                click.echo(f"Response: {e.response.text[:1000]}")
             return None
             
     except Exception as e:
@@ -349,6 +298,168 @@ def publish_to_wordpress(title: str, content: str, status: str = "draft"):
         return None
 
 
+def publish_posts_bulk(posts: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Create or update many posts through the WordPress batch endpoint.
+
+    Args:
+        posts: Post bodies as returned by :func:`build_post_data`; a post
+            with an ``id`` updates that post instead of creating one
+
+    Returns:
+        List[Optional[Dict[str, Any]]]: The saved post for each input, or
+        None where WordPress rejected it
+    """
+    if not CONFIG["wordpress_url"]:
+        click.echo(f"{Colors.RED}Error: WORDPRESS_URL is not set in the configuration.{Colors.END}")
+        return [None] * len(posts)
+    client = get_wordpress_client()
+    if not client.has_auth:
+        click.echo(f"{Colors.RED}Error: No valid authentication method configured.{Colors.END}")
+        return [None] * len(posts)
+
+    operations = []
+    for post in posts:
+        body = {key: value for key, value in post.items() if key != "id"}
+        path = f"/wp/v2/posts/{post['id']}" if post.get("id") else "/wp/v2/posts"
+        operations.append({"method": "POST", "path": path, "body": body})
+
+    saved: List[Optional[Dict[str, Any]]] = []
+    for post, result in zip(posts, client.batch(operations)):
+        if isinstance(result, Exception):
+            click.echo(f"{Colors.RED}✗ {post.get('title', '')}: {result}{Colors.END}")
+            saved.append(None)
+        elif result["status"] in (200, 201):
+            saved.append(result["body"])
+        else:
+            body = result["body"]
+            message = body.get("message") if isinstance(body, dict) else str(body)[:200]
+            click.echo(
+                f"{Colors.RED}✗ {post.get('title', '')}: "
+                f"HTTP {result['status']} {message}{Colors.END}"
+            )
+            saved.append(None)
+    return saved
+
+
+_ledgers: Dict[str, "ledger.PublishLedger"] = {}
+
+
+def get_publish_ledger() -> "ledger.PublishLedger":
+    """Return the ledger of published commits in the data directory."""
+    from . import ledger
+
+    path = os.path.join(CONFIG["data_dir"], "publish-ledger.db")
+    if path not in _ledgers:
+        _ledgers[path] = ledger.PublishLedger(path)
+    return _ledgers[path]
+
+
+def commit_source_hash(repo_name: str, commit_info: Dict[str, Any]) -> str:
+    """Hash everything the article for a commit is generated from."""
+    from . import git2text, ledger
+
+    return ledger.digest(*git2text.build_commit_prompt(repo_name, commit_info))
+
+
+def published_entry(repo_path: str, commit_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the ledger entry of a commit whose post is up to date, else None."""
+    entry = get_publish_ledger().get(
+        CONFIG["wordpress_url"], repo_path, commit_info["hash"]
+    )
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    if entry and entry["source_hash"] == commit_source_hash(repo_name, commit_info):
+        return entry
+    return None
+
+
+def unpublished_commits(repo_path: str, commits, force: bool = False):
+    """Yield the commits that still need an article (all of them with ``force``)."""
+    for commit_info in commits:
+        entry = None if force else published_entry(repo_path, commit_info)
+        if entry:
+            print(
+                f"{Colors.BLUE}={Colors.END} {commit_info['short_hash']} "
+                f"already published (post {entry['post_id']})"
+            )
+            continue
+        yield commit_info
+
+
+def plan_post(
+    repo_path: str, key: str, post_data: Dict[str, Any]
+) -> Tuple[str, Optional[Dict[str, Any]], str]:
+    """Return ``(action, ledger entry, content hash)`` for a rendered post.
+
+    ``key`` identifies the post in the ledger: a commit SHA, or a digest id.
+    """
+    from . import ledger
+
+    entry = get_publish_ledger().get(CONFIG["wordpress_url"], repo_path, key)
+    content_hash = ledger.digest(post_data["title"], post_data["content"])
+    return ledger.plan(entry, content_hash), entry, content_hash
+
+
+def record_post(
+    repo_path: str,
+    key: str,
+    source_hash: str,
+    post: Dict[str, Any],
+    content_hash: str,
+) -> None:
+    """Store the post that holds the article for ``key`` in the ledger."""
+    get_publish_ledger().record(
+        CONFIG["wordpress_url"],
+        repo_path,
+        key,
+        post["id"],
+        source_hash,
+        content_hash,
+        link=post.get("link"),
+    )
+
+
+def save_ledger_post(
+    repo_path: str, key: str, source_hash: str, post_data: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Create, update or skip the post for ``key`` according to the ledger.
+
+    Returns:
+        Optional[Dict[str, Any]]: The post (only ``id`` and ``link`` when it
+        was left unchanged), or None if WordPress rejected it
+    """
+    from . import ledger
+
+    action, entry, content_hash = plan_post(repo_path, key, post_data)
+    if action == ledger.SKIP:
+        post = {"id": entry["post_id"], "link": entry["link"]}
+        record_post(repo_path, key, source_hash, post, content_hash)
+        print(f"{Colors.BLUE}Post {entry['post_id']} is already up to date{Colors.END}")
+        return post
+
+    result = publish_to_wordpress(
+        post_data["title"],
+        post_data["content"],
+        post_data["status"],
+        post_id=entry["post_id"] if action == ledger.UPDATE else None,
+    )
+    if result:
+        record_post(repo_path, key, source_hash, result, content_hash)
+    return result
+
+
+def save_post(
+    repo_path: str, commit_info: Dict[str, Any], post_data: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Create, update or skip a commit's post according to the ledger."""
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    return save_ledger_post(
+        repo_path,
+        commit_info["hash"],
+        commit_source_hash(repo_name, commit_info),
+        post_data,
+    )
+
+
 def get_ollama_servers() -> List[Dict[str, str]]:
     """Get list of available Ollama servers from environment."""
     servers = []
@@ -375,6 +486,8 @@ def get_ollama_servers() -> List[Dict[str, str]]:
 
 def check_ollama_server(server: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """Check if an Ollama server is available and return its info if available."""
+    import requests
+
     try:
         start_time = time.time()
         response = requests.get(f"{server['url']}/api/version", timeout=5)
@@ -410,13 +523,25 @@ def get_fastest_ollama_server() -> Optional[Dict[str, Any]]:
     
     return available_servers[0] if available_servers else None
 
-def generate_llm_summary(repo_name: str, commit_info: Dict[str, Any]) -> Tuple[str, str]:
-    """Generate a summary of changes using the git2text module."""
+def generate_llm_summary(
+    repo_name: str,
+    commit_info: Dict[str, Any],
+    on_token: Optional[Callable[[str], None]] = None,
+    summary: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Generate a summary of changes using the git2text module.
+
+    A ``summary`` produced ahead of time (e.g. by a batch run) is used as is.
+    """
+    from . import git2text
+
     debug = CONFIG.get("wordpress_debug", False)
     
     try:
         # Generate the summary using the git2text module
-        content = git2text.generate_commit_summary(repo_name, commit_info, debug=debug)
+        content = summary if summary is not None else git2text.generate_commit_summary(
+            repo_name, commit_info, debug=debug, on_token=on_token
+        )
         
         # Extract the first line for the title
         first_line = commit_info.get('message', 'Update').split('\n')[0][:100].strip()
@@ -458,10 +583,15 @@ def generate_simple_summary(repo_name: str, commit_info: Dict[str, Any]) -> Tupl
     return title, content
 
 
-def format_commit_for_wordpress(repo_name: str, commit_info: Dict[str, Any]) -> Dict[str, Any]:
+def format_commit_for_wordpress(
+    repo_name: str,
+    commit_info: Dict[str, Any],
+    on_token: Optional[Callable[[str], None]] = None,
+    summary: Optional[str] = None,
+) -> Dict[str, Any]:
     """Format Git commit information for WordPress using LLM."""
     # Generate the summary using LLM
-    title, content = generate_llm_summary(repo_name, commit_info)
+    title, content = generate_llm_summary(repo_name, commit_info, on_token, summary)
     
     # Add the original commit details as a reference
     content += "\n\n<h3>Original Commit Details</h3>"
@@ -496,13 +626,74 @@ def format_commit_for_wordpress(repo_name: str, commit_info: Dict[str, Any]) ->
     }
 
 
+def print_token(token: str) -> None:
+    """Write a streamed chunk of generated text straight to the terminal."""
+    sys.stdout.write(token)
+    sys.stdout.flush()
+
+
+def print_generation_stats() -> None:
+    """Print time-to-first-token and throughput of the last generation."""
+    from . import git2text
+
+    stats = git2text.get_client(CONFIG.get("wordpress_debug", False)).last_stats
+    print()
+    if not stats:
+        return
+    parts = [f"{stats['server']}", f"total {stats['duration']:.2f}s"]
+    if stats.get("time_to_first_token") is not None:
+        parts.append(f"first token {stats['time_to_first_token']:.2f}s")
+    if stats.get("tokens_per_sec"):
+        parts.append(f"{stats['tokens']} tokens, {stats['tokens_per_sec']:.1f} tokens/s")
+    print(f"{Colors.BLUE}Generation: {', '.join(parts)}{Colors.END}")
+
+
+def write_profile(path: str) -> None:
+    """Stop tracing, write the Chrome trace to ``path`` and print the summary."""
+    tracer = tracing.stop()
+    if tracer is None:
+        return
+    tracer.write(path)
+    click.echo(f"\n{Colors.BLUE}=== Profile ==={Colors.END}", err=True)
+    click.echo(tracing.format_summary(tracer.summary()), err=True)
+    click.echo(
+        f"{Colors.BLUE}Trace written to {path} (open in https://ui.perfetto.dev "
+        f"or chrome://tracing){Colors.END}",
+        err=True,
+    )
+
+
+def start_metrics() -> None:
+    """Record pipeline metrics for /metrics until the current command exits."""
+    if not CONFIG["metrics_enabled"]:
+        return
+    metrics.configure(CONFIG["metrics_db"])
+    # Flushes on normal exit, errors and sys.exit() alike
+    click.get_current_context().call_on_close(metrics.close)
+
+
 @click.group()
 @click.version_option(version="0.1.0")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
-def cli(verbose):
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Time every stage and write a Chrome/Perfetto trace to this file",
+)
+@click.option(
+    "--profile-memory", is_flag=True, help="With --profile, also track memory (tracemalloc)"
+)
+@click.pass_context
+def cli(ctx, verbose, profile_path, profile_memory):
     """Git2WP - Publish Git repository changes to WordPress."""
     if verbose:
         print("Verbose mode enabled")
+    if profile_path:
+        tracing.start(memory=profile_memory)
+        # Runs on normal exit, errors and sys.exit() alike
+        ctx.call_on_close(lambda: write_profile(profile_path))
 
 
 @cli.command()
@@ -512,6 +703,21 @@ def cli(verbose):
 @click.option(
     "--commit", "-c", default="HEAD", help="Commit hash to publish (default: HEAD)"
 )
+@click.option(
+    "--range",
+    "rev_range",
+    default=None,
+    help="Publish every commit in a revision range, e.g. v1.0..HEAD",
+)
+@click.option(
+    "--since", default=None, help="Publish commits more recent than this date"
+)
+@click.option("--until", default=None, help="Publish commits older than this date")
+@click.option(
+    "--from-index",
+    is_flag=True,
+    help="Read --since/--until commits from the local commit index (ISO dates)",
+)
 @click.option(
     "--dry-run",
     is_flag=True,
@@ -523,7 +729,78 @@ def cli(verbose):
     default="draft",
     help="Status for the WordPress post",
 )
-def publish(repo_path: str, commit: str, dry_run: bool, status: str):
+@click.option(
+    "--stream", is_flag=True, help="Print the article as the LLM generates it"
+)
+@click.option(
+    "--pipeline",
+    "use_pipeline",
+    is_flag=True,
+    help="Overlap git reads, generation and posting (range modes only)",
+)
+@click.option(
+    "--llm-workers",
+    type=int,
+    default=None,
+    help="Concurrent generations in --pipeline mode (default: server slots)",
+)
+@click.option(
+    "--digest",
+    "digest_period",
+    type=click.Choice(["day", "week"]),
+    default=None,
+    help="Publish one map-reduce summarized article per day or week (range modes only)",
+)
+@click.option(
+    "--by-repo", is_flag=True, help="With --digest, write one article per repository"
+)
+@click.option(
+    "--all-repos",
+    is_flag=True,
+    help="With --from-index and --digest or --enqueue, include every indexed repository",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Regenerate commits the publish ledger records as already published",
+)
+@click.option(
+    "--bulk",
+    is_flag=True,
+    help="Send posts through the WordPress batch API, 25 per request (range modes only)",
+)
+@click.option(
+    "--enqueue",
+    is_flag=True,
+    help="Queue the commits for git2wp worker instead of publishing them now",
+)
+@click.option(
+    "--publish-workers",
+    type=int,
+    default=2,
+    show_default=True,
+    help="Concurrent WordPress posts in --pipeline mode",
+)
+def publish(
+    repo_path: str,
+    commit: str,
+    rev_range: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    from_index: bool,
+    dry_run: bool,
+    status: str,
+    stream: bool,
+    use_pipeline: bool,
+    llm_workers: Optional[int],
+    digest_period: Optional[str],
+    by_repo: bool,
+    all_repos: bool,
+    force: bool,
+    bulk: bool,
+    enqueue: bool,
+    publish_workers: int,
+):
     """Publish Git repository changes to WordPress."""
     # Validate repository
     if not is_git_repo(repo_path):
@@ -532,11 +809,319 @@ def publish(repo_path: str, commit: str, dry_run: bool, status: str):
             file=sys.stderr,
         )
         sys.exit(1)
+    start_metrics()
+
+    if all_repos and not (from_index and (digest_period or enqueue)):
+        # Other modes summarize and record every commit against repo_path
+        raise click.UsageError("--all-repos needs --from-index with --digest or --enqueue")
+
+    if from_index:
+        if rev_range:
+            raise click.UsageError("--range cannot be combined with --from-index")
+        if not (since or until):
+            # Without a date the whole indexed history would be published
+            raise click.UsageError("--from-index needs --since or --until")
+        with open_commit_index() as index:
+            index.ingest(repo_path)
+            if all_repos:
+                for repo in index.repositories():
+                    if os.path.isdir(repo["path"]):
+                        index.ingest(repo["path"])
+            commits = list(
+                index.query(
+                    parse_date(since),
+                    parse_date(until),
+                    repo_path=None if all_repos else repo_path,
+                )
+            )
+    elif rev_range or since or until:
+        # Range mode: stream every commit from a single git log process
+        commits = iter_commit_infos(repo_path, rev_range, since, until)
+    else:
+        commits = None
+
+    if enqueue:
+        if digest_period or bulk or use_pipeline:
+            raise click.UsageError(
+                "--enqueue cannot be combined with --digest, --bulk or --pipeline"
+            )
+        if commits is None:
+            commits = [get_commit_info(repo_path, commit)]
+        queued = 0
+        with open_job_queue() as queue:
+            for commit_info in commits:
+                enqueue_commit(queue, commit_info.get("repo_path", repo_path), commit_info["hash"])
+                queued += 1
+        print(
+            f"{Colors.GREEN}Queued {queued} commits; "
+            f"run git2wp worker to publish them{Colors.END}"
+        )
+        return
+
+    if digest_period:
+        if commits is None:
+            raise click.UsageError("--digest needs --range, --since, --until or --from-index")
+        if publish_digests(
+            repo_path, commits, digest_period, by_repo, all_repos, dry_run, status, force
+        ):
+            sys.exit(1)
+        return
+
+    if commits is not None:
+        commits = unpublished_commits(repo_path, commits, force)
+
+    if bulk and use_pipeline:
+        raise click.UsageError("--bulk cannot be combined with --pipeline")
+
+    if commits is not None and bulk and not dry_run:
+        if publish_in_bulk(repo_path, commits):
+            sys.exit(1)
+        return
+
+    if commits is not None and use_pipeline:
+        failures = publish_with_pipeline(
+            repo_path, commits, dry_run, llm_workers, publish_workers
+        )
+        if failures:
+            sys.exit(1)
+        return
+
+    if commits is not None:
+        failures = 0
+        for commit_info, summary in summarize_in_batches(repo_path, commits, stream):
+            if not publish_commit(
+                repo_path, commit_info, dry_run, status, stream, summary
+            ):
+                failures += 1
+        if failures:
+            sys.exit(1)
+        return
 
     # Get commit information
     print(f"{Colors.BLUE}Fetching commit information...{Colors.END}")
     commit_info = get_commit_info(repo_path, commit)
+    if not force and not dry_run:
+        entry = published_entry(repo_path, commit_info)
+        if entry:
+            print(
+                f"{Colors.GREEN}✓ {commit_info['short_hash']} is already published: "
+                f"{entry['link'] or entry['post_id']}{Colors.END}"
+            )
+            return
+
+    if not publish_commit(repo_path, commit_info, dry_run, status, stream):
+        sys.exit(1)
+
+
+def summarize_in_batches(repo_path: str, commits, stream: bool = False):
+    """Yield ``(commit_info, summary)`` pairs for a stream of commits.
+
+    Commits are summarized a chunk at a time on every configured Ollama
+    server in parallel. When streaming to the terminal, summaries are left
+    to ``publish_commit`` (None) so tokens can be shown as they arrive.
+    """
+    from . import git2text
+    from .batch import ServerPool
+
+    if stream:
+        for commit_info in commits:
+            yield commit_info, None
+        return
+
+    debug = CONFIG.get("wordpress_debug", False)
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    chunk_size = max(1, 2 * ServerPool(git2text.get_client(debug)).slots)
+    commits = iter(commits)
+    while True:
+        chunk = list(itertools.islice(commits, chunk_size))
+        if not chunk:
+            return
+        summaries = git2text.generate_commit_summaries(
+            [(repo_name, commit_info) for commit_info in chunk], debug=debug
+        )
+        yield from zip(chunk, summaries)
+
+
+def publish_digests(
+    repo_path: str,
+    commits,
+    period: str,
+    by_repo: bool = False,
+    all_repos: bool = False,
+    dry_run: bool = False,
+    status: str = "draft",
+    force: bool = False,
+) -> int:
+    """Publish one digest article per period (and repository). Returns the failure count."""
+    from . import digest, git2text, ledger
+
+    debug = CONFIG.get("wordpress_debug", False)
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    client = git2text.get_client(debug)
+    failures = 0
 
+    for (period_key, group_repo), group in digest.group_commits(commits, period, by_repo).items():
+        name = group_repo or ("All repositories" if all_repos else repo_name)
+        label = f"{name}, {'week ' if period == 'week' else ''}{period_key}"
+        key = f"digest:{period}:{period_key}:{name}"
+        source_hash = ledger.digest(period, *(c["hash"] for c in group))
+        entry = get_publish_ledger().get(CONFIG["wordpress_url"], repo_path, key)
+        if entry and entry["source_hash"] == source_hash and not force and not dry_run:
+            print(f"{Colors.BLUE}={Colors.END} {label} already published (post {entry['post_id']})")
+            continue
+
+        print(f"{Colors.BLUE}Summarizing {len(group)} commits for {label}...{Colors.END}")
+        try:
+            article = digest.summarize_group(
+                client, label, group, CONFIG["digest_token_budget"]
+            )
+        except Exception as e:
+            print(f"{Colors.YELLOW}Warning: digest generation failed: {e}{Colors.END}")
+            article = None
+        post_data = {
+            "title": f"{name}: {'Weekly' if period == 'week' else 'Daily'} digest {period_key}",
+            "content": digest.render_digest(label, group, article),
+            "status": status,
+        }
+
+        if dry_run:
+            print(f"\n{Colors.YELLOW}=== Dry Run ==={Colors.END}")
+            print(f"{Colors.BLUE}Title:{Colors.END} {post_data['title']}")
+            print("-" * 80)
+            print(post_data["content"][:500] + ("..." if len(post_data["content"]) > 500 else ""))
+            print("-" * 80)
+            continue
+        if not save_ledger_post(repo_path, key, source_hash, post_data):
+            failures += 1
+    return failures
+
+
+def publish_in_bulk(repo_path: str, commits) -> int:
+    """Summarize commits and post them in batch requests. Returns the failure count."""
+    from . import ledger, wordpress
+
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    failures = 0
+    # (commit_info, request body, content hash)
+    pending: List[Tuple[Dict[str, Any], Dict[str, Any], str]] = []
+
+    def flush() -> int:
+        saved = publish_posts_bulk([post for _, post, _ in pending])
+        for (commit_info, _, content_hash), result in zip(pending, saved):
+            if result:
+                record_post(
+                    repo_path, commit_info["hash"],
+                    commit_source_hash(repo_name, commit_info), result, content_hash,
+                )
+                print(f"{Colors.GREEN}✓{Colors.END} {commit_info['short_hash']} {result.get('link', '')}")
+            metrics.inc(
+                "git2wp_commits_processed_total", result="published" if result else "failed"
+            )
+        pending.clear()
+        return saved.count(None)
+
+    for commit_info, summary in summarize_in_batches(repo_path, commits):
+        post_data = format_commit_for_wordpress(repo_name, commit_info, summary=summary)
+        action, entry, content_hash = plan_post(repo_path, commit_info["hash"], post_data)
+        if action == ledger.SKIP:
+            record_post(
+                repo_path, commit_info["hash"], commit_source_hash(repo_name, commit_info),
+                {"id": entry["post_id"], "link": entry["link"]}, content_hash,
+            )
+            metrics.inc("git2wp_commits_processed_total", result="unchanged")
+            continue
+        if action == ledger.UPDATE:
+            body = {
+                "id": entry["post_id"],
+                "title": post_data["title"],
+                "content": post_data["content"],
+            }
+        else:
+            body = build_post_data(
+                post_data["title"], post_data["content"], post_data["status"]
+            )
+        pending.append((commit_info, body, content_hash))
+        if len(pending) == wordpress.MAX_BATCH_SIZE:
+            failures += flush()
+    if pending:
+        failures += flush()
+    return failures
+
+
+def publish_with_pipeline(
+    repo_path: str,
+    commits,
+    dry_run: bool,
+    llm_workers: Optional[int] = None,
+    publish_workers: int = 2,
+) -> int:
+    """Publish commits through the asyncio pipeline. Returns the failure count."""
+    import asyncio
+
+    from . import git2text, pipeline
+    from .batch import ServerPool
+
+    debug = CONFIG.get("wordpress_debug", False)
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    if not llm_workers:
+        llm_workers = ServerPool(git2text.get_client(debug)).slots
+
+    def summarize(commit_info):
+        return commit_info, format_commit_for_wordpress(repo_name, commit_info)
+
+    def post(item):
+        commit_info, post_data = item
+        if dry_run:
+            return commit_info, post_data
+        result = save_post(repo_path, commit_info, post_data)
+        if not result:
+            raise RuntimeError("WordPress did not accept the post")
+        return commit_info, result
+
+    def on_result(item):
+        commit_info, result = item
+        label = result.get("link") or result.get("title", "")
+        print(f"{Colors.GREEN}✓{Colors.END} {commit_info['short_hash']} {label}")
+        metrics.inc(
+            "git2wp_commits_processed_total", result="dry_run" if dry_run else "published"
+        )
+
+    def on_error(stage_name, item, error):
+        commit_info = item[0] if isinstance(item, tuple) else item
+        print(
+            f"{Colors.RED}✗ {commit_info.get('short_hash', '?')} "
+            f"failed in {stage_name}: {error}{Colors.END}",
+            file=sys.stderr,
+        )
+        metrics.inc("git2wp_commits_processed_total", result="failed")
+
+    stages = [
+        pipeline.Stage("summarize", summarize, llm_workers),
+        pipeline.Stage("publish", post, publish_workers),
+    ]
+    stats = asyncio.run(pipeline.run_pipeline(commits, stages, on_result, on_error))
+
+    print(f"\n{Colors.YELLOW}=== Pipeline ==={Colors.END}")
+    for name in ("extract", "summarize", "publish"):
+        stage = stats[name]
+        print(
+            f"{name:<10} {stage['items']:>6} items {stage['errors']:>4} errors "
+            f"{stage['busy']:>9.2f}s busy"
+        )
+    print(f"{'elapsed':<10} {stats['total']['elapsed']:.2f}s")
+    return stats["summarize"]["errors"] + stats["publish"]["errors"]
+
+
+@tracing.traced("publish.commit")
+def publish_commit(
+    repo_path: str,
+    commit_info: Dict[str, Any],
+    dry_run: bool,
+    status: str,
+    stream: bool = False,
+    summary: Optional[str] = None,
+) -> bool:
+    """Print, format and publish a single commit. Returns False on failure."""
     # Print commit information
     print(f"\n{Colors.YELLOW}=== Commit Information ==={Colors.END}")
     print(
@@ -554,7 +1139,7 @@ def publish(repo_path: str, commit: str, dry_run: bool, status: str):
     if commit_info.get("changed_files"):
         print(f"\n{Colors.YELLOW}=== Changed Files ==={Colors.END}")
         for file in commit_info["changed_files"]:
-            status = file["status"]
+            file_status = file["status"]
             status_color = {
                 "A": Colors.GREEN,
                 "M": Colors.YELLOW,
@@ -562,14 +1147,20 @@ def publish(repo_path: str, commit: str, dry_run: bool, status: str):
                 "R": Colors.BLUE,
                 "C": Colors.BLUE,
                 "U": Colors.BLUE,
-            }.get(status[0], Colors.END)
-            print(f"{status_color}{status}{Colors.END} {file['path']}")
+            }.get(file_status[0], Colors.END)
+            print(f"{status_color}{file_status}{Colors.END} {file['path']}")
 
     # Format content for WordPress
     repo_name = os.path.basename(os.path.abspath(repo_path))
     
     # Get post data from format_commit_for_wordpress
-    post_data = format_commit_for_wordpress(repo_name, commit_info)
+    on_token = None
+    if stream:
+        print(f"\n{Colors.YELLOW}=== Generating Article ==={Colors.END}")
+        on_token = print_token
+    post_data = format_commit_for_wordpress(repo_name, commit_info, on_token, summary)
+    if stream:
+        print_generation_stats()
     
     # Use the title and content from the post_data
     post_title = post_data.get('title', f"{repo_name}: {commit_info.get('subject', 'Update')}")
@@ -584,16 +1175,728 @@ def publish(repo_path: str, commit: str, dry_run: bool, status: str):
         print("-" * 80)
         print(str(post_content)[:500] + ("..." if len(str(post_content)) > 500 else ""))
         print("-" * 80)
-        return
+        metrics.inc("git2wp_commits_processed_total", result="dry_run")
+        return True
 
     # Publish to WordPress
     print(f"\n{Colors.YELLOW}=== Publishing to WordPress ==={Colors.END}")
-    success = publish_to_wordpress(post_title, post_content, post_status)
+    success = save_post(
+        repo_path,
+        commit_info,
+        {"title": post_title, "content": post_content, "status": post_status},
+    )
+    metrics.inc(
+        "git2wp_commits_processed_total", result="published" if success else "failed"
+    )
+
+    return bool(success)
+
+
+@cli.command()
+@click.option(
+    "--path",
+    "root",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory to scan (default: GIT_PATH)",
+)
+@click.option(
+    "--depth", default=2, show_default=True, help="Directory levels below the root"
+)
+@click.option(
+    "--workers", default=16, show_default=True, help="Number of scanner threads"
+)
+@click.option(
+    "--limit", type=int, default=None, help="Maximum repositories (MAX_PROJECTS_SCAN)"
+)
+@click.option("--changed", is_flag=True, help="Only list repositories whose HEAD moved")
+@click.option("--full", is_flag=True, help="Ignore the scan index and rescan everything")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def scan(
+    root: Optional[str],
+    depth: int,
+    workers: int,
+    limit: Optional[int],
+    changed: bool,
+    full: bool,
+    as_json: bool,
+):
+    """Scan GIT_PATH for Git repositories (github/*/* layout)."""
+    root = root or CONFIG["git_path"]
+    index_path = os.path.join(CONFIG["data_dir"], "scan-index.json")
+    if full and os.path.exists(index_path):
+        os.remove(index_path)
 
-    if not success:
+    repositories = scanner.scan_repositories(
+        root,
+        index_path=index_path,
+        depth=depth,
+        max_workers=workers,
+        limit=limit or CONFIG["max_projects_scan"],
+    )
+    if changed:
+        repositories = [r for r in repositories if r["changed"]]
+
+    if as_json:
+        click.echo(json.dumps(repositories, indent=2))
+        return
+
+    for repo in repositories:
+        marker = f"{Colors.GREEN}*{Colors.END}" if repo["changed"] else " "
+        head = (repo["head"] or "unborn")[:7]
+        click.echo(f"{marker} {head} {repo['branch'] or '(detached)'}\t{repo['path']}")
+    click.echo(
+        f"{Colors.BLUE}{len(repositories)} repositories, "
+        f"{sum(1 for r in repositories if r['changed'])} changed{Colors.END}"
+    )
+
+
+def publish_new_commits(
+    repo_path: str,
+    old_head: Optional[str],
+    new_head: str,
+    dry_run: bool = False,
+    status: str = "draft",
+) -> int:
+    """Publish the commits between two HEADs. Returns the failure count.
+
+    Without ``old_head`` (a new repository or branch) only ``new_head`` is
+    published. Commits the ledger already has are skipped, so a force push
+    or a replayed event does not create duplicate posts.
+    """
+    rev_range = f"{old_head}..{new_head}" if old_head else f"{new_head}^!"
+    commits = unpublished_commits(repo_path, iter_commit_infos(repo_path, rev_range))
+    failures = 0
+    for commit_info, summary in summarize_in_batches(repo_path, commits):
+        if not publish_commit(repo_path, commit_info, dry_run, status, summary=summary):
+            failures += 1
+    return failures
+
+
+@cli.command()
+@click.option(
+    "--path",
+    "root",
+    type=click.Path(file_okay=False),
+    default=None,
+    help="Directory to watch (default: GIT_PATH)",
+)
+@click.option(
+    "--depth", default=2, show_default=True, help="Directory levels below the root"
+)
+@click.option(
+    "--interval",
+    default=2.0,
+    show_default=True,
+    help="Seconds between ref polls when inotify is unavailable",
+)
+@click.option(
+    "--debounce",
+    default=5.0,
+    show_default=True,
+    help="Seconds without ref changes before a repository is published",
+)
+@click.option(
+    "--workers", default=2, show_default=True, help="Repositories published at once"
+)
+@click.option("--poll", is_flag=True, help="Poll ref mtimes even where inotify works")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show what would be published without making changes",
+)
+@click.option(
+    "--status",
+    type=click.Choice(["draft", "publish", "pending", "private"]),
+    default="draft",
+    help="Status for the WordPress posts",
+)
+def watch(
+    root: Optional[str],
+    depth: int,
+    interval: float,
+    debounce: float,
+    workers: int,
+    poll: bool,
+    dry_run: bool,
+    status: str,
+):
+    """Publish new commits of every repository under GIT_PATH as they land."""
+    from . import watcher
+
+    start_metrics()
+
+    def on_change(repo_path: str, old_head: Optional[str], new_head: str) -> None:
+        print(
+            f"{Colors.BLUE}{repo_path}: {(old_head or 'new')[:7]}..{new_head[:7]}{Colors.END}"
+        )
+        try:
+            failures = publish_new_commits(repo_path, old_head, new_head, dry_run, status)
+        except (Exception, SystemExit) as e:
+            print(f"{Colors.RED}✗ {repo_path}: {e}{Colors.END}", file=sys.stderr)
+            return
+        if failures:
+            print(
+                f"{Colors.RED}✗ {repo_path}: {failures} commits failed{Colors.END}",
+                file=sys.stderr,
+            )
+
+    repo_watcher = watcher.RefWatcher(
+        root or CONFIG["git_path"],
+        on_change,
+        depth=depth,
+        interval=interval,
+        debounce=debounce,
+        max_workers=workers,
+        use_inotify=False if poll else None,
+    )
+    repo_watcher.rescan()
+    print(
+        f"{Colors.GREEN}Watching {len(repo_watcher.repositories)} repositories "
+        f"({repo_watcher.backend}), Ctrl+C to stop{Colors.END}"
+    )
+    try:
+        repo_watcher.run()
+    except KeyboardInterrupt:
+        print(f"{Colors.YELLOW}Stopping, waiting for running publishes...{Colors.END}")
+    finally:
+        repo_watcher.stop()
+
+
+PUBLISH_JOB = "publish"
+
+
+def open_job_queue() -> "jobqueue.JobQueue":
+    """Open the publish job queue (JOBS_DB, shared by every worker)."""
+    from . import jobqueue
+
+    return jobqueue.JobQueue(
+        CONFIG["jobs_db"],
+        lease=CONFIG["job_lease"],
+        max_attempts=CONFIG["job_max_attempts"],
+        shared=CONFIG["jobs_shared"],
+    )
+
+
+def enqueue_commit(queue: "jobqueue.JobQueue", repo_path: str, sha: str) -> int:
+    """Queue a publish job for a commit and return its id."""
+    repo_path = os.path.realpath(repo_path)
+    return queue.enqueue(
+        PUBLISH_JOB, f"{PUBLISH_JOB}:{repo_path}:{sha}", {"repo": repo_path, "sha": sha}
+    )
+
+
+def publish_jobs(
+    jobs: List[Dict[str, Any]],
+    settle: Callable[[List[Dict[str, Any]], Optional[str]], None],
+    dry_run: bool = False,
+    status: str = "draft",
+) -> int:
+    """Publish ``{"repo", "sha"}`` jobs, batched per repository. Returns the failure count.
+
+    ``settle(jobs, error)`` is called once for every job: with ``error`` None
+    when its commit was published (or the ledger already had it).
+    """
+    failures = 0
+    by_repo: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for job in jobs:
+        by_repo.setdefault(job["repo"], {}).setdefault(job["sha"], []).append(job)
+
+    for repo_path, by_sha in by_repo.items():
+        # Jobs per full commit hash (the same commit may be queued twice)
+        waiting: Dict[str, List[Dict[str, Any]]] = {}
+        commits = []
+        for sha, sha_jobs in by_sha.items():
+            try:
+                commit_info = read_commit_info(repo_path, sha)
+            except (gitlog.GitError, OSError) as e:
+                settle(sha_jobs, f"cannot read commit {sha}: {e}")
+                failures += 1
+                continue
+            if commit_info["hash"] not in waiting:
+                commits.append(commit_info)
+            waiting.setdefault(commit_info["hash"], []).extend(sha_jobs)
+
+        try:
+            for commit_info, summary in summarize_in_batches(
+                repo_path, unpublished_commits(repo_path, commits)
+            ):
+                settled = waiting.pop(commit_info["hash"])
+                try:
+                    published = publish_commit(
+                        repo_path, commit_info, dry_run, status, summary=summary
+                    )
+                except Exception as e:
+                    settle(settled, f"{type(e).__name__}: {e}")
+                    failures += 1
+                    continue
+                if published:
+                    settle(settled, None)
+                else:
+                    settle(settled, "WordPress did not accept the post")
+                    failures += 1
+        except Exception as e:
+            # Summarizing failed: settle the commits it did not get to
+            for settled in waiting.values():
+                settle(settled, f"{type(e).__name__}: {e}")
+                failures += 1
+            continue
+        # Commits the ledger already had
+        for settled in waiting.values():
+            settle(settled, None)
+    return failures
+
+
+def drain_spool(queue: "jobqueue.JobQueue") -> int:
+    """Move commits queued by git2wp-hook into the job queue. Returns how many moved."""
+    from . import spool as spool_module
+
+    spool = spool_module.Spool(CONFIG["spool_dir"])
+    spool.recover()
+    moved = 0
+    while True:
+        entries = spool.claim(100)
+        if not entries:
+            return moved
+        for entry in entries:
+            enqueue_commit(queue, entry["repo"], entry["sha"])
+            spool.ack(entry)
+        moved += len(entries)
+
+
+@cli.command()
+@click.option(
+    "--batch-size", default=25, show_default=True, help="Jobs claimed at a time"
+)
+@click.option(
+    "--interval",
+    default=2.0,
+    show_default=True,
+    help="Seconds between checks when no job is due",
+)
+@click.option("--once", is_flag=True, help="Exit when no job is due")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show one batch without publishing it or using up attempts",
+)
+@click.option(
+    "--status",
+    type=click.Choice(["draft", "publish", "pending", "private"]),
+    default="draft",
+    help="Status for the WordPress posts",
+)
+def worker(
+    batch_size: int,
+    interval: float,
+    once: bool,
+    dry_run: bool,
+    status: str,
+):
+    """Publish queued commits (from git2wp-hook and publish --enqueue).
+
+    Run any number of workers against the same queue; each job is leased to
+    one worker, retried with backoff and dead-lettered after JOB_MAX_ATTEMPTS.
+    """
+    import threading
+    import time
+
+    from . import jobqueue
+
+    start_metrics()
+    owner = jobqueue.worker_id()
+    held: Dict[int, Dict[str, Any]] = {}
+    stopped = threading.Event()
+    failures = 0
+
+    with open_job_queue() as queue:
+
+        def keep_leases() -> None:
+            # Long LLM generations must not let the leases of a batch expire
+            while not stopped.wait(queue.lease / 3):
+                queue.heartbeat(owner, list(held.copy()))
+
+        def settle(jobs: List[Dict[str, Any]], error: Optional[str]) -> None:
+            for job in jobs:
+                held.pop(job["id"], None)
+                if dry_run:
+                    queue.release(owner, job["id"])
+                elif error is None:
+                    queue.complete(owner, job["id"])
+                elif queue.fail(owner, job["id"], error) == jobqueue.FAILED:
+                    print(
+                        f"{Colors.RED}✗ job {job['id']} dead-lettered after "
+                        f"{job['attempts']} attempts: {error}{Colors.END}",
+                        file=sys.stderr,
+                    )
+
+        heartbeat = threading.Thread(target=keep_leases, daemon=True)
+        heartbeat.start()
+        pending = queue.counts()[jobqueue.PENDING]
+        print(f"{Colors.GREEN}Worker {owner}: {pending} jobs pending{Colors.END}")
+        try:
+            while True:
+                moved = drain_spool(queue)
+                if moved:
+                    print(f"{Colors.BLUE}Queued {moved} commits from git2wp-hook{Colors.END}")
+                if metrics.enabled():
+                    for state, count in queue.counts().items():
+                        metrics.set_gauge("git2wp_queue_jobs", count, state=state)
+                jobs = queue.claim(owner, batch_size, kind=PUBLISH_JOB)
+                if not jobs:
+                    if once or dry_run:
+                        break
+                    time.sleep(interval)
+                    continue
+                held.update((job["id"], job) for job in jobs)
+                failures += publish_jobs(
+                    [
+                        {**job["payload"], "id": job["id"], "attempts": job["attempts"]}
+                        for job in jobs
+                    ],
+                    settle,
+                    dry_run,
+                    status,
+                )
+                if dry_run:
+                    break
+        except KeyboardInterrupt:
+            print(f"{Colors.YELLOW}Stopped{Colors.END}")
+        finally:
+            stopped.set()
+            # Unfinished jobs go back without using up an attempt
+            for job_id in list(held):
+                queue.release(owner, job_id)
+            heartbeat.join()
+    if failures:
+        print(
+            f"{Colors.RED}{failures} commits failed; see git2wp jobs list{Colors.END}",
+            file=sys.stderr,
+        )
         sys.exit(1)
 
 
+@cli.group("jobs")
+def jobs_group():
+    """Inspect and replay the publish job queue."""
+
+
+@jobs_group.command("list")
+@click.option(
+    "--state",
+    type=click.Choice(["pending", "running", "done", "failed"]),
+    default=None,
+    help="Only jobs in this state (failed is the dead-letter list)",
+)
+@click.option("--limit", type=int, default=50, show_default=True, help="Maximum number of jobs")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def jobs_list(state: Optional[str], limit: int, as_json: bool):
+    """List queued jobs, most recently updated first."""
+    with open_job_queue() as queue:
+        jobs = queue.jobs(state, limit)
+        counts = queue.counts()
+    if as_json:
+        click.echo(json.dumps(jobs, indent=2))
+        return
+    for job in jobs:
+        payload = job["payload"]
+        error = f"  {job['last_error']}" if job["last_error"] else ""
+        click.echo(
+            f"{job['id']:>6} {job['state']:<8} {job['attempts']}/{job['max_attempts']} "
+            f"{payload.get('sha', '')[:7]} {payload.get('repo', '')}{error}"
+        )
+    click.echo(
+        f"{Colors.BLUE}" + ", ".join(f"{n} {s}" for s, n in counts.items()) + f"{Colors.END}"
+    )
+
+
+@jobs_group.command("replay")
+@click.argument("job_ids", nargs=-1, type=int)
+def jobs_replay(job_ids: Tuple[int, ...]):
+    """Queue dead-lettered jobs again (all of them without JOB_IDS)."""
+    with open_job_queue() as queue:
+        replayed = queue.replay(job_ids or None)
+    click.echo(f"{Colors.GREEN}Requeued {replayed} jobs{Colors.END}")
+
+
+@jobs_group.command("purge")
+@click.option(
+    "--older-than",
+    type=float,
+    default=7.0,
+    show_default=True,
+    help="Only done jobs finished more than this many days ago",
+)
+def jobs_purge(older_than: float):
+    """Delete finished jobs."""
+    with open_job_queue() as queue:
+        purged = queue.purge(older_than * 86400)
+    click.echo(f"{Colors.GREEN}Deleted {purged} done jobs{Colors.END}")
+
+
+@cli.group("index")
+def index_group():
+    """Maintain and query the local commit index."""
+
+
+@index_group.command("update")
+@click.argument(
+    "repo_paths",
+    nargs=-1,
+    type=click.Path(exists=True, file_okay=False, resolve_path=True),
+)
+def index_update(repo_paths: Tuple[str, ...]):
+    """Ingest new commits (default: every repository under GIT_PATH)."""
+    if not repo_paths:
+        repo_paths = tuple(
+            r["path"]
+            for r in scanner.scan_repositories(
+                CONFIG["git_path"],
+                index_path=os.path.join(CONFIG["data_dir"], "scan-index.json"),
+                limit=CONFIG["max_projects_scan"],
+            )
+        )
+
+    total = 0
+    with open_commit_index() as index:
+        for repo_path in repo_paths:
+            try:
+                count = index.ingest(repo_path)
+            except (gitlog.GitError, OSError) as e:
+                click.echo(f"{Colors.YELLOW}Skipping {repo_path}: {e}{Colors.END}")
+                continue
+            total += count
+            if count:
+                click.echo(f"{count:>7} {repo_path}")
+    click.echo(f"{Colors.GREEN}Indexed {total} new commits{Colors.END}")
+
+
+@index_group.command("query")
+@click.option("--day", default=None, help="Commits on a local day (YYYY-MM-DD)")
+@click.option("--since", default=None, help="Commits at or after this ISO date")
+@click.option("--until", default=None, help="Commits before this ISO date")
+@click.option("--author", default=None, help="Author name or email")
+@click.option(
+    "--repo",
+    "repo_path",
+    type=click.Path(exists=True, file_okay=False, resolve_path=True),
+    default=None,
+    help="Only this repository",
+)
+@click.option("--limit", type=int, default=None, help="Maximum number of commits")
+@click.option("--json", "as_json", is_flag=True, help="Print results as JSON")
+def index_query(
+    day: Optional[str],
+    since: Optional[str],
+    until: Optional[str],
+    author: Optional[str],
+    repo_path: Optional[str],
+    limit: Optional[int],
+    as_json: bool,
+):
+    """Query indexed commits across all repositories."""
+    with open_commit_index() as index:
+        if day:
+            parse_date(day)
+            commits = list(
+                index.commits_on_day(
+                    day, author=author, repo_path=repo_path, limit=limit
+                )
+            )
+        else:
+            commits = list(
+                index.query(
+                    parse_date(since),
+                    parse_date(until),
+                    author=author,
+                    repo_path=repo_path,
+                    limit=limit,
+                )
+            )
+
+    if as_json:
+        click.echo(json.dumps(commits, indent=2))
+        return
+    for commit_info in commits:
+        click.echo(
+            f"{commit_info['short_hash']} {commit_info['repo_name']:<24} "
+            f"{commit_info['author']:<20} {commit_info['subject']}"
+        )
+
+
+@cli.command()
+@click.option("--commits", default=200, show_default=True, help="Commits in the synthetic repository")
+@click.option("--files-per-commit", default=3, show_default=True, help="Files changed per commit")
+@click.option("--message-length", default=72, show_default=True, help="Commit message length")
+@click.option("--file-size", default=2000, show_default=True, help="Bytes per written file")
+@click.option("--seed", default=0, show_default=True, help="Seed of the synthetic repository")
+@click.option(
+    "--repo",
+    "repo_path",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Benchmark an existing repository instead",
+)
+@click.option(
+    "--publish-workers", default=4, show_default=True, help="Concurrent posts in the publish stage"
+)
+@click.option("--stage", "stages", multiple=True, help="Only run this stage (repeatable)")
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False), default=None, help="Write the JSON result here"
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="Earlier JSON result; exit 1 if a stage regressed",
+)
+@click.option(
+    "--tolerance",
+    default=0.2,
+    show_default=True,
+    help="Allowed slowdown against the baseline (fraction)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Print the result as JSON")
+def bench(
+    commits: int,
+    files_per_commit: int,
+    message_length: int,
+    file_size: int,
+    seed: int,
+    repo_path: Optional[str],
+    publish_workers: int,
+    stages: Tuple[str, ...],
+    output: Optional[str],
+    baseline: Optional[str],
+    tolerance: float,
+    as_json: bool,
+):
+    """Benchmark the pipeline stages on a synthetic repository (no LLM needed)."""
+    from . import bench as benchmarks
+
+    unknown = set(stages) - set(benchmarks.STAGES)
+    if unknown:
+        raise click.BadParameter(
+            f"unknown stage(s) {', '.join(sorted(unknown))}; "
+            f"choose from {', '.join(benchmarks.STAGES)}",
+            param_hint="--stage",
+        )
+
+    result = benchmarks.run_suite(
+        commits=commits,
+        files_per_commit=files_per_commit,
+        message_length=message_length,
+        file_size=file_size,
+        seed=seed,
+        publish_workers=publish_workers,
+        stages=stages or None,
+        repo_path=repo_path,
+    )
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+    if as_json:
+        click.echo(json.dumps(result, indent=2))
+    else:
+        click.echo(f"{'stage':<16}{'count':>7}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for stage, timing in result["stages"].items():
+            click.echo(
+                f"{stage:<16}{timing['count']:>7}{timing['throughput_per_s']:>12.1f}"
+                f"{timing['p50_ms']:>10.2f}{timing['p95_ms']:>10.2f}{timing['p99_ms']:>10.2f}"
+            )
+
+    if baseline:
+        with open(baseline) as f:
+            regressions = benchmarks.compare(json.load(f), result, tolerance)
+        for regression in regressions:
+            click.echo(f"{Colors.RED}Regression: {regression}{Colors.END}", err=True)
+        if regressions:
+            sys.exit(1)
+        click.echo(f"{Colors.GREEN}No regressions against {baseline}{Colors.END}", err=True)
+
+
+@cli.command("fake-server")
+@click.argument("kind", type=click.Choice(["wordpress", "ollama"]))
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to listen on")
+@click.option("--port", default=0, show_default=True, help="Port (0: any free port)")
+@click.option(
+    "--latency",
+    default="0",
+    show_default=True,
+    help="Response delay: SECONDS, uniform:LOW,HIGH, exp:MEAN or lognormal:MEDIAN,SIGMA",
+)
+@click.option("--error-rate", default=0.0, show_default=True, help="Fraction of HTTP 500s")
+@click.option("--throttle-rate", default=0.0, show_default=True, help="Fraction of HTTP 429s")
+@click.option("--retry-after", default=1.0, show_default=True, help="Retry-After of each 429 (s)")
+@click.option("--seed", default=0, show_default=True, help="Seed of the injected faults")
+@click.option("--no-batch", is_flag=True, help="WordPress: answer /batch/v1 with 404")
+@click.option("--tokens-per-sec", default=50.0, show_default=True, help="Ollama: generation speed")
+@click.option("--response-tokens", default=20, show_default=True, help="Ollama: tokens per answer")
+@click.option("--parallel", default=1, show_default=True, help="Ollama: generations at once")
+@click.option("--max-queue", type=int, default=None, help="Ollama: queued requests before 503s")
+@click.option(
+    "--disconnect-rate", default=0.0, show_default=True, help="Ollama: fraction of cut streams"
+)
+@click.option("--model", "models", multiple=True, help="Ollama: model name (repeatable)")
+def fake_server(
+    kind: str,
+    host: str,
+    port: int,
+    latency: str,
+    error_rate: float,
+    throttle_rate: float,
+    retry_after: float,
+    seed: int,
+    no_batch: bool,
+    tokens_per_sec: float,
+    response_tokens: int,
+    parallel: int,
+    max_queue: Optional[int],
+    disconnect_rate: float,
+    models: Tuple[str, ...],
+):
+    """Run a local fake WordPress or Ollama server for offline load tests."""
+    from . import fakes
+
+    try:
+        settings = {
+            "host": host,
+            "port": port,
+            "latency": fakes.Latency.parse(latency),
+            "error_rate": error_rate,
+            "throttle_rate": throttle_rate,
+            "retry_after": retry_after,
+            "seed": seed,
+        }
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--latency")
+
+    if kind == "wordpress":
+        server: fakes.FakeServer = fakes.FakeWordPress(
+            batch_supported=not no_batch, **settings
+        )
+        hint = f"WORDPRESS_URL={server.url}"
+    else:
+        server = fakes.FakeOllama(
+            models=list(models) or None,
+            tokens_per_sec=tokens_per_sec,
+            response_tokens=response_tokens,
+            parallel=parallel,
+            max_queue=max_queue,
+            disconnect_rate=disconnect_rate,
+            **settings,
+        )
+        hint = f"OLLAMA_SERVERS={server.url};model={server.models[0]}"
+    click.echo(f"{Colors.GREEN}Fake {kind} listening on {server.url}{Colors.END} ({hint})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    click.echo(f"Requests by status: {dict(sorted(server.statuses.items()))}")
+
+
 @cli.command()
 def test_connection():
     """Test connection to WordPress."""
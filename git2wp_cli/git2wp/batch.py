@@ -0,0 +1,149 @@
+"""
+Shared work queue for running many generations across several Ollama servers.
+
+Every configured server gets as many worker threads as its ``concurrency``
+setting, and all workers pull from one queue, so faster servers naturally
+take more jobs and throughput grows with the number of servers. Workers of a
+server whose circuit breaker is open leave the queue to the others until the
+breaker lets a trial request through. Throttled requests go back on the
+queue without using up one of their attempts.
+"""
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .llmcache import SummaryCache
+
+MAX_BACKOFF = 30.0
+BREAKER_POLL = 0.5
+
+
+class ServerBusyError(RuntimeError):
+    """A server throttled a generation (HTTP 429, or 503 for a full queue)."""
+
+
+class _Job:
+    __slots__ = ("index", "request", "attempts")
+
+    def __init__(self, index: int, request: Dict[str, Any]):
+        self.index = index
+        self.request = request
+        self.attempts = 0
+
+
+class ServerPool:
+    """Run generation requests on every server of an ``OllamaClient``."""
+
+    def __init__(self, client, max_attempts: Optional[int] = None):
+        """Create a pool.
+
+        Args:
+            client: ``OllamaClient`` whose servers, cache and health are used
+            max_attempts: Tries per request before giving up (default: one
+                more than the number of servers, at least 3)
+        """
+        self.client = client
+        self.servers = list(client.servers)
+        self.max_attempts = max_attempts or max(3, len(self.servers) + 1)
+
+    @property
+    def slots(self) -> int:
+        """Total number of concurrent generations across all servers."""
+        return sum(max(1, int(s.get("concurrency", 1))) for s in self.servers)
+
+    def map(self, requests: Sequence[Dict[str, Any]]) -> List[Union[str, Exception]]:
+        """Generate text for each request.
+
+        Args:
+            requests: Dicts with ``prompt`` and optional ``system_prompt`` and
+                ``options``
+
+        Returns:
+            List[Union[str, Exception]]: Generated text, or the last error,
+            for each request in input order
+        """
+        results: List[Union[str, Exception, None]] = [None] * len(requests)
+        if not requests:
+            return []
+        if not self.servers:
+            return [RuntimeError("No Ollama servers available")] * len(requests)
+
+        jobs: "queue.Queue[Optional[_Job]]" = queue.Queue()
+        for index, request in enumerate(requests):
+            jobs.put(_Job(index, request))
+
+        remaining = [len(requests)]
+        remaining_lock = threading.Lock()
+        finished = threading.Event()
+
+        def complete(job: _Job, result: Union[str, Exception]) -> None:
+            results[job.index] = result
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    finished.set()
+
+        health = self.client.health
+
+        def worker(server: Dict[str, Any]) -> None:
+            failures = 0
+            while not finished.is_set():
+                if not health.ready(server["url"]):
+                    finished.wait(BREAKER_POLL)
+                    continue
+                try:
+                    job = jobs.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if job is None:
+                    break
+                if not health.allow(server["url"]):
+                    # Another worker took the half-open trial meanwhile
+                    jobs.put(job)
+                    continue
+                try:
+                    text = self._run(server, job.request)
+                except ServerBusyError:
+                    # The server's limiter already holds it for Retry-After;
+                    # the request did not fail, so it keeps its attempts
+                    jobs.put(job)
+                except Exception as e:
+                    job.attempts += 1
+                    if job.attempts >= self.max_attempts:
+                        complete(job, e)
+                    else:
+                        jobs.put(job)
+                    # Back off so healthy servers pick up the requeued work
+                    failures += 1
+                    finished.wait(min(MAX_BACKOFF, 0.5 * 2 ** (failures - 1)))
+                else:
+                    failures = 0
+                    complete(job, text)
+
+        threads = [
+            threading.Thread(
+                target=worker, args=(server,), name=f"ollama-{server['name']}", daemon=True
+            )
+            for server in self.servers
+            for _ in range(max(1, int(server.get("concurrency", 1))))
+        ]
+        for thread in threads:
+            thread.start()
+        finished.wait()
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+        return results  # type: ignore[return-value]
+
+    def _run(self, server: Dict[str, Any], request: Dict[str, Any]) -> str:
+        prompt = request["prompt"]
+        system_prompt = request.get("system_prompt")
+        options = request.get("options")
+        payload = self.client._build_payload(server, prompt, system_prompt, options)
+        cache = self.client.cache
+        if cache is None:
+            return self.client._generate(server, payload)
+
+        key = SummaryCache.make_key(prompt, system_prompt, server["model"], options)
+        return cache.get_or_generate(key, lambda: self.client._generate(server, payload))
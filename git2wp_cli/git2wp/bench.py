@@ -0,0 +1,348 @@
+"""
+Reproducible benchmarks of the publish pipeline on synthetic repositories.
+
+A repository of configurable size is generated from a seed with a single
+``git fast-import`` stream, then each pipeline stage is timed on it:
+
+* ``extract_stream``: every commit from one ``git log`` process
+* ``extract_commit``: one ``git log`` lookup per commit (``get_commit``)
+* ``prompt``: budgeted diff extraction and prompt building
+* ``render``: HTML article rendering
+* ``publish``: ``POST /wp/v2/posts`` against a local fake WordPress site
+* ``publish_batch``: the same posts through ``/batch/v1``
+
+No LLM is involved, so results only depend on the machine and the code.
+Results are plain JSON; :func:`compare` reports the stages that got slower
+than a baseline file from an earlier release.
+"""
+import os
+import platform
+import random
+import string
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import __version__
+
+SCHEMA_VERSION = 1
+STAGES = (
+    "extract_stream",
+    "extract_commit",
+    "prompt",
+    "render",
+    "publish",
+    "publish_batch",
+)
+DEFAULT_TOLERANCE = 0.2
+# Epoch of the first synthetic commit; commits are one minute apart
+BASE_TIMESTAMP = 1_700_000_000
+WORDS = (
+    "fix add update refactor remove parser config cache client server handler "
+    "request response index queue worker retry timeout limit test docs build"
+).split()
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    words: List[str] = []
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)[:length] or "update"
+
+
+def _file_content(rng: random.Random, size: int) -> bytes:
+    lines = []
+    total = 0
+    while total < size:
+        line = "".join(rng.choice(string.ascii_letters + " ") for _ in range(60))
+        lines.append(line)
+        total += len(line) + 1
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def make_repo(
+    path: str,
+    commits: int = 100,
+    files_per_commit: int = 3,
+    message_length: int = 72,
+    file_size: int = 2000,
+    seed: int = 0,
+) -> List[str]:
+    """Create a synthetic repository at ``path``.
+
+    The same arguments always produce the same history (and commit SHAs).
+
+    Args:
+        path: Directory for the new repository
+        commits: Number of commits on ``main``
+        files_per_commit: Files added or modified by each commit
+        message_length: Length of each commit message in characters
+        file_size: Approximate size of each written file in bytes
+        seed: Seed for the generated names and contents
+
+    Returns:
+        List[str]: Commit SHAs, oldest first
+    """
+    rng = random.Random(seed)
+    pool = [
+        f"{rng.choice(('src', 'lib', 'docs', 'tests'))}/{rng.choice(WORDS)}_{n}.py"
+        for n in range(max(files_per_commit * 4, 20))
+    ]
+    stream: List[bytes] = []
+    for n in range(commits):
+        message = _sentence(rng, message_length).encode("utf-8")
+        when = f"{BASE_TIMESTAMP + 60 * n} +0000"
+        stream.append(
+            b"commit refs/heads/main\n"
+            + f"mark :{n + 1}\n".encode()
+            + f"author Bench <bench@example.com> {when}\n".encode()
+            + f"committer Bench <bench@example.com> {when}\n".encode()
+            + f"data {len(message)}\n".encode()
+            + message
+            + b"\n"
+        )
+        if n:
+            stream.append(f"from :{n}\n".encode())
+        for name in rng.sample(pool, min(files_per_commit, len(pool))):
+            content = _file_content(rng, file_size)
+            stream.append(
+                f"M 100644 inline {name}\ndata {len(content)}\n".encode() + content + b"\n"
+            )
+    stream.append(b"done\n")
+
+    os.makedirs(path, exist_ok=True)
+    subprocess.run(["git", "init", "-q", path], check=True)
+    marks = os.path.join(path, ".git", "bench-marks")
+    subprocess.run(
+        ["git", "-C", path, "fast-import", "--quiet", "--done", f"--export-marks={marks}"],
+        input=b"".join(stream),
+        check=True,
+    )
+    subprocess.run(["git", "-C", path, "symbolic-ref", "HEAD", "refs/heads/main"], check=True)
+    with open(marks) as f:
+        shas = dict(line.split() for line in f)
+    os.remove(marks)
+    return [shas[f":{n + 1}"] for n in range(commits)]
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies: List[float], wall: float) -> Dict[str, float]:
+    """Return count, throughput (items/s) and latency percentiles (ms)."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "count": count,
+        "wall_s": round(wall, 6),
+        "throughput_per_s": round(count / wall, 3) if wall > 0 else 0.0,
+        "mean_ms": round(1000 * sum(ordered) / count, 3) if count else 0.0,
+        "p50_ms": round(1000 * _percentile(ordered, 0.50), 3),
+        "p95_ms": round(1000 * _percentile(ordered, 0.95), 3),
+        "p99_ms": round(1000 * _percentile(ordered, 0.99), 3),
+        "max_ms": round(1000 * ordered[-1], 3) if count else 0.0,
+    }
+
+
+def _time_each(
+    items: Iterable[Any], run: Callable[[Any], Any], workers: int = 1
+) -> Dict[str, float]:
+    """Run ``run`` on each item and summarize the per-item latencies."""
+
+    def timed(item: Any) -> float:
+        start = time.perf_counter()
+        run(item)
+        return time.perf_counter() - start
+
+    items = list(items)
+    start = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(timed, items))
+    else:
+        latencies = [timed(item) for item in items]
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def _time_stream(items: Iterable[Any]) -> Dict[str, float]:
+    """Summarize the time between items of an iterator (time to each item)."""
+    latencies = []
+    start = last = time.perf_counter()
+    for _ in items:
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_benchmarks(
+    repo_path: str,
+    publish_workers: int = 4,
+    stages: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, float]]:
+    """Time every pipeline stage on the commits of ``repo_path``.
+
+    Args:
+        repo_path: Repository to read (usually made by :func:`make_repo`)
+        publish_workers: Concurrent requests for the ``publish`` stage
+        stages: Only run these stages (default: all)
+
+    Returns:
+        Dict[str, Dict[str, float]]: :func:`summarize` results by stage
+    """
+    from . import git2text, wordpress
+    from .fakes import FakeWordPress
+    from .gitlog import get_commit, iter_commits
+
+    selected = set(stages or STAGES)
+    repo_name = os.path.basename(os.path.abspath(repo_path))
+    results: Dict[str, Dict[str, float]] = {}
+
+    if "extract_stream" in selected:
+        results["extract_stream"] = _time_stream(iter_commits(repo_path, ["HEAD"]))
+    commits = list(iter_commits(repo_path, ["HEAD"]))
+
+    if "extract_commit" in selected:
+        results["extract_commit"] = _time_each(
+            commits, lambda c: get_commit(repo_path, c["hash"])
+        )
+
+    if "prompt" in selected:
+        # No servers: oversized diffs fall back to file-name notes instead of LLM calls
+        client = git2text.OllamaClient()
+        client.servers = []
+        client.cache = None
+        results["prompt"] = _time_each(
+            commits,
+            lambda c: git2text.prepare_commit_prompt(repo_name, c, client, repo_path),
+        )
+
+    articles = []
+
+    def render(commit_info: Dict[str, Any]) -> None:
+        summary = git2text.generate_simple_summary(repo_name, commit_info)
+        articles.append(
+            {
+                "title": commit_info.get("message", "").split("\n")[0][:100],
+                "content": git2text.render_commit_summary(repo_name, commit_info, summary),
+                "status": "draft",
+            }
+        )
+
+    if "render" in selected or {"publish", "publish_batch"} & selected:
+        timing = _time_each(commits, render)
+        if "render" in selected:
+            results["render"] = timing
+
+    if {"publish", "publish_batch"} & selected:
+        site = FakeWordPress().start()
+        client = wordpress.WordPressClient(
+            site.url, "bench", "bench", backoff=0, max_concurrency=max(1, publish_workers)
+        )
+        try:
+            if "publish" in selected:
+                results["publish"] = _time_each(
+                    articles, client.create_post, workers=publish_workers
+                )
+            if "publish_batch" in selected:
+                start = time.perf_counter()
+                client.batch([{"path": "/wp/v2/posts", "body": a} for a in articles])
+                wall = time.perf_counter() - start
+                # One latency per post: its share of the batch call it was sent in
+                results["publish_batch"] = summarize(
+                    [wall / len(articles)] * len(articles) if articles else [], wall
+                )
+        finally:
+            client.close()
+            site.stop()
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """Describe where the benchmark ran, for comparing results across hosts."""
+    git = subprocess.run(["git", "--version"], stdout=subprocess.PIPE, text=True)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count() or 1),
+        "git": git.stdout.strip(),
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Return the regressions of ``current`` against ``baseline``.
+
+    A stage regressed when its throughput fell, or its p95 latency rose, by
+    more than ``tolerance`` (a fraction). Stages missing from either result
+    are ignored.
+    """
+    regressions = []
+    for stage, now in current.get("stages", {}).items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        if before["throughput_per_s"] and now["throughput_per_s"] < before[
+            "throughput_per_s"
+        ] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: throughput {now['throughput_per_s']:.1f}/s "
+                f"< {before['throughput_per_s']:.1f}/s"
+            )
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: p95 {now['p95_ms']:.2f}ms > {before['p95_ms']:.2f}ms"
+            )
+    return regressions
+
+
+def run_suite(
+    commits: int = 100,
+    files_per_commit: int = 3,
+    message_length: int = 72,
+    file_size: int = 2000,
+    seed: int = 0,
+    publish_workers: int = 4,
+    stages: Optional[Iterable[str]] = None,
+    repo_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Generate a repository (unless ``repo_path`` is given) and benchmark it.
+
+    Returns:
+        Dict[str, Any]: JSON-serializable result with the version, the
+        environment, the parameters and the per-stage timings
+    """
+    params: Dict[str, Any] = {
+        "commits": commits,
+        "files_per_commit": files_per_commit,
+        "message_length": message_length,
+        "file_size": file_size,
+        "seed": seed,
+        "publish_workers": publish_workers,
+    }
+    if repo_path:
+        params = {"repo": os.path.abspath(repo_path), "publish_workers": publish_workers}
+        timings = run_benchmarks(repo_path, publish_workers, stages)
+    else:
+        with tempfile.TemporaryDirectory(prefix="git2wp-bench-") as tmp:
+            path = os.path.join(tmp, "repo")
+            make_repo(path, commits, files_per_commit, message_length, file_size, seed)
+            timings = run_benchmarks(path, publish_workers, stages)
+    return {
+        "schema": SCHEMA_VERSION,
+        "git2wp": __version__,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "environment": environment(),
+        "params": params,
+        "stages": timings,
+    }
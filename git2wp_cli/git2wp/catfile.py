@@ -0,0 +1,233 @@
+"""
+Persistent Git object reader backed by long-lived ``git cat-file`` processes.
+
+One ``git cat-file --batch`` (and, on demand, ``--batch-check``) process is
+kept open per repository, so looking up a commit, tree or blob costs a pipe
+round-trip instead of a fork+exec of ``git``.
+"""
+import atexit
+import os
+import subprocess
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from .gitlog import GitError
+
+TREE_MODE = "40000"
+
+
+class CatFileReader:
+    """Answer commit, tree and blob queries for one repository over a pipe."""
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._batch: Optional[subprocess.Popen] = None
+        self._batch_check: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self, mode: str) -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", "-C", self.repo_path, "cat-file", mode],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @staticmethod
+    def _request(proc: subprocess.Popen, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Send one object name; return ``(sha, type, size)``, None if missing."""
+        if "\n" in rev:
+            raise GitError(f"Invalid revision: {rev!r}")
+        try:
+            proc.stdin.write(rev.encode("utf-8") + b"\n")
+            proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise GitError(f"git cat-file exited unexpectedly: {e}")
+        header = proc.stdout.readline()
+        if not header:
+            raise GitError("git cat-file exited unexpectedly")
+        line = header.decode("utf-8", errors="replace").rstrip("\n")
+        # "<rev> missing" echoes the rev, which may itself contain spaces
+        if line.rpartition(" ")[2] in ("missing", "ambiguous"):
+            return None
+        sha, obj_type, size = line.split(" ")
+        return sha, obj_type, int(size)
+
+    def info(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Return ``(sha, type, size)`` for ``rev``, or None if it is missing."""
+        with self._lock:
+            if self._batch_check is None or self._batch_check.poll() is not None:
+                self._batch_check = self._start("--batch-check")
+            return self._request(self._batch_check, rev)
+
+    def read(self, rev: str) -> Tuple[str, str, bytes]:
+        """Return ``(sha, type, content)`` for ``rev``.
+
+        Raises:
+            GitError: If the object does not exist
+        """
+        with self._lock:
+            if self._batch is None or self._batch.poll() is not None:
+                self._batch = self._start("--batch")
+            header = self._request(self._batch, rev)
+            if header is None:
+                raise GitError(f"Object not found in {self.repo_path}: {rev}")
+            sha, obj_type, size = header
+            content = self._batch.stdout.read(size + 1)[:-1]
+        return sha, obj_type, content
+
+    def blob(self, rev: str) -> bytes:
+        """Return the content of a blob."""
+        _, obj_type, content = self.read(rev)
+        if obj_type != "blob":
+            raise GitError(f"Not a blob: {rev}")
+        return content
+
+    def tree(self, rev: str) -> Dict[str, Tuple[str, str]]:
+        """Return the entries of a tree as ``{name: (mode, sha)}``."""
+        sha, obj_type, content = self.read(rev)
+        if obj_type == "commit":
+            sha, obj_type, content = self.read(f"{sha}^{{tree}}")
+        if obj_type != "tree":
+            raise GitError(f"Not a tree: {rev}")
+
+        hash_size = len(sha) // 2
+        entries: Dict[str, Tuple[str, str]] = {}
+        pos = 0
+        while pos < len(content):
+            space = content.index(b" ", pos)
+            nul = content.index(b"\0", space)
+            mode = content[pos:space].decode("ascii")
+            name = content[space + 1 : nul].decode("utf-8", errors="replace")
+            entry_sha = content[nul + 1 : nul + 1 + hash_size].hex()
+            entries[name] = (mode, entry_sha)
+            pos = nul + 1 + hash_size
+        return entries
+
+    def commit(self, rev: str = "HEAD") -> Dict[str, Any]:
+        """Return the parsed headers and message of a commit."""
+        sha, obj_type, content = self.read(f"{rev}^{{commit}}")
+        text = content.decode("utf-8", errors="replace")
+        headers, _, message = text.partition("\n\n")
+
+        commit: Dict[str, Any] = {"hash": sha, "parents": []}
+        for line in headers.splitlines():
+            if line.startswith(" "):
+                continue  # continuation of a multi-line header (e.g. gpgsig)
+            key, _, value = line.partition(" ")
+            if key == "tree":
+                commit["tree"] = value
+            elif key == "parent":
+                commit["parents"].append(value)
+            elif key == "author":
+                commit.update(_parse_signature(value))
+
+        subject, _, body = message.partition("\n")
+        commit["subject"] = subject.strip()
+        commit["body"] = body.strip("\n")
+        return commit
+
+    def diff_trees(
+        self, old_tree: Optional[str], new_tree: Optional[str], prefix: str = ""
+    ) -> List[Dict[str, Any]]:
+        """List changed paths between two trees (no rename detection)."""
+        old_entries = self.tree(old_tree) if old_tree else {}
+        new_entries = self.tree(new_tree) if new_tree else {}
+        changes: List[Dict[str, Any]] = []
+
+        for name in sorted(set(old_entries) | set(new_entries)):
+            old = old_entries.get(name)
+            new = new_entries.get(name)
+            if old == new:
+                continue
+            path = f"{prefix}{name}"
+            old_is_tree = old is not None and old[0] == TREE_MODE
+            new_is_tree = new is not None and new[0] == TREE_MODE
+
+            if old_is_tree or new_is_tree:
+                changes.extend(
+                    self.diff_trees(
+                        old[1] if old_is_tree else None,
+                        new[1] if new_is_tree else None,
+                        f"{path}/",
+                    )
+                )
+                if old is not None and not old_is_tree:
+                    changes.append({"status": "D", "path": path})
+                if new is not None and not new_is_tree:
+                    changes.append({"status": "A", "path": path})
+            elif old is None:
+                changes.append({"status": "A", "path": path})
+            elif new is None:
+                changes.append({"status": "D", "path": path})
+            else:
+                changes.append({"status": "M", "path": path})
+
+        return changes
+
+    def commit_info(self, rev: str = "HEAD") -> Dict[str, Any]:
+        """Return commit information in the same shape as ``get_commit_info``."""
+        commit = self.commit(rev)
+        parent_tree = None
+        if commit["parents"]:
+            parent_tree = self.commit(commit["parents"][0])["tree"]
+        commit["short_hash"] = commit["hash"][:7]
+        commit["changed_files"] = self.diff_trees(parent_tree, commit["tree"])
+        return commit
+
+    def close(self) -> None:
+        """Terminate the underlying ``git cat-file`` processes."""
+        with self._lock:
+            for proc in (self._batch, self._batch_check):
+                if proc is None:
+                    continue
+                try:
+                    proc.stdin.close()
+                    proc.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    proc.kill()
+                proc.stdout.close()
+            self._batch = None
+            self._batch_check = None
+
+
+def _parse_signature(value: str) -> Dict[str, Any]:
+    """Parse ``Name <email> <timestamp> <tz>`` into author fields."""
+    name, _, rest = value.partition(" <")
+    email, _, when = rest.partition("> ")
+    timestamp_str, _, tz = when.partition(" ")
+    timestamp = int(timestamp_str or 0)
+
+    date = ""
+    if tz:
+        sign = -1 if tz.startswith("-") else 1
+        offset = timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5])) * sign
+        dt = datetime.fromtimestamp(timestamp, timezone(offset))
+        # Same layout as git's default date format
+        date = f"{dt:%a %b} {dt.day} {dt:%H:%M:%S %Y} {tz}"
+
+    return {"author": name, "email": email, "timestamp": timestamp, "date": date}
+
+
+_readers: Dict[str, CatFileReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_reader(repo_path: str) -> CatFileReader:
+    """Return the shared reader for ``repo_path``, starting it if needed."""
+    key = os.path.realpath(repo_path)
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            reader = _readers[key] = CatFileReader(key)
+        return reader
+
+
+@atexit.register
+def close_all() -> None:
+    """Close every reader opened by :func:`get_reader`."""
+    with _readers_lock:
+        for reader in _readers.values():
+            reader.close()
+        _readers.clear()
@@ -0,0 +1,245 @@
+"""
+Local SQLite index of commits across repositories.
+
+Each repository's history is ingested incrementally from the last-seen commit
+forward, using the streaming ``git log`` parser. Rows are returned in the same
+shape as ``get_commit_info`` so they can be fed straight into the summary and
+publishing code.
+"""
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import gitlog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    last_sha TEXT,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS commits (
+    repo_id INTEGER NOT NULL REFERENCES repos(id),
+    hash TEXT NOT NULL,
+    short_hash TEXT NOT NULL,
+    author TEXT NOT NULL,
+    email TEXT NOT NULL,
+    date TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    body TEXT NOT NULL,
+    parents TEXT NOT NULL,
+    changed_files TEXT NOT NULL,
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL,
+    PRIMARY KEY (repo_id, hash)
+);
+CREATE INDEX IF NOT EXISTS commits_timestamp ON commits (timestamp);
+CREATE INDEX IF NOT EXISTS commits_author ON commits (author, timestamp);
+"""
+
+COMMIT_COLUMNS = (
+    "hash",
+    "short_hash",
+    "author",
+    "email",
+    "date",
+    "timestamp",
+    "subject",
+    "body",
+    "parents",
+    "changed_files",
+    "additions",
+    "deletions",
+)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class CommitIndex:
+    """SQLite-backed commit store with incremental per-repository ingestion."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "CommitIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _repo_row(self, repo_path: str) -> sqlite3.Row:
+        path = os.path.realpath(repo_path)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO repos (path, name) VALUES (?, ?)",
+                (path, os.path.basename(path)),
+            )
+        return self.conn.execute(
+            "SELECT * FROM repos WHERE path = ?", (path,)
+        ).fetchone()
+
+    def ingest(self, repo_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Add commits reachable from HEAD that are not yet indexed.
+
+        Args:
+            repo_path: Path to the Git repository
+            batch_size: Number of rows per ``executemany`` call
+
+        Returns:
+            int: Number of commits read from git
+
+        Raises:
+            GitError: If ``git log`` fails
+        """
+        repo = self._repo_row(repo_path)
+        revisions = [f"{repo['last_sha']}..HEAD"] if repo["last_sha"] else None
+        try:
+            return self._ingest(repo, revisions, batch_size)
+        except gitlog.GitError:
+            if revisions is None:
+                raise
+            # The last-seen commit is gone (history rewritten): start over
+            return self._ingest(repo, None, batch_size)
+
+    def _ingest(
+        self, repo: sqlite3.Row, revisions: Optional[List[str]], batch_size: int
+    ) -> int:
+        newest_sha = None
+        count = 0
+        batch: List[tuple] = []
+        with self.conn:
+            for commit_info in gitlog.iter_commits(repo["path"], revisions):
+                if newest_sha is None:
+                    newest_sha = commit_info["hash"]
+                batch.append(_to_row(repo["id"], commit_info))
+                count += 1
+                if len(batch) >= batch_size:
+                    self._insert(batch)
+                    batch = []
+            if batch:
+                self._insert(batch)
+            self.conn.execute(
+                "UPDATE repos SET last_sha = COALESCE(?, last_sha), updated_at = ? "
+                "WHERE id = ?",
+                (newest_sha, time.time(), repo["id"]),
+            )
+        return count
+
+    def _insert(self, rows: List[tuple]) -> None:
+        placeholders = ", ".join("?" * (len(COMMIT_COLUMNS) + 1))
+        self.conn.executemany(
+            f"INSERT OR IGNORE INTO commits (repo_id, {', '.join(COMMIT_COLUMNS)}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        author: Optional[str] = None,
+        repo_path: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield indexed commits, oldest first.
+
+        Args:
+            since: Only include commits at or after this Unix timestamp
+            until: Only include commits before this Unix timestamp
+            author: Only include commits whose author name or email matches
+            repo_path: Only include commits from this repository
+            limit: Maximum number of commits to return
+        """
+        clauses = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("c.timestamp >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("c.timestamp < ?")
+            params.append(int(until))
+        if author:
+            clauses.append("(c.author = ? OR c.email = ?)")
+            params.extend([author, author])
+        if repo_path:
+            clauses.append("r.path = ?")
+            params.append(os.path.realpath(repo_path))
+
+        sql = (
+            "SELECT c.*, r.path AS repo_path, r.name AS repo_name "
+            "FROM commits c JOIN repos r ON r.id = c.repo_id"
+        )
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY c.timestamp, r.name, c.rowid DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        for row in self.conn.execute(sql, params):
+            yield _from_row(row)
+
+    def commits_on_day(self, day: str, **filters) -> Iterator[Dict[str, Any]]:
+        """Yield commits from every repository on a local ``YYYY-MM-DD`` day."""
+        start = datetime.strptime(day, "%Y-%m-%d")
+        end = start + timedelta(days=1)
+        return self.query(since=start.timestamp(), until=end.timestamp(), **filters)
+
+    def get_commit(self, repo_path: str, sha: str) -> Optional[Dict[str, Any]]:
+        """Return an indexed commit by full or abbreviated hash."""
+        rows = list(
+            self.conn.execute(
+                "SELECT c.*, r.path AS repo_path, r.name AS repo_name "
+                "FROM commits c JOIN repos r ON r.id = c.repo_id "
+                "WHERE r.path = ? AND c.hash LIKE ? LIMIT 2",
+                (os.path.realpath(repo_path), f"{sha}%"),
+            )
+        )
+        return _from_row(rows[0]) if len(rows) == 1 else None
+
+    def repositories(self) -> Iterable[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM repos ORDER BY name").fetchall()
+
+
+def _to_row(repo_id: int, commit_info: Dict[str, Any]) -> tuple:
+    changed_files = commit_info.get("changed_files", [])
+    return (
+        repo_id,
+        commit_info["hash"],
+        commit_info["short_hash"],
+        commit_info["author"],
+        commit_info["email"],
+        commit_info["date"],
+        commit_info["timestamp"],
+        commit_info["subject"],
+        commit_info["body"],
+        " ".join(commit_info.get("parents", [])),
+        json.dumps(changed_files, separators=(",", ":")),
+        sum(c.get("additions") or 0 for c in changed_files),
+        sum(c.get("deletions") or 0 for c in changed_files),
+    )
+
+
+def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    commit_info = {key: row[key] for key in COMMIT_COLUMNS}
+    commit_info["parents"] = commit_info["parents"].split()
+    commit_info["changed_files"] = json.loads(commit_info["changed_files"])
+    commit_info["repo_path"] = row["repo_path"]
+    commit_info["repo_name"] = row["repo_name"]
+    return commit_info
@@ -0,0 +1,151 @@
+"""
+Configuration for the git2wp CLI.
+
+``~/.config/git2wp/.env`` is loaded at most once per process, and the
+environment is parsed and validated into a single cached dict on first use.
+This module only depends on the standard library (``python-dotenv`` is
+imported only when the .env file exists), so it is cheap to import from
+every entry point, including git hooks.
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+ENV_PATH = Path.home() / ".config" / "git2wp" / ".env"
+
+GIT_BACKENDS = ("subprocess", "catfile")
+
+_env_loaded = False
+_config: Optional[Dict[str, Any]] = None
+_lock = threading.Lock()
+
+
+class ConfigError(ValueError):
+    """Raised when an environment variable has an invalid value."""
+
+
+def load_env(path: Optional[Path] = None) -> None:
+    """Load the .env file into ``os.environ`` (only the first call does anything)."""
+    global _env_loaded
+    with _lock:
+        if _env_loaded:
+            return
+        _env_loaded = True
+        env_path = path or ENV_PATH
+        if env_path.exists():
+            from dotenv import load_dotenv
+
+            load_dotenv(env_path, override=True)
+
+
+def _int(name: str, default: int, minimum: int = 0) -> int:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be an integer, got {value!r}")
+    if number < minimum:
+        raise ConfigError(f"{name} must be at least {minimum}, got {number}")
+    return number
+
+
+def _float(name: str, default: float, minimum: float = 0.0) -> float:
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        number = float(value)
+    except ValueError:
+        raise ConfigError(f"{name} must be a number, got {value!r}")
+    if number < minimum:
+        raise ConfigError(f"{name} must be at least {minimum}, got {number}")
+    return number
+
+
+def _bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return value in ("1", "true", "yes", "on")
+
+
+def _choice(name: str, default: str, choices: Sequence[str]) -> str:
+    value = os.getenv(name, "").strip().lower() or default
+    if value not in choices:
+        raise ConfigError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def build_config() -> Dict[str, Any]:
+    """Parse the environment into the CLI configuration.
+
+    Raises:
+        ConfigError: If a variable has an invalid value
+    """
+    load_env()
+    url = os.getenv("WORDPRESS_URL", "").strip().rstrip("/")
+    if url and not url.startswith(("http://", "https://")):
+        raise ConfigError(f"WORDPRESS_URL must start with http:// or https://, got {url!r}")
+    data_dir = os.path.expanduser(
+        os.getenv("GIT2WP_DATA_DIR", str(Path.home() / ".config" / "git2wp"))
+    )
+    return {
+        "wordpress_url": url,
+        "wordpress_username": os.getenv("WORDPRESS_USERNAME", ""),
+        "wordpress_password": os.getenv("WORDPRESS_PASSWORD", ""),
+        "wordpress_token": os.getenv("WORDPRESS_TOKEN", ""),
+        "wordpress_application_password": os.getenv("WORDPRESS_APPLICATION_PASSWORD", ""),
+        "auth_method": os.getenv("WORDPRESS_AUTH_METHOD", "basic").lower(),
+        "git_path": os.path.expanduser(os.getenv("GIT_PATH", str(Path.home() / "github"))),
+        "wordpress_debug": _bool("WORDPRESS_DEBUG"),
+        "git_backend": _choice("GIT_BACKEND", "subprocess", GIT_BACKENDS),
+        "data_dir": data_dir,
+        # Where git2wp-hook queues commits for ``git2wp worker``
+        "spool_dir": os.path.expanduser(
+            os.getenv("GIT2WP_SPOOL_DIR", os.path.join(data_dir, "spool"))
+        ),
+        # Publish job queue; JOBS_DB_SHARED=1 when workers on several hosts
+        # share it over a network filesystem (WAL only works on one host)
+        "jobs_db": os.path.expanduser(
+            os.getenv("GIT2WP_JOBS_DB", os.path.join(data_dir, "jobs.db"))
+        ),
+        "jobs_shared": _bool("JOBS_DB_SHARED"),
+        # Pipeline metrics served by public/simple_server.py at /metrics
+        "metrics_enabled": _bool("METRICS_ENABLED", True),
+        "metrics_db": os.path.expanduser(
+            os.getenv("GIT2WP_METRICS_DB", os.path.join(data_dir, "metrics.db"))
+        ),
+        "job_lease": _float("JOB_LEASE", 600.0, minimum=1.0),
+        "job_max_attempts": _int("JOB_MAX_ATTEMPTS", 5, minimum=1),
+        "max_projects_scan": _int("MAX_PROJECTS_SCAN", 0) or None,
+        # WORDPRESS_TIMEOUT is in milliseconds
+        "wordpress_timeout": _int("WORDPRESS_TIMEOUT", 30000, minimum=1) / 1000,
+        "wordpress_retries": _int("WORDPRESS_RETRIES", 3),
+        # Requests per second (0 = unlimited) and the ceiling of the adaptive
+        # concurrency limit shared by all workers of a process
+        "wordpress_rate": _float("WORDPRESS_RATE", 0.0),
+        "wordpress_max_concurrency": _int("WORDPRESS_MAX_CONCURRENCY", 8, minimum=1),
+        "taxonomy_ttl": _float("TAXONOMY_TTL", 3600.0),
+        # Generations per second per Ollama server (0 = unlimited)
+        "ollama_rate": _float("OLLAMA_RATE", 0.0),
+        # LLM generation cache (llm-cache.db in the data directory)
+        "enable_cache": _bool("ENABLE_CACHE"),
+        "cache_ttl": _float("CACHE_TTL", 3600.0),
+        "cache_max_bytes": _int("CACHE_MAX_BYTES", 100 * 1024 * 1024),
+        # Diff bytes per prompt, per file and per commit
+        "diff_budget_bytes": _int("DIFF_BUDGET_BYTES", 24_000),
+        "diff_file_bytes": _int("DIFF_FILE_BYTES", 4_000),
+        "diff_max_bytes": _int("DIFF_MAX_BYTES", 120_000),
+        "digest_token_budget": _int("DIGEST_TOKEN_BUDGET", 3000, minimum=100),
+    }
+
+
+def get_config(reload: bool = False) -> Dict[str, Any]:
+    """Return the process-wide configuration, parsing it on first use."""
+    global _config
+    if _config is None or reload:
+        _config = build_config()
+    return _config
@@ -0,0 +1,223 @@
+"""
+Budgeted diff extraction for commit summaries.
+
+A commit's patch is streamed from a single ``git diff-tree`` process and cut
+into per-file sections. Generated files are excluded up front, binary
+sections are dropped, every file is truncated to a per-file budget, and
+reading stops (killing git) once the total budget is used, so the cost of a
+commit is bounded no matter how many files it touches. Long file lists are
+collapsed into per-directory aggregates for the prompt.
+"""
+import fnmatch
+import os
+import subprocess
+import tempfile
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from .gitlog import GitError
+
+# Total diff bytes per prompt, per file, and per commit (across map calls)
+DEFAULT_PROMPT_BUDGET = 24_000
+DEFAULT_FILE_BUDGET = 4_000
+DEFAULT_MAX_BYTES = 120_000
+# Above this many files, the file list is aggregated per directory
+FILE_LIST_LIMIT = 100
+
+GENERATED_PATTERNS = (
+    "*.lock",
+    "package-lock.json",
+    "pnpm-lock.yaml",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.pb.go",
+    "*_pb2.py",
+    "*.snap",
+    "dist/*",
+    "build/*",
+    "vendor/*",
+    "node_modules/*",
+)
+
+
+def is_generated(path: str) -> bool:
+    """Return True for lockfiles, minified bundles, vendored and build output."""
+    name = os.path.basename(path)
+    for pattern in GENERATED_PATTERNS:
+        if pattern.endswith("/*"):
+            if f"/{pattern[:-2]}/" in f"/{path}":
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+
+def _exclude_pathspecs() -> List[str]:
+    specs = []
+    for pattern in GENERATED_PATTERNS:
+        if pattern.endswith("/*"):
+            specs.append(f":(exclude,glob)**/{pattern[:-2]}/**")
+        else:
+            specs.append(f":(exclude,glob)**/{pattern}")
+    return specs
+
+
+def _change_path(change: Any) -> Tuple[str, str]:
+    if isinstance(change, dict):
+        return change.get("status", "?"), change.get("path", change.get("file", ""))
+    status, _, path = str(change).partition(" ")
+    return status, path
+
+
+def describe_changed_files(
+    changed_files: Sequence[Any], limit: int = FILE_LIST_LIMIT
+) -> List[str]:
+    """Return prompt lines for the changed files.
+
+    Up to ``limit`` files are listed one per line (generated files last);
+    larger commits get one line per directory with file counts by status and
+    line totals instead.
+    """
+    if len(changed_files) <= limit:
+        lines = [" ".join(_change_path(change)) for change in changed_files]
+        return sorted(lines, key=lambda line: is_generated(line.partition(" ")[2]))
+
+    directories: Dict[str, Dict[str, Any]] = {}
+    for change in changed_files:
+        status, path = _change_path(change)
+        parts = path.split("/")
+        directory = "/".join(parts[:2]) + "/" if len(parts) > 2 else (
+            parts[0] + "/" if len(parts) == 2 else "./"
+        )
+        entry = directories.setdefault(
+            directory, {"files": 0, "statuses": {}, "additions": 0, "deletions": 0}
+        )
+        entry["files"] += 1
+        entry["statuses"][status[:1]] = entry["statuses"].get(status[:1], 0) + 1
+        if isinstance(change, dict):
+            entry["additions"] += change.get("additions") or 0
+            entry["deletions"] += change.get("deletions") or 0
+
+    ranked = sorted(directories.items(), key=lambda item: -item[1]["files"])
+    lines = []
+    for directory, entry in ranked[:limit]:
+        statuses = ", ".join(
+            f"{count} {status}" for status, count in sorted(entry["statuses"].items())
+        )
+        lines.append(
+            f"{directory} ({entry['files']} files: {statuses}; "
+            f"+{entry['additions']}/-{entry['deletions']})"
+        )
+    if len(ranked) > limit:
+        rest = sum(entry["files"] for _, entry in ranked[limit:])
+        lines.append(f"... {len(ranked) - limit} more directories ({rest} files)")
+    return lines
+
+
+def _section_path(header: str) -> str:
+    # "diff --git a/<path> b/<path>"; take the new path
+    _, _, path = header.rstrip("\n").rpartition(" b/")
+    return path.strip('"')
+
+
+def _finish(path: str, lines: List[str], size: int, file_budget: int) -> Tuple[str, str]:
+    text = "".join(lines)
+    if size > file_budget:
+        text += f"... ({size - len(text.encode('utf-8'))} more bytes truncated)\n"
+    return path, text
+
+
+def _diff_tree_command(repo_path: str, commit_hash: str) -> List[str]:
+    return [
+        "git", "-C", repo_path, "-c", "core.quotepath=off",
+        "diff-tree", "-p", "-M", "--root", "-m", "--first-parent",
+        "--no-color", "--no-commit-id", "--no-ext-diff", commit_hash,
+        "--", ".", *_exclude_pathspecs(),
+    ]
+
+
+def iter_file_diffs(
+    repo_path: str,
+    commit_hash: str,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    file_budget: int = DEFAULT_FILE_BUDGET,
+) -> Iterator[Tuple[str, str]]:
+    """Stream ``(path, diff)`` sections of a commit against its first parent.
+
+    Args:
+        repo_path: Path to the Git repository
+        commit_hash: Commit to diff
+        max_bytes: Stop once this many diff bytes have been yielded
+        file_budget: Maximum bytes kept per file
+
+    Raises:
+        GitError: If ``git diff-tree`` fails
+    """
+    # stderr goes to a file: rename-limit notices and other warnings on a
+    # large commit would fill a pipe and block git while we read stdout
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            _diff_tree_command(repo_path, commit_hash),
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+        )
+        used = 0
+        try:
+            path = None
+            lines: List[str] = []
+            size = 0
+            binary = False
+            for raw in proc.stdout:
+                line = raw.decode("utf-8", errors="replace")
+                if line.startswith("diff --git "):
+                    if path is not None and not binary and not is_generated(path):
+                        section = _finish(path, lines, size, file_budget)
+                        used += len(section[1].encode("utf-8"))
+                        yield section
+                        if used >= max_bytes:
+                            return
+                    path, lines, size, binary = _section_path(line), [line], len(raw), False
+                    continue
+                if line.startswith(("Binary files ", "GIT binary patch")):
+                    binary = True
+                size += len(raw)
+                if size <= file_budget:
+                    lines.append(line)
+            if path is not None and not binary and not is_generated(path):
+                yield _finish(path, lines, size, file_budget)
+
+            if proc.wait() != 0:
+                stderr.seek(0)
+                raise GitError(
+                    f"git diff-tree failed in {repo_path}: "
+                    f"{stderr.read().decode('utf-8', errors='replace').strip()}"
+                )
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+
+def group_diffs(
+    file_diffs: List[Tuple[str, str]], budget: int = DEFAULT_PROMPT_BUDGET
+) -> List[List[Tuple[str, str]]]:
+    """Pack file sections, in order, into groups of at most ``budget`` bytes."""
+    groups: List[List[Tuple[str, str]]] = []
+    current: List[Tuple[str, str]] = []
+    size = 0
+    for path, text in file_diffs:
+        length = len(text.encode("utf-8"))
+        if current and size + length > budget:
+            groups.append(current)
+            current, size = [], 0
+        current.append((path, text))
+        size += length
+    if current:
+        groups.append(current)
+    return groups
+
+
+def render_diffs(file_diffs: List[Tuple[str, str]]) -> str:
+    return "".join(text for _, text in file_diffs)
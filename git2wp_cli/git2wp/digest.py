@@ -0,0 +1,209 @@
+"""
+Daily and weekly digests of many commits.
+
+Commits are grouped by period (and optionally repository). Each group is
+summarized map-reduce style: commit descriptions are packed into chunks that
+fit a prompt budget, the chunks are summarized in parallel across every
+Ollama server, and one reduce pass turns the partial summaries into a single
+article. Groups that fit in one chunk need a single generation.
+"""
+import html
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .batch import ServerPool
+
+# Rough prompt size estimate; good enough for budgeting English text and code
+CHARS_PER_TOKEN = 4
+DEFAULT_TOKEN_BUDGET = 3000
+PERIODS = ("day", "week")
+
+MAP_SYSTEM_PROMPT = """You are a technical writer. Summarize the Git commits you are
+    given into concise notes: group related changes, keep concrete details (features,
+    fixes, refactorings, affected components) and drop noise. Answer in plain text."""
+
+REDUCE_SYSTEM_PROMPT = """You are a technical writer. Write one informative article
+    about the development activity described in the notes you are given. Explain the
+    most important changes and their significance, professional yet accessible.
+    Use proper HTML formatting with appropriate headings, paragraphs, and lists."""
+
+
+def period_key(timestamp: float, period: str) -> str:
+    """Return the local day (``2024-05-31``) or ISO week (``2024-W22``) of a time."""
+    moment = datetime.fromtimestamp(timestamp)
+    if period == "week":
+        year, week, _ = moment.isocalendar()
+        return f"{year}-W{week:02d}"
+    return moment.strftime("%Y-%m-%d")
+
+
+def group_commits(
+    commits: Iterable[Dict[str, Any]], period: str, by_repo: bool = False
+) -> Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]]:
+    """Group commits by ``(period key, repository name or None)``.
+
+    Groups and the commits inside them keep their input order.
+    """
+    groups: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]] = {}
+    for commit_info in commits:
+        key = (
+            period_key(commit_info["timestamp"], period),
+            commit_info.get("repo_name") if by_repo else None,
+        )
+        groups.setdefault(key, []).append(commit_info)
+    return groups
+
+
+def _line_counts(commit_info: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """Return ``(additions, deletions)``, or None when they are unknown.
+
+    Index rows carry totals; commits from the ``git log`` stream only have the
+    per-file numstat counts, which are None for binary files.
+    """
+    if commit_info.get("additions") is not None:
+        return commit_info["additions"], commit_info.get("deletions") or 0
+    counted = [
+        change
+        for change in commit_info.get("changed_files", [])
+        if change.get("additions") is not None
+    ]
+    if not counted:
+        return None
+    return (
+        sum(change["additions"] for change in counted),
+        sum(change["deletions"] or 0 for change in counted),
+    )
+
+
+def describe_commit(commit_info: Dict[str, Any]) -> str:
+    """Render a commit as a compact block for a map prompt."""
+    files = commit_info.get("changed_files", [])
+    repo = f"[{commit_info['repo_name']}] " if commit_info.get("repo_name") else ""
+    counts = _line_counts(commit_info)
+    lines = f", +{counts[0]}/-{counts[1]}" if counts else ""
+    text = (
+        f"- {repo}{commit_info['short_hash']} {commit_info['subject']} "
+        f"({commit_info['author']}, {len(files)} files{lines})"
+    )
+    body = commit_info.get("body", "").strip()
+    if body:
+        text += "\n  " + "\n  ".join(body.splitlines()[:10])
+    paths = [change.get("path", "") for change in files[:20]]
+    if paths:
+        text += "\n  files: " + ", ".join(paths)
+        if len(files) > len(paths):
+            text += f" (+{len(files) - len(paths)} more)"
+    return text
+
+
+def pack(texts: List[str], budget_chars: int) -> List[List[str]]:
+    """Split texts into consecutive chunks of at most ``budget_chars``.
+
+    A single text larger than the budget is truncated to fit on its own.
+    """
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for text in texts:
+        text = text[:budget_chars]
+        if current and size + len(text) + 1 > budget_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _map_request(label: str, texts: List[str]) -> Dict[str, Any]:
+    return {
+        "system_prompt": MAP_SYSTEM_PROMPT,
+        "prompt": f"Commits for {label}:\n\n" + "\n".join(texts),
+    }
+
+
+def _reduce_request(label: str, notes: List[str], commit_count: int) -> Dict[str, Any]:
+    return {
+        "system_prompt": REDUCE_SYSTEM_PROMPT,
+        "prompt": (
+            f"Write the development digest for {label} ({commit_count} commits) "
+            "from these notes:\n\n" + "\n\n".join(notes)
+        ),
+    }
+
+
+def summarize_group(
+    client,
+    label: str,
+    commits: List[Dict[str, Any]],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> str:
+    """Produce one article for a group of commits.
+
+    Args:
+        client: ``OllamaClient`` whose servers run the generations
+        label: Human readable description of the group, used in prompts
+        commits: Commits in the group
+        token_budget: Approximate prompt size limit for every generation
+
+    Returns:
+        str: The generated article (HTML)
+
+    Raises:
+        Exception: If the final generation fails on every server
+    """
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    pool = ServerPool(client)
+    texts = [describe_commit(commit_info) for commit_info in commits]
+    chunks = pack(texts, budget_chars)
+    if len(chunks) == 1:
+        # Small group: the article can be written straight from the commits
+        request = _reduce_request(label, chunks[0], len(commits))
+        return _unwrap(pool.map([request])[0])
+
+    # Map: summarize every chunk in parallel; keep the raw text of failed chunks
+    notes = [
+        result if isinstance(result, str) else "\n".join(chunk)[:budget_chars // len(chunks)]
+        for chunk, result in zip(
+            chunks, pool.map([_map_request(label, chunk) for chunk in chunks])
+        )
+    ]
+    # Partial summaries that still exceed the budget are condensed again
+    while len(notes) > 1 and sum(len(note) + 2 for note in notes) > budget_chars:
+        groups = pack(notes, budget_chars)
+        if len(groups) == len(notes):
+            notes = [note[:budget_chars // len(notes)] for note in notes]
+            break
+        notes = [
+            result if isinstance(result, str) else "\n\n".join(group)
+            for group, result in zip(
+                groups, pool.map([_map_request(label, group) for group in groups])
+            )
+        ]
+
+    return _unwrap(pool.map([_reduce_request(label, notes, len(commits))])[0])
+
+
+def _unwrap(result: Any) -> str:
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def render_digest(
+    label: str, commits: List[Dict[str, Any]], article: Optional[str]
+) -> str:
+    """Combine the article (or a plain fallback) with the list of commits."""
+    content = article or f"<p>{len(commits)} commits in {html.escape(label)}.</p>"
+    content += "\n\n<h3>Commits</h3><ul>"
+    for commit_info in commits:
+        repo = commit_info.get("repo_name")
+        prefix = f"{html.escape(repo)}: " if repo else ""
+        content += (
+            f"<li>{prefix}<code>{commit_info['short_hash']}</code> "
+            f"{html.escape(commit_info['subject'])} "
+            f"<em>({html.escape(commit_info['author'])})</em></li>"
+        )
+    content += "</ul>"
+    return content
@@ -0,0 +1,631 @@
+"""
+Local fake WordPress and Ollama servers for offline load tests.
+
+:class:`FakeWordPress` implements the REST routes Git2WP uses (posts,
+categories and tags with ETags and pagination, ``users/me`` and
+``/batch/v1``); :class:`FakeOllama` implements ``/api/generate`` (streaming
+and not), ``/api/version`` and ``/api/ps`` with a configurable token speed
+and number of parallel generations.
+
+Both take the same fault settings: a latency distribution, a fraction of
+requests answered with a 500, and a fraction throttled with a 429 and a
+``Retry-After``. Decisions come from a seeded random generator, so a run
+with the same settings and request order is reproducible. Tests that need
+one specific answer queue it with :meth:`FakeServer.respond_next`::
+
+    with FakeOllama(latency="lognormal:0.2,0.8", throttle_rate=0.05, seed=1) as ollama:
+        client.servers = [{"url": ollama.url, ...}]
+
+``git2wp fake-server wordpress|ollama`` runs one in the foreground.
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qs, urlsplit
+
+MAX_BATCH_SIZE = 25
+FAKE_OLLAMA_VERSION = "0.6.0-fake"
+
+Response = Tuple[int, Any, Dict[str, str]]
+# Scripted "response" that closes the connection without answering
+DISCONNECT: Response = (0, None, {})
+
+
+class Request(NamedTuple):
+    """A request received by a fake server."""
+
+    method: str
+    path: str
+    body: Any
+    headers: Dict[str, str]
+    client: Tuple[str, int]
+
+
+class Latency:
+    """A response delay distribution, parsed from a spec string.
+
+    Specs are ``fixed:S`` (or just ``S``), ``uniform:LOW,HIGH``, ``exp:MEAN``
+    and ``lognormal:MEDIAN,SIGMA``; all values are seconds except ``SIGMA``.
+    ``lognormal`` gives the long tail real backends have.
+    """
+
+    KINDS = ("fixed", "uniform", "exp", "lognormal")
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        if kind not in self.KINDS:
+            raise ValueError(f"unknown latency distribution {kind!r}")
+        arity = {"fixed": 1, "uniform": 2, "exp": 1, "lognormal": 2}[kind]
+        if len(params) != arity:
+            raise ValueError(f"{kind} latency takes {arity} value(s)")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: Union[str, float, None, "Latency"]) -> "Latency":
+        if isinstance(spec, Latency):
+            return spec
+        if spec is None or spec == "":
+            return cls("fixed", 0.0)
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, values = spec.partition(":")
+        if not values:
+            return cls("fixed", float(kind))
+        try:
+            params = [float(v) for v in values.split(",")]
+        except ValueError:
+            raise ValueError(f"invalid latency spec {spec!r}") from None
+        return cls(kind.strip(), *params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "exp":
+            return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(str(p) for p in self.params)}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        fake = self.server.fake
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            self._send(400, {"code": "invalid_json", "message": "Invalid JSON body."})
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        headers = dict(self.headers)
+        fake._record(Request(self.command, url.path, body, headers, self.client_address))
+
+        fault = fake._fault()
+        if fault is DISCONNECT:
+            self.close_connection = True
+            return
+        if fault:
+            self._send(*fault)
+            return
+        result = fake.dispatch(self.command, url.path, query, body, self.headers)
+        if isinstance(result, tuple):
+            self._send(*result)
+        else:
+            self._stream(result)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def _send(
+        self, status: int, body: Any = None, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        data = b"" if body is None else json.dumps(body).encode()
+        self.server.fake._count(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, chunks: Iterator[Optional[Dict[str, Any]]]) -> None:
+        """Send NDJSON with chunked encoding; a None chunk drops the connection."""
+        self.server.fake._count(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                if chunk is None:
+                    self.close_connection = True
+                    return
+                line = json.dumps(chunk).encode() + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+class FakeServer:
+    """Threaded HTTP server with injectable latency, errors and throttling."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Union[str, float, Latency, None] = None,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int = 0,
+    ):
+        """Create a server (call :meth:`start` or use it as a context manager).
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0: any free port)
+            latency: Delay before every response, see :class:`Latency`
+            error_rate: Fraction of requests answered with HTTP 500
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: ``Retry-After`` seconds sent with each 429
+            seed: Seed of the latency and fault decisions
+        """
+        self.latency = Latency.parse(latency)
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.requests: List[Request] = []
+        self.statuses: Counter = Counter()
+        self._scripted: Deque[Response] = deque()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self  # type: ignore[attr-defined]
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, request: Request) -> None:
+        with self._lock:
+            self.requests.append(request)
+
+    def _count(self, status: int) -> None:
+        with self._lock:
+            self.statuses[status] += 1
+
+    def respond_next(
+        self,
+        status: int,
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """Answer an upcoming request with this response instead of handling it.
+
+        Calls queue up in order and take precedence over the random faults.
+        """
+        if body is None:
+            body = self.error_body(status, "Scripted response")
+        with self._lock:
+            self._scripted.append((status, body, headers or {}))
+
+    def disconnect_next(self) -> None:
+        """Close the connection of an upcoming request after reading it, unanswered."""
+        with self._lock:
+            self._scripted.append(DISCONNECT)
+
+    def _fault(self) -> Optional[Response]:
+        """Sleep the sampled latency; return an injected error response, if any."""
+        with self._lock:
+            delay = self.latency.sample(self._rng)
+            roll = self._rng.random()
+            scripted = self._scripted.popleft() if self._scripted else None
+        if delay > 0:
+            time.sleep(delay)
+        if scripted is not None:
+            return scripted
+        if roll < self.throttle_rate:
+            headers = {"Retry-After": f"{self.retry_after:g}"}
+            return 429, self.error_body(429, "Too many requests"), headers
+        if roll < self.throttle_rate + self.error_rate:
+            return 500, self.error_body(500, "Injected failure"), {}
+        return None
+
+    def error_body(self, status: int, message: str) -> Dict[str, Any]:
+        return {"error": message}
+
+    def dispatch(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        body: Any,
+        headers: Any,
+    ) -> Union[Tuple[Any, ...], Iterator[Optional[Dict[str, Any]]]]:
+        """Return ``(status, body[, headers])`` or an iterator of NDJSON chunks."""
+        raise NotImplementedError
+
+    def start(self) -> "FakeServer":
+        # A short poll interval keeps stop() fast
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            args=(0.05,),
+            name=type(self).__name__,
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until interrupted."""
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class FakeWordPress(FakeServer):
+    """In-memory WordPress REST API (``/wp-json``)."""
+
+    def __init__(
+        self,
+        *args: Any,
+        require_auth: bool = True,
+        batch_supported: bool = True,
+        categories: Optional[List[str]] = None,
+        **kwargs: Any,
+    ):
+        """Create a site; see :class:`FakeServer` for the remaining arguments.
+
+        Args:
+            require_auth: Answer 401 to requests without an Authorization header
+            batch_supported: Serve ``/batch/v1`` (WordPress 5.6+); 404 otherwise
+            categories: Category slugs that exist initially
+                (default: ``uncategorized``)
+        """
+        super().__init__(*args, **kwargs)
+        self.require_auth = require_auth
+        self.batch_supported = batch_supported
+        self.posts: Dict[int, Dict[str, Any]] = {}
+        self.terms: Dict[str, List[Dict[str, Any]]] = {"categories": [], "tags": []}
+        self._next_id = 1
+        self._data_lock = threading.Lock()
+        for slug in categories or ["uncategorized"]:
+            self.add_term("categories", slug)
+
+    def error_body(self, status: int, message: str) -> Dict[str, Any]:
+        return {"code": f"fake_{status}", "message": message, "data": {"status": status}}
+
+    def _new_id(self) -> int:
+        new_id = self._next_id
+        self._next_id += 1
+        return new_id
+
+    def add_term(
+        self, taxonomy: str, slug: str, name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Create a category or tag and return it."""
+        with self._data_lock:
+            term = {"id": self._new_id(), "slug": slug, "name": name or slug.title()}
+            self.terms[taxonomy].append(term)
+            return term
+
+    def _post_json(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **post,
+            "link": f"{self.url}/?p={post['id']}",
+            "title": {"raw": post["title"], "rendered": post["title"]},
+            "content": {"raw": post["content"], "rendered": post["content"]},
+        }
+
+    def dispatch(self, method, path, query, body, headers):
+        if self.require_auth and not headers.get("Authorization"):
+            return 401, {
+                "code": "rest_not_logged_in",
+                "message": "You are not currently logged in.",
+                "data": {"status": 401},
+            }
+        if not path.startswith("/wp-json/"):
+            return 404, self.error_body(404, "No route was found.")
+        route = path[len("/wp-json"):]
+        if route == "/batch/v1" and method == "POST":
+            return self._batch(body or {}, headers)
+        return self.route(method, route, query, body or {}, headers)
+
+    def route(
+        self,
+        method: str,
+        route: str,
+        query: Dict[str, str],
+        body: Dict[str, Any],
+        headers: Any,
+    ) -> Tuple[Any, ...]:
+        """Handle one REST route (also used for the requests of a batch)."""
+        if route == "/wp/v2/users/me" and method == "GET":
+            return 200, {"id": 1, "name": "Admin", "slug": "admin"}
+        if route == "/wp/v2/posts":
+            if method == "POST":
+                return self._save_post(None, body)
+            return self._page(list(self.posts.values()), query, headers, self._post_json)
+        match = re.fullmatch(r"/wp/v2/posts/(\d+)", route)
+        if match:
+            post_id = int(match.group(1))
+            if post_id not in self.posts:
+                return 404, self.error_body(404, "Invalid post ID.")
+            if method in ("POST", "PUT"):
+                return self._save_post(post_id, body)
+            return 200, self._post_json(self.posts[post_id])
+        match = re.fullmatch(r"/wp/v2/(categories|tags)", route)
+        if match:
+            taxonomy = match.group(1)
+            if method == "POST":
+                name = body.get("name", "")
+                slug = body.get("slug") or re.sub(r"[^a-z0-9]+", "-", name.lower())
+                if not slug:
+                    return 400, self.error_body(400, "Missing parameter(s): name")
+                if any(t["slug"] == slug for t in self.terms[taxonomy]):
+                    return 400, {
+                        "code": "term_exists",
+                        "message": "A term with the name provided already exists.",
+                    }
+                return 201, self.add_term(taxonomy, slug, name or None)
+            return self._page(self.terms[taxonomy], query, headers)
+        return 404, self.error_body(404, "No route was found matching the URL.")
+
+    def _save_post(
+        self, post_id: Optional[int], body: Dict[str, Any]
+    ) -> Tuple[Any, ...]:
+        with self._data_lock:
+            if post_id is None:
+                post_id = self._new_id()
+                post = {
+                    "id": post_id,
+                    "title": "",
+                    "content": "",
+                    "status": "draft",
+                    "categories": [],
+                }
+                status = 201
+            else:
+                post = self.posts[post_id]
+                status = 200
+            for field in ("title", "content", "status", "categories", "tags"):
+                if field in body:
+                    post[field] = body[field]
+            self.posts[post_id] = post
+        return status, self._post_json(post)
+
+    def _page(self, items, query, headers, render=None) -> Tuple[Any, ...]:
+        try:
+            per_page = min(100, max(1, int(query.get("per_page", 10))))
+            page = max(1, int(query.get("page", 1)))
+        except ValueError:
+            return 400, self.error_body(400, "Invalid parameter(s): page")
+        total_pages = max(1, -(-len(items) // per_page))
+        if page > total_pages:
+            return 400, {
+                "code": "rest_post_invalid_page_number",
+                "message": "Invalid page number.",
+            }
+        selected = items[(page - 1) * per_page:page * per_page]
+        chunk = [render(item) if render else dict(item) for item in selected]
+        fields = query.get("_fields")
+        if fields:
+            keep = fields.split(",")
+            chunk = [{k: v for k, v in item.items() if k in keep} for item in chunk]
+        etag = '"%s"' % hashlib.sha1(json.dumps(chunk, sort_keys=True).encode()).hexdigest()
+        response_headers = {
+            "ETag": etag,
+            "X-WP-Total": str(len(items)),
+            "X-WP-TotalPages": str(total_pages),
+        }
+        if headers.get("If-None-Match") == etag:
+            return 304, None, response_headers
+        return 200, chunk, response_headers
+
+    def _batch(self, body: Dict[str, Any], headers: Any) -> Tuple[Any, ...]:
+        if not self.batch_supported:
+            return 404, {"code": "rest_no_route", "message": "No route was found."}
+        requests = body.get("requests") or []
+        if len(requests) > MAX_BATCH_SIZE:
+            return 400, self.error_body(
+                400, f"The maximum number of requests is {MAX_BATCH_SIZE}."
+            )
+        responses = []
+        for request in requests:
+            url = urlsplit(request.get("path", ""))
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            result = self.route(
+                request.get("method", "POST"),
+                url.path,
+                query,
+                request.get("body") or {},
+                headers,
+            )
+            responses.append({"status": result[0], "body": result[1], "headers": {}})
+        return 207, {"responses": responses}
+
+
+class FakeOllama(FakeServer):
+    """Ollama API with a simulated token speed and parallel slot limit."""
+
+    def __init__(
+        self,
+        *args: Any,
+        models: Optional[List[str]] = None,
+        tokens_per_sec: float = 50.0,
+        response_tokens: int = 20,
+        parallel: int = 1,
+        max_queue: Optional[int] = None,
+        disconnect_rate: float = 0.0,
+        reply: Optional[Callable[[str], List[str]]] = None,
+        **kwargs: Any,
+    ):
+        """Create a server; see :class:`FakeServer` for the remaining arguments.
+
+        Args:
+            models: Model names that exist (default: ``llama3:latest``)
+            tokens_per_sec: Generation speed (0: instant)
+            response_tokens: Tokens per response
+            parallel: Generations that run at once (``OLLAMA_NUM_PARALLEL``);
+                the others wait for a slot
+            max_queue: Waiting generations above which requests get a 503
+                like a full Ollama queue (None: unbounded)
+            disconnect_rate: Fraction of streams cut off halfway
+            reply: Returns the response tokens for a prompt (default: the
+                words of ``Summary of <prompt>``, padded to ``response_tokens``)
+        """
+        super().__init__(*args, **kwargs)
+        self.models = list(models or ["llama3:latest"])
+        self.tokens_per_sec = tokens_per_sec
+        self.response_tokens = max(1, response_tokens)
+        self.disconnect_rate = disconnect_rate
+        self.max_queue = max_queue
+        self.reply = reply or self._tokens
+        self.loaded: Dict[str, float] = {}
+        self._slots = threading.BoundedSemaphore(max(1, parallel))
+        self._waiting = 0
+
+    @property
+    def generations(self) -> List[Dict[str, Any]]:
+        """Bodies of the ``/api/generate`` requests received so far."""
+        with self._lock:
+            return [r.body for r in self.requests if r.path == "/api/generate"]
+
+    def dispatch(self, method, path, query, body, headers):
+        if path == "/api/version":
+            return 200, {"version": FAKE_OLLAMA_VERSION}
+        if path == "/api/ps":
+            with self._lock:
+                loaded = sorted(self.loaded.items())
+            return 200, {
+                "models": [
+                    {
+                        "name": name,
+                        "model": name,
+                        "size": 4_000_000_000,
+                        "expires_at": time.strftime(
+                            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(used + 300)
+                        ),
+                    }
+                    for name, used in loaded
+                ]
+            }
+        if path == "/api/generate" and method == "POST":
+            return self._generate(body or {})
+        return 404, {"error": "not found"}
+
+    def _tokens(self, prompt: str) -> List[str]:
+        words = f"Summary of {prompt[:40]}".split() or ["Summary"]
+        return [
+            (words[n % len(words)] if n < len(words) else "lorem") + " "
+            for n in range(self.response_tokens)
+        ]
+
+    def _generate(self, body: Dict[str, Any]):
+        model = body.get("model", "")
+        if model not in self.models:
+            return 404, {"error": f"model '{model}' not found, try pulling it first"}
+        with self._lock:
+            if self.max_queue is not None and self._waiting >= self.max_queue:
+                return 503, {
+                    "error": "server busy, please try again. "
+                    "maximum pending requests exceeded"
+                }
+            self._waiting += 1
+            # Only roll when enabled, so other fault decisions keep their sequence
+            disconnect = self.disconnect_rate > 0 and (
+                self._rng.random() < self.disconnect_rate
+            )
+        tokens = self.reply(body.get("prompt", ""))
+        interval = 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+        def done(duration: float) -> Dict[str, Any]:
+            return {
+                "model": model,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "response": "",
+                "done": True,
+                "done_reason": "stop",
+                "eval_count": len(tokens),
+                "eval_duration": int(len(tokens) * interval * 1e9) or 1,
+                "total_duration": int(duration * 1e9),
+            }
+
+        if not body.get("stream", True):
+            start = time.monotonic()
+            with self._slot(model):
+                time.sleep(interval * len(tokens))
+            return 200, {**done(time.monotonic() - start), "response": "".join(tokens)}
+
+        def chunks() -> Iterator[Optional[Dict[str, Any]]]:
+            start = time.monotonic()
+            with self._slot(model):
+                for n, token in enumerate(tokens):
+                    if disconnect and n == len(tokens) // 2:
+                        yield None
+                        return
+                    time.sleep(interval)
+                    yield {"model": model, "response": token, "done": False}
+            yield done(time.monotonic() - start)
+
+        return chunks()
+
+    @contextmanager
+    def _slot(self, model: str) -> Iterator[None]:
+        """Wait for a generation slot; the request then stops counting as queued."""
+        with self._slots:
+            with self._lock:
+                self._waiting -= 1
+                self.loaded[model] = time.time()
+            yield
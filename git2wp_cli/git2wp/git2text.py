@@ -2,29 +2,83 @@
 """
 Git2Text - Convert Git commits to human-readable text using LLM.
 """
+import json
 import os
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Any
 
 import requests
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv(Path.home() / ".config" / "git2wp" / ".env")
+from . import config, diffs, metrics, ratelimit, tracing
+from .batch import ServerBusyError, ServerPool
+from .gitlog import GitError
+from .health import get_registry
+from .llmcache import SummaryCache, get_summary_cache
+
+# Load environment variables (a no-op when the CLI already did)
+config.load_env()
+
+# Upper bound on the TCP connect phase of a streaming request; the configured
+# server timeout then applies to the gap between chunks.
+STREAM_CONNECT_TIMEOUT = 10
+
+def parse_server_list(value: str) -> List[Dict[str, Any]]:
+    """Parse ``OLLAMA_SERVERS`` into server dicts.
+
+    Servers are separated by commas; each is a URL optionally followed by
+    ``;key=value`` settings (``model``, ``timeout`` in ms, ``concurrency``,
+    ``name``), e.g. ``http://gpu1:11434;concurrency=2,http://gpu2:11434``.
+    Unset settings fall back to ``DEFAULT_MODEL``, ``OLLAMA_TIMEOUT`` and
+    ``OLLAMA_CONCURRENCY``.
+    """
+    servers = []
+    for index, entry in enumerate(e.strip() for e in value.split(",")):
+        if not entry:
+            continue
+        url, *settings = [part.strip() for part in entry.split(";")]
+        options = dict(s.split("=", 1) for s in settings if "=" in s)
+        servers.append({
+            'url': url.rstrip("/"),
+            'model': options.get("model", os.getenv("DEFAULT_MODEL", "llama3:latest")),
+            'timeout': int(options.get("timeout", os.getenv("OLLAMA_TIMEOUT", 30000))) / 1000,
+            'concurrency': int(options.get("concurrency", os.getenv("OLLAMA_CONCURRENCY", 1))),
+            'name': options.get("name", f"Ollama Server {index + 1}"),
+        })
+    return servers
+
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
     
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, cache: Optional[SummaryCache] = None):
         """Initialize the Ollama client with configuration from environment."""
         self.debug = debug
         self.servers = self._get_configured_servers()
+        self.cache = cache if cache is not None else get_summary_cache()
+        self.health = get_registry(
+            ttl=float(os.getenv("OLLAMA_HEALTH_TTL", "30")),
+            failure_threshold=int(os.getenv("OLLAMA_BREAKER_THRESHOLD", "3")),
+            reset_timeout=float(os.getenv("OLLAMA_BREAKER_RESET", "30")),
+        )
+        self._local = threading.local()
+
+    @property
+    def last_stats(self) -> Optional[Dict[str, Any]]:
+        """Timing of the last generation made by this thread.
+
+        Contains ``server``, ``duration``, ``time_to_first_token`` (streaming
+        only), ``tokens`` and ``tokens_per_sec``; None after a cache hit.
+        """
+        return getattr(self._local, "stats", None)
     
     def _get_configured_servers(self) -> List[Dict[str, Any]]:
         """Get list of configured Ollama servers from environment."""
+        if os.getenv("OLLAMA_SERVERS"):
+            return parse_server_list(os.getenv("OLLAMA_SERVERS"))
+
         servers = []
+        concurrency = int(os.getenv("OLLAMA_CONCURRENCY", 1))
         
         # Primary server
         if os.getenv("OLLAMA_BASE_URL"):
@@ -32,6 +86,7 @@ class OllamaClient:
                 'url': os.getenv("OLLAMA_BASE_URL"),
                 'model': os.getenv("DEFAULT_MODEL", "llama3:latest"),
                 'timeout': int(os.getenv("OLLAMA_TIMEOUT", 30000)) / 1000,  # Convert ms to seconds
+                'concurrency': concurrency,
                 'name': 'Primary Ollama Server'
             })
         
@@ -41,6 +96,7 @@ class OllamaClient:
                 'url': os.getenv("SEC_OLLAMA_BASE_URL"),
                 'model': os.getenv("SEC_DEFAULT_MODEL", "llama3:latest"),
                 'timeout': int(os.getenv("SEC_OLLAMA_TIMEOUT", 30000)) / 1000,
+                'concurrency': concurrency,
                 'name': 'Secondary Ollama Server'
             })
         
@@ -62,75 +118,329 @@ class OllamaClient:
                 print(f"{server['name']} not available: {str(e)}")
         return None
     
-    def get_fastest_server(self) -> Optional[Dict[str, Any]]:
-        """Get the fastest responding Ollama server."""
+    def _probe(self, server: Dict[str, Any]) -> Optional[float]:
+        """Return the probe latency of a server, or None if it is down."""
+        result = self._check_server(server)
+        return result['response_time'] if result else None
+
+    def get_available_servers(self) -> List[Dict[str, Any]]:
+        """Get the available Ollama servers, best first.
+
+        Server health is cached process-wide and refreshed in the background;
+        servers are ranked by the EWMA of their observed generation latency,
+        and servers whose circuit breaker is open are left out.
+        """
         if not self.servers:
-            return None
-        
-        # Check all servers in parallel
-        with ThreadPoolExecutor(max_workers=len(self.servers)) as executor:
-            results = list(executor.map(self._check_server, self.servers))
-        
-        # Filter out None results (unavailable servers) and sort by response time
-        available_servers = [s for s in results if s is not None and s.get('available', False)]
-        available_servers.sort(key=lambda x: x.get('response_time', float('inf')))
-        
+            return []
+
+        with tracing.span("ollama.rank", servers=len(self.servers)):
+            available_servers = self.health.rank(self.servers, self._probe)
+
         if self.debug and available_servers:
             for server in available_servers:
                 print(f"Available: {server['name']} (Response time: {server['response_time']:.2f}s)")
-        
+
+        return available_servers
+
+    def get_fastest_server(self) -> Optional[Dict[str, Any]]:
+        """Get the best available Ollama server."""
+        available_servers = self.get_available_servers()
         return available_servers[0] if available_servers else None
     
-    def generate_text(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate text using the fastest available Ollama server."""
-        server = self.get_fastest_server()
-        if not server:
+    @tracing.traced("llm.generate")
+    def generate_text(
+        self,
+        prompt: str,
+        system_prompt: str = None,
+        options: Optional[Dict[str, Any]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Generate text using the fastest available Ollama server.
+
+        Results are served from the summary cache when it is enabled, and
+        identical concurrent requests share a single generation. A failed or
+        timed-out generation is retried once on each other available server.
+
+        Args:
+            prompt: User prompt
+            system_prompt: Optional system prompt
+            options: Ollama model options (temperature, num_ctx, ...)
+            on_token: If given, the response is streamed and this callback
+                receives each chunk of text as it arrives
+
+        Returns:
+            str: The complete generated text
+        """
+        self._local.stats = None
+        if self.cache is not None:
+            # A hit for any configured model avoids probing the servers at all
+            for configured in self.servers:
+                key = SummaryCache.make_key(
+                    prompt, system_prompt, configured['model'], options
+                )
+                cached = self.cache.get(key)
+                if cached is not None:
+                    if on_token:
+                        on_token(cached)
+                    return cached
+
+        servers = self.get_available_servers()
+        if not servers:
             raise RuntimeError("No Ollama servers available")
-        
+
+        # Fail over to the next server within this call; breakers skip the
+        # servers that keep failing for every caller in the process
+        error: Optional[Exception] = None
+        partial: List[str] = []
+
+        def emit(token: str) -> None:
+            partial.append(token)
+            on_token(token)
+
+        for server in servers:
+            if not self.health.allow(server['url']):
+                continue
+            if partial:
+                # The failed server already streamed part of an answer
+                on_token(f"\n\n[{error}; retrying on {server['name']}]\n\n")
+                partial.clear()
+            try:
+                return self._generate_on(
+                    server, prompt, system_prompt, options, emit if on_token else None
+                )
+            except RuntimeError as e:
+                error = e
+                metrics.inc("git2wp_llm_requests_total", server=server['name'], outcome="error")
+                if self.debug:
+                    print(f"{server['name']} failed: {e}")
+        raise error or RuntimeError("No Ollama servers available (circuit open)")
+
+    def _generate_on(
+        self,
+        server: Dict[str, Any],
+        prompt: str,
+        system_prompt: Optional[str],
+        options: Optional[Dict[str, Any]],
+        on_token: Optional[Callable[[str], None]],
+    ) -> str:
+        """Run one generation on ``server``, through the cache when enabled."""
         if self.debug:
             print(f"Using {server['name']} (Response time: {server['response_time']:.2f}s)")
-        
-        try:
-            ollama_url = f"{server['url']}/api/generate"
-            payload = {
-                "model": server['model'],
-                "prompt": prompt,
-                "stream": False
-            }
-            
-            if system_prompt:
-                payload["system"] = system_prompt
-            
-            response = requests.post(
-                ollama_url,
-                json=payload,
-                timeout=server['timeout']
+
+        payload = self._build_payload(server, prompt, system_prompt, options)
+        emitted = []
+
+        def generate() -> str:
+            if on_token is None:
+                return self._generate(server, payload)
+            parts = []
+            for token in self._iter_stream(server, payload):
+                emitted.append(True)
+                on_token(token)
+                parts.append(token)
+            return "".join(parts)
+
+        if self.cache is None:
+            return generate()
+
+        key = SummaryCache.make_key(prompt, system_prompt, server['model'], options)
+        text = self.cache.get_or_generate(key, generate)
+        if on_token and not emitted:
+            # Another thread produced this generation while we waited on it
+            on_token(text)
+        return text
+
+    def iter_text(
+        self,
+        prompt: str,
+        system_prompt: str = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[str]:
+        """Stream generated text chunk by chunk (bypasses the cache)."""
+        server = self.get_fastest_server()
+        if not server:
+            raise RuntimeError("No Ollama servers available")
+        payload = self._build_payload(server, prompt, system_prompt, options)
+        return self._iter_stream(server, payload)
+
+    @staticmethod
+    def _build_payload(
+        server: Dict[str, Any],
+        prompt: str,
+        system_prompt: Optional[str],
+        options: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        payload = {
+            "model": server['model'],
+            "prompt": prompt,
+            "stream": False
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+        if options:
+            payload["options"] = options
+        return payload
+
+    def _record_stats(
+        self,
+        server: Dict[str, Any],
+        duration: float,
+        first_token_after: Optional[float],
+        tokens: int,
+        done: Dict[str, Any],
+    ) -> None:
+        eval_count = done.get("eval_count")
+        eval_duration = done.get("eval_duration")
+        if eval_count and eval_duration:
+            tokens = eval_count
+            tokens_per_sec = eval_count / (eval_duration / 1e9)
+        elif first_token_after is not None and duration > first_token_after:
+            tokens_per_sec = tokens / (duration - first_token_after)
+        else:
+            tokens_per_sec = None
+        name = server['name']
+        metrics.inc("git2wp_llm_requests_total", server=name, outcome="ok")
+        metrics.observe("git2wp_llm_request_duration_seconds", duration, server=name)
+        if first_token_after is not None:
+            metrics.observe(
+                "git2wp_llm_time_to_first_token_seconds", first_token_after, server=name
             )
-            
-            if response.status_code == 200:
+        if tokens:
+            metrics.inc("git2wp_llm_tokens_total", tokens, server=name)
+        self._local.stats = {
+            "server": name,
+            "duration": duration,
+            "time_to_first_token": first_token_after,
+            "tokens": tokens,
+            "tokens_per_sec": tokens_per_sec,
+        }
+
+    @staticmethod
+    def _limiter(server: Dict[str, Any]) -> ratelimit.Limiter:
+        """Return the process-wide limiter of a server (OLLAMA_RATE requests/s)."""
+        concurrency = max(1, int(server.get('concurrency', 1)))
+        return ratelimit.get_limiter(
+            f"ollama:{server['url']}",
+            rate=config.get_config()["ollama_rate"],
+            max_concurrency=concurrency,
+            initial_concurrency=concurrency,
+            # Generation time depends on the prompt, so only errors adapt the limit
+            latency_tolerance=None,
+        )
+
+    def _check_response(
+        self, server: Dict[str, Any], response: requests.Response, permit: ratelimit.Permit
+    ) -> None:
+        """Raise for a non-200 response, classifying throttling and failures."""
+        if response.status_code == 200:
+            return
+        message = f"Error from Ollama (HTTP {response.status_code}): {response.text}"
+        if response.status_code in (429, 503):
+            # Ollama answers 503 when its request queue is full: busy, not down
+            permit.throttled(ratelimit.parse_retry_after(response.headers.get("Retry-After")))
+            raise ServerBusyError(message)
+        if response.status_code >= 500:
+            self.health.record_failure(server['url'])
+        raise RuntimeError(message)
+
+    def _generate(self, server: Dict[str, Any], payload: Dict[str, Any]) -> str:
+        """Send one non-streaming generation request to ``server``."""
+        trace = tracing.span("ollama.request", server=server['name'])
+        with trace, self._limiter(server).permit() as permit:
+            start_time = time.monotonic()
+            try:
+                response = requests.post(
+                    f"{server['url']}/api/generate",
+                    json=payload,
+                    timeout=server['timeout']
+                )
+            except requests.exceptions.RequestException as e:
+                self.health.record_failure(server['url'])
+                raise RuntimeError(f"Error connecting to Ollama: {str(e)}")
+            self._check_response(server, response, permit)
+            try:
                 result = response.json()
-                return result.get("response", "")
-            else:
-                raise RuntimeError(f"Error from Ollama (HTTP {response.status_code}): {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"Error connecting to Ollama: {str(e)}")
+                if not isinstance(result, dict):
+                    raise ValueError(f"expected an object, got {type(result).__name__}")
+            except ValueError as e:
+                self.health.record_failure(server['url'])
+                raise RuntimeError(f"Invalid response from Ollama: {str(e)}")
 
+        duration = time.monotonic() - start_time
+        self.health.record_success(server['url'], duration)
+        self._record_stats(server, duration, None, 0, result)
+        return result.get("response", "")
 
-def generate_commit_summary(repo_name: str, commit_info: Dict[str, Any], debug: bool = False) -> str:
-    """Generate a human-readable summary of a Git commit using Ollama.
-    
-    Args:
-        repo_name: Name of the repository
-        commit_info: Dictionary containing commit information
-        debug: Whether to enable debug output
-        
-    Returns:
-        str: Generated summary in HTML format
-    """
-    client = OllamaClient(debug=debug)
-    
-    # Format the commit information for the prompt
+    def _iter_stream(self, server: Dict[str, Any], payload: Dict[str, Any]) -> Iterator[str]:
+        """Stream NDJSON chunks from ``server`` and yield their text.
+
+        The server timeout is used as the read timeout, which requests applies
+        to each socket read: it bounds inactivity, not total duration.
+        """
+        payload = {**payload, "stream": True}
+        first_token_after = None
+        tokens = 0
+        done: Dict[str, Any] = {}
+        trace = tracing.span("ollama.stream", server=server['name'])
+        with trace, self._limiter(server).permit() as permit:
+            start_time = time.monotonic()
+            try:
+                response = requests.post(
+                    f"{server['url']}/api/generate",
+                    json=payload,
+                    stream=True,
+                    timeout=(min(STREAM_CONNECT_TIMEOUT, server['timeout']), server['timeout'])
+                )
+            except requests.exceptions.RequestException as e:
+                self.health.record_failure(server['url'])
+                raise RuntimeError(f"Error connecting to Ollama: {str(e)}")
+
+            with response:
+                self._check_response(server, response, permit)
+                try:
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise RuntimeError(f"Error from Ollama: {chunk['error']}")
+                        token = chunk.get("response", "")
+                        if token:
+                            if first_token_after is None:
+                                first_token_after = time.monotonic() - start_time
+                            tokens += 1
+                            yield token
+                        if chunk.get("done"):
+                            done = chunk
+                            break
+                except (requests.exceptions.RequestException, ValueError) as e:
+                    self.health.record_failure(server['url'])
+                    raise RuntimeError(f"Error streaming from Ollama: {str(e)}")
+
+        duration = time.monotonic() - start_time
+        self.health.record_success(server['url'], duration)
+        self._record_stats(server, duration, first_token_after, tokens, done)
+
+
+_clients: Dict[bool, OllamaClient] = {}
+
+
+def get_client(debug: bool = False) -> OllamaClient:
+    """Return a shared client so repeated summaries reuse its state."""
+    client = _clients.get(debug)
+    if client is None:
+        client = _clients[debug] = OllamaClient(debug=debug)
+    return client
+
+
+SYSTEM_PROMPT = """You are a technical writer. Your task is to create a detailed, 
+    informative article based on Git commit information. The article should be professional 
+    yet accessible, explaining the changes and their significance in a clear, concise manner. 
+    Use proper HTML formatting with appropriate headings, paragraphs, and lists."""
+
+
+def _commit_fields(commit_info: Dict[str, Any]) -> Tuple[str, str, str, str, List[str]]:
+    """Extract (sha, author, date, message, changed files) from commit info."""
     commit_sha = commit_info.get('short_sha', commit_info.get('short_hash', 'unknown'))
     author = commit_info.get('author', commit_info.get('author_name', 'unknown'))
     commit_date = commit_info.get('date', commit_info.get('commit_date', 'unknown'))
@@ -145,12 +455,31 @@ def generate_commit_summary(repo_name: str, commit_info: Dict[str, Any], debug:
             changed_files.append(f"{status} {file_path}")
         else:
             changed_files.append(str(change))
-    
-    # Create the prompt
-    system_prompt = """You are a technical writer. Your task is to create a detailed, 
-    informative article based on Git commit information. The article should be professional 
-    yet accessible, explaining the changes and their significance in a clear, concise manner. 
-    Use proper HTML formatting with appropriate headings, paragraphs, and lists."""
+    return commit_sha, author, commit_date, commit_message, changed_files
+
+
+DIFF_MAP_SYSTEM_PROMPT = """You are a senior developer reviewing part of a large Git
+    commit. Describe concisely what the given diff changes and why it matters: new
+    behaviour, fixes, refactorings and affected components. Answer in plain text."""
+
+
+def build_commit_prompt(
+    repo_name: str,
+    commit_info: Dict[str, Any],
+    diff: Optional[str] = None,
+    notes: Optional[Sequence[str]] = None,
+) -> Tuple[str, str]:
+    """Build the (system prompt, prompt) pair used to summarize a commit.
+
+    Args:
+        repo_name: Name of the repository
+        commit_info: Dictionary containing commit information
+        diff: Budgeted diff of the commit, included verbatim
+        notes: Summaries of parts of the diff, for commits too large to
+            include directly
+    """
+    commit_sha, author, commit_date, commit_message, _ = _commit_fields(commit_info)
+    changed_files = diffs.describe_changed_files(commit_info.get("changed_files", []))
     
     prompt = f"""Please analyze the following Git commit and generate a detailed article:
 
@@ -165,6 +494,12 @@ Changed files:
     
     for file_change in changed_files:
         prompt += f"- {file_change}\n"
+
+    if diff:
+        prompt += f"\nDiff (generated and binary files omitted, may be truncated):\n{diff}"
+    if notes:
+        prompt += "\nNotes on the diff, one per group of files:\n"
+        prompt += "\n".join(f"- {note.strip()}" for note in notes)
     
     prompt += """
 
@@ -175,13 +510,76 @@ Please provide a detailed analysis of these changes, including:
 
 Format your response in HTML with appropriate headings, paragraphs, and lists.
 """
-    
+    return SYSTEM_PROMPT, prompt
+
+
+def _diff_budgets() -> Tuple[int, int, int]:
+    """Return the (prompt, per-file, per-commit) diff budgets in bytes."""
+    settings = config.get_config()
+    return (
+        settings["diff_budget_bytes"],
+        settings["diff_file_bytes"],
+        settings["diff_max_bytes"],
+    )
+
+
+@tracing.traced("llm.prompt")
+def prepare_commit_prompt(
+    repo_name: str,
+    commit_info: Dict[str, Any],
+    client: Optional["OllamaClient"] = None,
+    repo_path: Optional[str] = None,
+) -> Tuple[str, str]:
+    """Build the prompt for a commit, including as much of its diff as fits.
+
+    The diff is read under ``DIFF_MAX_BYTES``. When it fits in
+    ``DIFF_BUDGET_BYTES`` it goes into the prompt as is; otherwise it is split
+    into file groups of that size, which are summarized in parallel on every
+    server, and the prompt carries those notes instead. Without a repository
+    path (or with ``DIFF_BUDGET_BYTES=0``) only the file list is used.
+    """
+    repo_path = repo_path or commit_info.get("repo_path")
+    prompt_budget, file_budget, max_bytes = _diff_budgets()
+    if not repo_path or prompt_budget <= 0 or not commit_info.get("hash"):
+        return build_commit_prompt(repo_name, commit_info)
     try:
-        # Generate the summary using Ollama
-        summary = client.generate_text(prompt, system_prompt)
-        
-        # Add the original commit details as a reference
-        summary += """
+        file_diffs = list(diffs.iter_file_diffs(
+            repo_path, commit_info["hash"], max_bytes=max_bytes,
+            file_budget=min(file_budget, prompt_budget),
+        ))
+    except (GitError, OSError):
+        return build_commit_prompt(repo_name, commit_info)
+
+    groups = diffs.group_diffs(file_diffs, prompt_budget)
+    if len(groups) <= 1:
+        return build_commit_prompt(repo_name, commit_info, diff=diffs.render_diffs(file_diffs))
+
+    commit_sha, _, _, commit_message, _ = _commit_fields(commit_info)
+    results = ServerPool(client or get_client()).map([
+        {
+            "system_prompt": DIFF_MAP_SYSTEM_PROMPT,
+            "prompt": (
+                f"Repository: {repo_name}\nCommit: {commit_sha}\n"
+                f"Message: {commit_message}\n\nDiff:\n{diffs.render_diffs(group)}"
+            ),
+        }
+        for group in groups
+    ])
+    # Failed groups fall back to their file names so the synthesis still covers them
+    notes = [
+        result if isinstance(result, str)
+        else "changes in " + ", ".join(path for path, _ in group)
+        for group, result in zip(groups, results)
+    ]
+    return build_commit_prompt(repo_name, commit_info, notes=notes)
+
+
+def render_commit_summary(repo_name: str, commit_info: Dict[str, Any], summary: str) -> str:
+    """Append the original commit details to a generated summary."""
+    commit_sha, author, commit_date, _, changed_files = _commit_fields(commit_info)
+    
+    # Add the original commit details as a reference
+    summary += """
         <h3>Original Commit Details</h3>
         <div class="commit-details">
             <p><strong>Repository:</strong> {repo_name}</p>
@@ -191,39 +589,68 @@ Format your response in HTML with appropriate headings, paragraphs, and lists.
             <h4>Changed Files:</h4>
             <ul>
         """.format(
-            repo_name=repo_name,
-            commit_sha=commit_sha,
-            author=author,
-            commit_date=commit_date
-        )
+        repo_name=repo_name,
+        commit_sha=commit_sha,
+        author=author,
+        commit_date=commit_date
+    )
+    
+    # Add color-coded file changes
+    for change in changed_files:
+        status = change[0] if change else '?'
+        file_path = change[2:] if len(change) > 2 else 'unknown'
+        
+        color = {
+            'A': 'green',    # Added
+            'M': 'yellow',   # Modified
+            'D': 'red',      # Deleted
+            'R': 'blue',     # Renamed
+            'C': 'orange',   # Copied
+            'U': 'purple',   # Unmerged
+            '?': 'gray'      # Untracked
+        }.get(status, 'gray')
         
-        # Add color-coded file changes
-        for change in changed_files:
-            status = change[0] if change else '?'
-            file_path = change[2:] if len(change) > 2 else 'unknown'
-            
-            color = {
-                'A': 'green',    # Added
-                'M': 'yellow',   # Modified
-                'D': 'red',      # Deleted
-                'R': 'blue',     # Renamed
-                'C': 'orange',   # Copied
-                'U': 'purple',   # Unmerged
-                '?': 'gray'      # Untracked
-            }.get(status, 'gray')
-            
-            summary += f"""
+        summary += f"""
             <li>
                 <span style='color: {color}'>{status}</span> {file_path}
             </li>
             """
-        
-        summary += """
+    
+    summary += """
             </ul>
         </div>
         """
+    
+    return summary
+
+
+def generate_commit_summary(
+    repo_name: str,
+    commit_info: Dict[str, Any],
+    debug: bool = False,
+    on_token: Optional[Callable[[str], None]] = None,
+    repo_path: Optional[str] = None,
+) -> str:
+    """Generate a human-readable summary of a Git commit using Ollama.
+    
+    Args:
+        repo_name: Name of the repository
+        commit_info: Dictionary containing commit information
+        debug: Whether to enable debug output
+        on_token: Optional callback that receives the article as it streams
+        repo_path: Repository to read the diff from (default:
+            ``commit_info["repo_path"]``)
         
-        return summary
+    Returns:
+        str: Generated summary in HTML format
+    """
+    client = get_client(debug)
+    system_prompt, prompt = prepare_commit_prompt(repo_name, commit_info, client, repo_path)
+    
+    try:
+        # Generate the summary using Ollama
+        summary = client.generate_text(prompt, system_prompt, on_token=on_token)
+        return render_commit_summary(repo_name, commit_info, summary)
         
     except Exception as e:
         if debug:
@@ -232,6 +659,41 @@ Format your response in HTML with appropriate headings, paragraphs, and lists.
         return generate_simple_summary(repo_name, commit_info)
 
 
+def generate_commit_summaries(
+    commits: Sequence[Tuple[str, Dict[str, Any]]], debug: bool = False
+) -> List[str]:
+    """Summarize many commits in parallel across every configured server.
+
+    Args:
+        commits: ``(repo_name, commit_info)`` pairs; commits carrying a
+            ``repo_path`` get their diff in the prompt
+        debug: Whether to enable debug output
+
+    Returns:
+        List[str]: One HTML summary per commit, in input order; commits whose
+        generation failed get the simple summary instead
+    """
+    client = get_client(debug)
+    requests_ = [
+        dict(zip(
+            ("system_prompt", "prompt"),
+            prepare_commit_prompt(repo_name, commit_info, client),
+        ))
+        for repo_name, commit_info in commits
+    ]
+    results = ServerPool(client).map(requests_)
+
+    summaries = []
+    for (repo_name, commit_info), result in zip(commits, results):
+        if isinstance(result, Exception):
+            if debug:
+                print(f"Error generating summary: {str(result)}")
+            summaries.append(generate_simple_summary(repo_name, commit_info))
+        else:
+            summaries.append(render_commit_summary(repo_name, commit_info, result))
+    return summaries
+
+
 def generate_simple_summary(repo_name: str, commit_info: Dict[str, Any]) -> str:
     """Generate a simple summary when LLM is not available."""
     commit_message = commit_info.get('message', commit_info.get('subject', 'Update'))
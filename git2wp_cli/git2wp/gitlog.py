@@ -0,0 +1,213 @@
+"""
+Streaming commit extraction from a single ``git log`` process.
+
+The log is requested in NUL-delimited form (``-z``) with raw status and
+numstat output, and parsed incrementally so that arbitrarily long ranges are
+processed in constant memory.
+"""
+import subprocess
+import tempfile
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Marks the start of every commit record in the log stream.
+RECORD_SEPARATOR = b"\x1e"
+
+# Header fields, in the order they appear in LOG_FORMAT.
+HEADER_FIELDS = (
+    "hash",
+    "short_hash",
+    "author",
+    "email",
+    "date",
+    "timestamp",
+    "parents",
+    "subject",
+    "body",
+)
+
+LOG_FORMAT = "%x1e" + "%x00".join(
+    ["%H", "%h", "%an", "%ae", "%ad", "%at", "%P", "%s", "%b"]
+)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class GitError(RuntimeError):
+    """Raised when a git command exits with a non-zero status."""
+
+
+def _build_log_command(
+    repo_path: str,
+    revisions: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    extra_args: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Build the ``git log`` command line used by :func:`iter_commits`."""
+    cmd = [
+        "git",
+        "-C",
+        repo_path,
+        "log",
+        "-z",
+        "-M",
+        "--raw",
+        "--numstat",
+        "--no-color",
+        f"--format={LOG_FORMAT}",
+    ]
+    if since:
+        cmd.append(f"--since={since}")
+    if until:
+        cmd.append(f"--until={until}")
+    if extra_args:
+        cmd.extend(extra_args)
+    cmd.extend(revisions or ["HEAD"])
+    cmd.append("--")
+    return cmd
+
+
+def _parse_changes(tokens: List[str]) -> List[Dict[str, Any]]:
+    """Parse the ``--raw``/``--numstat`` tokens that follow a commit header."""
+    changed_files: List[Dict[str, Any]] = []
+    by_path: Dict[str, Dict[str, Any]] = {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i].lstrip("\n")
+        i += 1
+        if not token:
+            continue
+
+        if token.startswith(":"):
+            # ":<mode> <mode> <sha> <sha> <status>" then one or two paths
+            status = token.rsplit(" ", 1)[-1]
+            if status[:1] in ("R", "C"):
+                old_path, path = tokens[i], tokens[i + 1]
+                i += 2
+                change = {"status": status, "path": path, "old_path": old_path}
+            else:
+                path = tokens[i]
+                i += 1
+                change = {"status": status, "path": path}
+            change["additions"] = None
+            change["deletions"] = None
+            changed_files.append(change)
+            by_path[path] = change
+            continue
+
+        # "<added>\t<deleted>\t<path>", or an empty path followed by src/dst
+        parts = token.split("\t", 2)
+        if len(parts) != 3:
+            continue
+        added, deleted, path = parts
+        if not path:
+            path = tokens[i + 1]
+            i += 2
+        change = by_path.get(path)
+        if change is None:
+            change = {"status": "M", "path": path}
+            changed_files.append(change)
+            by_path[path] = change
+        change["additions"] = int(added) if added.isdigit() else None
+        change["deletions"] = int(deleted) if deleted.isdigit() else None
+
+    return changed_files
+
+
+def parse_commit_record(record: bytes) -> Dict[str, Any]:
+    """Parse one commit record (without its leading separator) into a dict.
+
+    The result uses the same keys as ``get_commit_info`` and additionally
+    carries ``timestamp``, ``parents`` and per-file ``additions``/``deletions``.
+    """
+    tokens = record.decode("utf-8", errors="replace").split("\0")
+    header = tokens[: len(HEADER_FIELDS)]
+    header += [""] * (len(HEADER_FIELDS) - len(header))
+    commit_info: Dict[str, Any] = dict(zip(HEADER_FIELDS, header))
+    commit_info["body"] = commit_info["body"].rstrip("\n")
+    commit_info["timestamp"] = int(commit_info["timestamp"] or 0)
+    commit_info["parents"] = commit_info["parents"].split()
+    commit_info["changed_files"] = _parse_changes(tokens[len(HEADER_FIELDS):])
+    return commit_info
+
+
+def iter_records(stream, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield complete commit records from a binary ``git log`` stream."""
+    pending: List[bytes] = []
+    read = getattr(stream, "read1", stream.read)
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        idx = chunk.rfind(RECORD_SEPARATOR)
+        if idx < 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:idx])
+        data = b"".join(pending)
+        pending = [chunk[idx:]]
+        for record in data.split(RECORD_SEPARATOR):
+            if record:
+                yield record
+
+    tail = b"".join(pending)
+    for record in tail.split(RECORD_SEPARATOR):
+        if record:
+            yield record
+
+
+def iter_commits(
+    repo_path: str,
+    revisions: Optional[Sequence[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    extra_args: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream commits from ``repo_path`` using a single ``git log`` process.
+
+    Args:
+        repo_path: Path to the Git repository
+        revisions: Revisions or ranges to walk, e.g. ``["v1.0..HEAD"]``
+            (default: ``HEAD``)
+        since: Only include commits more recent than this date
+        until: Only include commits older than this date
+        extra_args: Additional arguments passed to ``git log``
+
+    Yields:
+        Dict[str, Any]: Commit information, newest first
+
+    Raises:
+        GitError: If ``git log`` fails
+    """
+    cmd = _build_log_command(repo_path, revisions, since, until, extra_args)
+    # stderr goes to a file: a full stderr pipe would block git while we
+    # are still reading stdout
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        try:
+            for record in iter_records(proc.stdout):
+                yield parse_commit_record(record)
+            if proc.wait() != 0:
+                stderr.seek(0)
+                raise GitError(
+                    f"git log failed in {repo_path}: "
+                    f"{stderr.read().decode('utf-8', errors='replace').strip()}"
+                )
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+
+
+def get_commit(repo_path: str, commit_hash: str = "HEAD") -> Dict[str, Any]:
+    """Get a single commit, with changed files relative to its first parent."""
+    commits = iter_commits(
+        repo_path, [commit_hash], extra_args=["-1", "-m", "--first-parent"]
+    )
+    try:
+        for commit_info in commits:
+            return commit_info
+    finally:
+        commits.close()
+    raise GitError(f"Commit not found in {repo_path}: {commit_hash}")
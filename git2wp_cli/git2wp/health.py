@@ -0,0 +1,281 @@
+"""
+Process-wide health and latency tracking for Ollama servers.
+
+Probe results are cached for a TTL and refreshed in a background thread, and
+routing uses an exponentially weighted moving average (EWMA) of observed
+generation latency. Servers that fail a probe are marked down immediately so
+the request path never waits on them.
+
+Failed generations only count towards each server's circuit breaker, because a
+server can answer probes while its generations fail or hang, and one stray
+error should not take the only server out of rotation. After ``failure_threshold`` consecutive
+failed generations the breaker opens and the server gets no traffic for
+``reset_timeout`` seconds; then it is half-open and a single trial request
+decides whether it closes again or stays open for twice as long.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from . import tracing
+
+DEFAULT_TTL = 30.0
+DEFAULT_ALPHA = 0.3
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+MAX_RESET_TIMEOUT = 600.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker for one server (callers hold a lock)."""
+
+    __slots__ = (
+        "threshold", "base_timeout", "timeout", "state", "failures", "opened_at",
+        "trial_started",
+    )
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = max(1, threshold)
+        self.base_timeout = self.timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started: Optional[float] = None
+
+    def ready(self, now: float) -> bool:
+        """Whether a request could be sent now (does not take the trial)."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return now - self.opened_at >= self.timeout
+        # A trial that never reported back frees the slot after the timeout
+        return self.trial_started is None or now - self.trial_started >= self.timeout
+
+    def allow(self, now: float) -> bool:
+        """Admit a request; in the half-open state only one trial at a time."""
+        if not self.ready(now):
+            return False
+        if self.state != CLOSED:
+            self.state = HALF_OPEN
+            self.trial_started = now
+        return True
+
+    def success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+        self.timeout = self.base_timeout
+        self.trial_started = None
+
+    def failure(self, now: float) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            # The trial failed: back off longer before the next one
+            self.timeout = min(MAX_RESET_TIMEOUT, self.timeout * 2)
+        elif self.failures < self.threshold:
+            return
+        self.state = OPEN
+        self.opened_at = now
+        self.trial_started = None
+
+
+class ServerState:
+    """What we currently know about one server."""
+
+    __slots__ = ("available", "checked_at", "probe_latency", "ewma_latency", "breaker")
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.available: Optional[bool] = None
+        self.checked_at = 0.0
+        self.probe_latency: Optional[float] = None
+        self.ewma_latency: Optional[float] = None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def score(self, generation: bool) -> float:
+        """Lower is better: EWMA generation latency, or probe latency."""
+        latency = self.ewma_latency if generation else self.probe_latency
+        return float("inf") if latency is None else latency
+
+
+class HealthRegistry:
+    """Health cache shared by every client in the process."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        alpha: float = DEFAULT_ALPHA,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        self.ttl = ttl
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._states: Dict[str, ServerState] = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def state(self, url: str) -> ServerState:
+        with self._lock:
+            state = self._states.get(url)
+            if state is None:
+                state = self._states[url] = ServerState(
+                    self.failure_threshold, self.reset_timeout
+                )
+            return state
+
+    def record_probe(self, url: str, latency: Optional[float]) -> None:
+        """Store a probe result; ``latency`` is None when the probe failed."""
+        state = self.state(url)
+        with self._lock:
+            state.available = latency is not None
+            state.checked_at = time.monotonic()
+            if latency is not None:
+                state.probe_latency = latency
+
+    def record_success(self, url: str, latency: float) -> None:
+        """Fold an observed generation latency into the server's EWMA."""
+        state = self.state(url)
+        with self._lock:
+            state.available = True
+            state.checked_at = time.monotonic()
+            state.breaker.success()
+            if state.ewma_latency is None:
+                state.ewma_latency = latency
+            else:
+                state.ewma_latency = (
+                    self.alpha * latency + (1 - self.alpha) * state.ewma_latency
+                )
+
+    def record_failure(self, url: str) -> None:
+        """Count a failed generation against the server's circuit breaker."""
+        state = self.state(url)
+        with self._lock:
+            state.breaker.failure(time.monotonic())
+
+    def allow(self, url: str) -> bool:
+        """Ask the server's breaker to admit a generation (takes a half-open trial)."""
+        state = self.state(url)
+        with self._lock:
+            return state.breaker.allow(time.monotonic())
+
+    def ready(self, url: str) -> bool:
+        """Whether the server's breaker would admit a generation right now."""
+        state = self.state(url)
+        with self._lock:
+            return state.breaker.ready(time.monotonic())
+
+    def breaker_state(self, url: str) -> str:
+        """Return ``closed``, ``open`` or ``half-open`` for a server."""
+        state = self.state(url)
+        with self._lock:
+            return state.breaker.state
+
+    def probe_all(
+        self,
+        servers: List[Dict[str, Any]],
+        probe: Callable[[Dict[str, Any]], Optional[float]],
+    ) -> None:
+        """Probe every server in parallel and record the results."""
+        if not servers:
+            return
+        with tracing.span("ollama.probe", servers=len(servers)):
+            with ThreadPoolExecutor(max_workers=len(servers)) as executor:
+                latencies = list(executor.map(probe, servers))
+        for server, latency in zip(servers, latencies):
+            self.record_probe(server["url"], latency)
+
+    def refresh_in_background(
+        self,
+        servers: List[Dict[str, Any]],
+        probe: Callable[[Dict[str, Any]], Optional[float]],
+    ) -> None:
+        """Start a background probe unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.probe_all(servers, probe)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="ollama-health", daemon=True).start()
+
+    def rank(
+        self,
+        servers: List[Dict[str, Any]],
+        probe: Callable[[Dict[str, Any]], Optional[float]],
+    ) -> List[Dict[str, Any]]:
+        """Return the servers believed to be up, best first.
+
+        Only the first call, or a call where every server has been down for
+        longer than the TTL, probes synchronously. Otherwise stale entries are
+        refreshed in the background and the cached view is used immediately.
+        """
+        states = [self.state(s["url"]) for s in servers]
+        now = time.monotonic()
+        stale = any(now - s.checked_at > self.ttl for s in states)
+        if all(s.available is None for s in states):
+            self.probe_all(servers, probe)
+            return self._ranked(servers, states)
+
+        ranked = self._ranked(servers, states)
+        if stale:
+            if ranked:
+                self.refresh_in_background(servers, probe)
+            else:
+                self.probe_all(servers, probe)
+                ranked = self._ranked(servers, states)
+        return ranked
+
+    def _ranked(
+        self, servers: List[Dict[str, Any]], states: List[ServerState]
+    ) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                (server, state)
+                for server, state in zip(servers, states)
+                if state.available and state.breaker.ready(now)
+            ]
+            # Generation and probe latencies are on different scales: rank by
+            # generations only once every candidate has served one, so a
+            # server that was never used gets its chance on probe latency
+            generation = all(state.ewma_latency is not None for _, state in candidates)
+            ranked = [
+                {**server, "response_time": state.score(generation), "available": True}
+                for server, state in candidates
+            ]
+        ranked.sort(key=lambda s: s["response_time"])
+        return ranked
+
+
+_registry: Optional[HealthRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(
+    ttl: float = DEFAULT_TTL,
+    failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+    reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+) -> HealthRegistry:
+    """Return the process-wide registry (settings only apply on creation)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = HealthRegistry(
+                ttl=ttl, failure_threshold=failure_threshold, reset_timeout=reset_timeout
+            )
+        return _registry
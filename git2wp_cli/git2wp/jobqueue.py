@@ -0,0 +1,313 @@
+"""
+Durable job queue for publishing, stored in SQLite.
+
+Jobs move through ``pending -> running -> done``. A worker claims jobs by
+taking a lease (owner and expiry) inside a write transaction, so several
+worker processes, on one host or on several hosts sharing the database file,
+never run the same job at once. A job whose worker crashed becomes claimable
+again when its lease expires. Errors put the job back to ``pending`` with an
+exponential backoff until ``max_attempts`` is reached; the job is then
+``failed`` (the dead-letter list) and stays there until it is replayed.
+
+Leases compare wall-clock times, so hosts sharing a queue need synchronized
+clocks. On a network filesystem use ``shared=True``: WAL needs shared memory
+that only works on a single host.
+"""
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (state, run_after);
+"""
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+STATES = (PENDING, RUNNING, DONE, FAILED)
+
+DEFAULT_LEASE = 600.0
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 30.0
+MAX_BACKOFF = 3600.0
+
+
+def worker_id() -> str:
+    """Return an owner name that is unique across hosts and processes."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _job(row: sqlite3.Row) -> Dict[str, Any]:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+class JobQueue:
+    """SQLite-backed job queue with leases, retries and a dead-letter state."""
+
+    def __init__(
+        self,
+        db_path: str,
+        lease: float = DEFAULT_LEASE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        backoff: float = DEFAULT_BACKOFF,
+        shared: bool = False,
+    ):
+        """Open (and create) a queue.
+
+        Args:
+            db_path: SQLite database file
+            lease: Seconds a claimed job belongs to its worker
+            max_attempts: Attempts before a job is dead-lettered
+            backoff: Base delay before a failed job is retried (doubles per attempt)
+            shared: Use a rollback journal instead of WAL, for databases on a
+                filesystem shared by several hosts
+        """
+        self.db_path = db_path
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Transactions are explicit so claims can take the write lock up front
+        self.conn = sqlite3.connect(
+            db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        kind: str,
+        key: str,
+        payload: Dict[str, Any],
+        max_attempts: Optional[int] = None,
+    ) -> int:
+        """Add a job and return its id.
+
+        ``key`` deduplicates jobs: enqueueing a key that is pending or running
+        is a no-op, while a done or failed job with that key is queued again.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (kind, key, payload, state, max_attempts, run_after, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "payload = excluded.payload, state = excluded.state, attempts = 0, "
+                "run_after = excluded.run_after, last_error = NULL, "
+                "updated_at = excluded.updated_at "
+                "WHERE jobs.state IN (?, ?)",
+                (
+                    kind,
+                    key,
+                    json.dumps(payload),
+                    PENDING,
+                    max_attempts or self.max_attempts,
+                    now,
+                    now,
+                    now,
+                    DONE,
+                    FAILED,
+                ),
+            )
+            return conn.execute("SELECT id FROM jobs WHERE key = ?", (key,)).fetchone()[0]
+
+    def claim(
+        self, owner: str, limit: int = 1, kind: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` due jobs (oldest first) to ``owner``.
+
+        Running jobs whose lease expired are claimed again; those that already
+        used all their attempts are dead-lettered instead.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, last_error = 'lease expired', "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= max_attempts",
+                (FAILED, now, RUNNING, now),
+            )
+            query = (
+                "SELECT id FROM jobs WHERE "
+                "((state = ? AND run_after <= ?) OR (state = ? AND lease_expires < ?))"
+            )
+            params: List[Any] = [PENDING, now, RUNNING, now]
+            if kind:
+                query += " AND kind = ?"
+                params.append(kind)
+            query += " ORDER BY run_after, id LIMIT ?"
+            params.append(limit)
+            ids = [row[0] for row in conn.execute(query, params)]
+            if not ids:
+                return []
+            marks = ",".join("?" * len(ids))
+            conn.execute(
+                f"UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, "
+                f"lease_expires = ?, updated_at = ? WHERE id IN ({marks})",
+                (RUNNING, owner, now + self.lease, now, *ids),
+            )
+            rows = conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({marks}) ORDER BY run_after, id", ids
+            ).fetchall()
+        return [_job(row) for row in rows]
+
+    def heartbeat(self, owner: str, ids: Iterable[int]) -> int:
+        """Extend ``owner``'s leases on some jobs. Returns how many it still holds."""
+        ids = list(ids)
+        if not ids:
+            return 0
+        now = time.time()
+        marks = ",".join("?" * len(ids))
+        with self._transaction() as conn:
+            return conn.execute(
+                f"UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                f"WHERE state = ? AND lease_owner = ? AND id IN ({marks})",
+                (now + self.lease, now, RUNNING, owner, *ids),
+            ).rowcount
+
+    def complete(self, owner: str, job_id: int) -> bool:
+        """Mark a job done. Returns False if ``owner`` lost the lease meanwhile."""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, "
+                "last_error = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (DONE, now, job_id, RUNNING, owner),
+            ).rowcount == 1
+
+    def fail(self, owner: str, job_id: int, error: str) -> Optional[str]:
+        """Record a failed attempt and schedule a retry or dead-letter the job.
+
+        Returns:
+            Optional[str]: The job's new state, or None if ``owner`` lost the lease
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (job_id, RUNNING, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            attempts, max_attempts = row
+            state = FAILED if attempts >= max_attempts else PENDING
+            # Exponential backoff with jitter so failed jobs do not retry in lockstep
+            delay = min(MAX_BACKOFF, self.backoff * 2 ** (attempts - 1))
+            conn.execute(
+                "UPDATE jobs SET state = ?, run_after = ?, lease_owner = NULL, "
+                "lease_expires = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                (state, now + delay * random.uniform(0.5, 1.0), error, now, job_id),
+            )
+        return state
+
+    def release(self, owner: str, job_id: int) -> None:
+        """Give a job back without counting the attempt (e.g. on shutdown)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0), "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND state = ? AND lease_owner = ?",
+                (PENDING, time.time(), job_id, RUNNING, owner),
+            )
+
+    def replay(self, ids: Optional[Iterable[int]] = None) -> int:
+        """Queue dead-lettered jobs again (all of them without ``ids``)."""
+        query = (
+            "UPDATE jobs SET state = ?, attempts = 0, run_after = ?, updated_at = ? "
+            "WHERE state = ?"
+        )
+        now = time.time()
+        params: List[Any] = [PENDING, now, now, FAILED]
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                return 0
+            query += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        with self._transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def jobs(
+        self, state: Optional[str] = None, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return jobs, most recently updated first."""
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if state:
+            query += " WHERE state = ?"
+            params.append(state)
+        query += " ORDER BY updated_at DESC, id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def purge(self, older_than: float = 0.0) -> int:
+        """Delete done jobs last updated more than ``older_than`` seconds ago."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM jobs WHERE state = ? AND updated_at <= ?",
+                (DONE, time.time() - older_than),
+            ).rowcount
@@ -0,0 +1,118 @@
+"""
+Local ledger of published commits.
+
+Maps ``(site, repository, commit SHA)`` to the WordPress post created for it,
+together with a hash of the prompt the article was generated from and a hash
+of the rendered post. Publishing consults it to skip commits whose inputs did
+not change, update posts whose content changed and create posts only for new
+commits, so repeated runs are cheap and never duplicate posts.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    site TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    link TEXT,
+    source_hash TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (site, repo, sha)
+);
+"""
+
+CREATE = "create"
+UPDATE = "update"
+SKIP = "skip"
+
+
+def digest(*parts: str) -> str:
+    """Return a stable hash of some strings."""
+    h = hashlib.sha256()
+    for part in parts:
+        data = (part or "").encode("utf-8")
+        h.update(str(len(data)).encode("ascii") + b":" + data)
+    return h.hexdigest()
+
+
+class PublishLedger:
+    """SQLite-backed record of which commits were published where."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "PublishLedger":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, site: str, repo_path: str, sha: str) -> Optional[Dict[str, Any]]:
+        """Return the ledger entry of a commit, or None if it was never published."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM posts WHERE site = ? AND repo = ? AND sha = ?",
+                (site, os.path.realpath(repo_path), sha),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record(
+        self,
+        site: str,
+        repo_path: str,
+        sha: str,
+        post_id: int,
+        source_hash: str,
+        content_hash: str,
+        link: Optional[str] = None,
+    ) -> None:
+        """Remember the post that now holds a commit's article."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO posts "
+                "(site, repo, sha, post_id, link, source_hash, content_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (site, repo, sha) DO UPDATE SET "
+                "post_id = excluded.post_id, "
+                "link = COALESCE(excluded.link, posts.link), "
+                "source_hash = excluded.source_hash, "
+                "content_hash = excluded.content_hash, "
+                "updated_at = excluded.updated_at",
+                (
+                    site,
+                    os.path.realpath(repo_path),
+                    sha,
+                    post_id,
+                    link,
+                    source_hash,
+                    content_hash,
+                    time.time(),
+                ),
+            )
+
+
+def plan(entry: Optional[Dict[str, Any]], content_hash: str) -> str:
+    """Decide what to do with a rendered post given its ledger entry."""
+    if entry is None:
+        return CREATE
+    if entry["content_hash"] == content_hash:
+        return SKIP
+    return UPDATE
@@ -0,0 +1,223 @@
+"""
+Content-addressed cache for LLM generations.
+
+Generations are keyed on the prompt, system prompt, model and request options.
+An in-memory LRU sits in front of an on-disk SQLite store with TTL and
+size-based eviction, and concurrent requests for the same key are coalesced
+into a single in-flight generation.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS generations_accessed ON generations (accessed_at);
+"""
+
+DEFAULT_MAX_MEMORY_ENTRIES = 256
+DEFAULT_MAX_DISK_BYTES = 100 * 1024 * 1024
+
+
+class SummaryCache:
+    """Two-level (memory + SQLite) cache with request coalescing."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl: float = 3600,
+        max_memory_entries: int = DEFAULT_MAX_MEMORY_ENTRIES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        """Create a cache.
+
+        Args:
+            db_path: SQLite file for the persistent level (None: memory only)
+            ttl: Seconds an entry stays valid; 0 or less means forever
+            max_memory_entries: Capacity of the in-memory LRU
+            max_disk_bytes: Total size of cached values kept on disk
+        """
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        system_prompt: Optional[str],
+        model: str,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Return the content address of a generation request."""
+        material = json.dumps(
+            {
+                "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                "system": system_prompt or "",
+                "model": model,
+                "options": options or {},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached value, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+
+        if self._conn is None:
+            return None
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self._expired(created_at, now):
+                with self._conn:
+                    self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE generations SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+
+        self._remember(key, created_at, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value in both cache levels."""
+        now = time.time()
+        self._remember(key, now, value)
+        if self._conn is None:
+            return
+        with self._db_lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones over the size cap."""
+        if self.ttl > 0:
+            self._conn.execute(
+                "DELETE FROM generations WHERE created_at < ?", (now - self.ttl,)
+            )
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM generations"
+        ).fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        excess = total - self.max_disk_bytes
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM generations ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+    def get_or_generate(self, key: str, generate: Callable[[], str]) -> str:
+        """Return the cached value for ``key``, generating it at most once.
+
+        Concurrent callers asking for the same key while a generation is in
+        flight wait for that generation instead of starting their own.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            value = generate()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # Waiters get the value even if storing it fails below
+            future.set_result(value)
+            try:
+                self.set(key, value)
+            except sqlite3.Error:
+                pass  # Database locked or disk full: the text is still good
+            return value
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self._conn is not None:
+            with self._db_lock, self._conn:
+                self._conn.execute("DELETE FROM generations")
+
+
+_cache: Optional[SummaryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Return the process-wide cache, or None when ``ENABLE_CACHE`` is off."""
+    global _cache
+    settings = config.get_config()
+    if not settings["enable_cache"]:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SummaryCache(
+                os.path.join(settings["data_dir"], "llm-cache.db"),
+                ttl=settings["cache_ttl"],
+                max_disk_bytes=settings["cache_max_bytes"],
+            )
+        return _cache
@@ -0,0 +1,290 @@
+"""
+Pipeline metrics shared between git2wp processes and the web server.
+
+The CLI and workers record counters, gauges and histograms with :func:`inc`,
+:func:`set_gauge` and :func:`observe`. Recording only updates an in-memory
+dict under a short lock; a background thread folds the accumulated deltas
+into a SQLite database (WAL) every few seconds, in one transaction, so any
+number of processes can add to the same counters while a scraper reads
+them without blocking anyone. ``public/simple_server.py`` serves the
+database at ``/metrics`` in the Prometheus text format.
+
+Until :func:`configure` is called (the ``git2wp`` command does it), recording
+is a no-op, so library use and tests never write to the user's data dir.
+
+The ``samples`` table is read directly by the web server; keep its columns
+stable: one row per series with the metric ``family``, the sample ``name``
+(``<family>_bucket``, ``_sum`` and ``_count`` for histograms), the rendered
+``labels`` without ``le``, the bucket bound ``le`` ('' outside histograms)
+and the ``value``.
+"""
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+FLUSH_INTERVAL = 5.0
+# Seconds; wide enough for both WordPress calls and long LLM generations
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Series = Tuple[str, str, str, str]  # family, name, labels, le
+
+# Help text of the metrics git2wp records
+HELP = {
+    "git2wp_commits_processed_total": "Commits handled by publish, watch and worker, by result",
+    "git2wp_llm_requests_total": "Ollama generate calls, by server and outcome",
+    "git2wp_llm_request_duration_seconds": "Duration of successful Ollama generate calls",
+    "git2wp_llm_time_to_first_token_seconds": "Time to the first streamed Ollama token",
+    "git2wp_llm_tokens_total": "Tokens generated by Ollama, by server",
+    "git2wp_wordpress_responses_total": "WordPress REST API responses, by status code",
+    "git2wp_queue_jobs": "Publish jobs in the job queue, by state",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS families (
+    family TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    help TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS samples (
+    family TEXT NOT NULL,
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL DEFAULT '',
+    le TEXT NOT NULL DEFAULT '',
+    value REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (name, labels, le)
+);
+"""
+
+
+def format_labels(labels: Dict[str, object]) -> str:
+    """Render labels as ``a="1",b="2"`` (sorted, escaped)."""
+    parts = []
+    for key in sorted(labels):
+        value = str(labels[key])
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return ",".join(parts)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+class MetricsStore:
+    """SQLite database holding the merged metrics of every process."""
+
+    def __init__(self, db_path: str, timeout: float = 5.0):
+        # Imported here: the CLI loads this module at startup
+        import os
+        import sqlite3
+
+        parent = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(parent, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def apply(
+        self,
+        families: Dict[str, Tuple[str, str]],
+        increments: Dict[Series, float],
+        gauges: Dict[Series, float],
+    ) -> None:
+        """Add ``increments`` to, and set ``gauges`` in, the stored series."""
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO families (family, type, help) VALUES (?, ?, ?) "
+                "ON CONFLICT(family) DO UPDATE SET type = excluded.type, help = excluded.help",
+                [(family, kind, help) for family, (kind, help) in families.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO samples (family, name, labels, le, value, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(name, labels, le) DO UPDATE SET "
+                "value = value + excluded.value, updated_at = excluded.updated_at",
+                [(*series, value, now) for series, value in increments.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO samples (family, name, labels, le, value, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(name, labels, le) DO UPDATE SET "
+                "value = excluded.value, updated_at = excluded.updated_at",
+                [(*series, value, now) for series, value in gauges.items()],
+            )
+
+    def exposition(self) -> str:
+        """Return every stored metric in the Prometheus text format."""
+        with self._lock:
+            families = self.conn.execute("SELECT family, type, help FROM families").fetchall()
+            samples = self.conn.execute(
+                "SELECT family, name, labels, le, value FROM samples"
+            ).fetchall()
+        return render(families, samples)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "MetricsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def render(
+    families: Iterable[Tuple[str, str, str]],
+    samples: Iterable[Tuple[str, str, str, str, float]],
+) -> str:
+    """Render ``families`` and ``samples`` rows in the Prometheus text format."""
+    by_family: Dict[str, List[Tuple[str, str, str, float]]] = {}
+    for family, name, labels, le, value in samples:
+        by_family.setdefault(family, []).append((name, labels, le, value))
+    lines = []
+    for family, kind, help in sorted(families):
+        rows = by_family.get(family)
+        if not rows:
+            continue
+        # Buckets in increasing order, then _count and _sum, per label set
+        rows.sort(key=lambda r: (r[1], r[0], float(r[2]) if r[2] else 0.0))
+        lines.append(f"# HELP {family} {help}")
+        lines.append(f"# TYPE {family} {kind}")
+        for name, labels, le, value in rows:
+            if le:
+                labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+            series = f"{name}{{{labels}}}" if labels else name
+            lines.append(f"{series} {_format_value(value)}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class Registry:
+    """Accumulates metric updates in memory until :meth:`flush`."""
+
+    def __init__(self, store: Optional[MetricsStore] = None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._families: Dict[str, Tuple[str, str]] = {}
+        self._increments: Dict[Series, float] = {}
+        self._gauges: Dict[Series, float] = {}
+
+    def inc(self, family: str, value: float = 1.0, **labels: object) -> None:
+        series = (family, family, format_labels(labels), "")
+        with self._lock:
+            self._families[family] = (COUNTER, HELP.get(family, ""))
+            self._increments[series] = self._increments.get(series, 0.0) + value
+
+    def set_gauge(self, family: str, value: float, **labels: object) -> None:
+        with self._lock:
+            self._families[family] = (GAUGE, HELP.get(family, ""))
+            self._gauges[(family, family, format_labels(labels), "")] = value
+
+    def observe(
+        self,
+        family: str,
+        value: float,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **labels: object,
+    ) -> None:
+        rendered = format_labels(labels)
+        bucket = f"{family}_bucket"
+        with self._lock:
+            self._families[family] = (HISTOGRAM, HELP.get(family, ""))
+            increments = self._increments
+            for bound in buckets:
+                series = (family, bucket, rendered, _format_value(bound))
+                # Cumulative buckets: every bound at or above the value counts it
+                increments[series] = increments.get(series, 0.0) + (value <= bound)
+            for series, amount in (
+                ((family, bucket, rendered, "+Inf"), 1.0),
+                ((family, f"{family}_count", rendered, ""), 1.0),
+                ((family, f"{family}_sum", rendered, ""), value),
+            ):
+                increments[series] = increments.get(series, 0.0) + amount
+
+    def flush(self) -> None:
+        """Write the updates recorded since the last flush to the store."""
+        with self._lock:
+            if self.store is None or not (self._increments or self._gauges):
+                return
+            families, self._families = self._families, {}
+            increments, self._increments = self._increments, {}
+            gauges, self._gauges = self._gauges, {}
+        try:
+            self.store.apply(families, increments, gauges)
+        except Exception:
+            # Database busy or unwritable: keep the updates for the next flush
+            with self._lock:
+                for family, meta in families.items():
+                    self._families.setdefault(family, meta)
+                for series, value in increments.items():
+                    self._increments[series] = self._increments.get(series, 0.0) + value
+                for series, value in gauges.items():
+                    self._gauges.setdefault(series, value)
+
+
+_registry: Optional[Registry] = None
+_stop = threading.Event()
+_flusher: Optional[threading.Thread] = None
+
+
+def configure(db_path: str, interval: float = FLUSH_INTERVAL) -> Registry:
+    """Start recording in this process, flushing to ``db_path`` periodically."""
+    global _registry, _flusher
+    close()
+    registry = Registry(MetricsStore(db_path))
+
+    def run() -> None:
+        while not _stop.wait(interval):
+            registry.flush()
+
+    _stop.clear()
+    _flusher = threading.Thread(target=run, name="git2wp-metrics", daemon=True)
+    _flusher.start()
+    _registry = registry
+    return registry
+
+
+def close() -> None:
+    """Flush what was recorded and stop recording."""
+    global _registry, _flusher
+    registry, _registry = _registry, None
+    if _flusher is not None:
+        _stop.set()
+        _flusher.join()
+        _flusher = None
+    if registry is not None and registry.store is not None:
+        registry.flush()
+        registry.store.close()
+
+
+def enabled() -> bool:
+    """Whether :func:`configure` started recording in this process."""
+    return _registry is not None
+
+
+def inc(family: str, value: float = 1.0, **labels: object) -> None:
+    """Add ``value`` to a counter."""
+    registry = _registry
+    if registry is not None:
+        registry.inc(family, value, **labels)
+
+
+def set_gauge(family: str, value: float, **labels: object) -> None:
+    """Set a gauge to ``value``."""
+    registry = _registry
+    if registry is not None:
+        registry.set_gauge(family, value, **labels)
+
+
+def observe(family: str, value: float, **labels: object) -> None:
+    """Record ``value`` (seconds) in a histogram with :data:`DEFAULT_BUCKETS`."""
+    registry = _registry
+    if registry is not None:
+        registry.observe(family, value, **labels)
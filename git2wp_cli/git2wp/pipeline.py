@@ -0,0 +1,124 @@
+"""
+Asyncio pipeline connecting blocking stages through bounded queues.
+
+Used by ``publish --pipeline`` to overlap git extraction, LLM generation and
+WordPress posting: each stage runs its (blocking) function in a thread pool
+with its own concurrency, and bounded queues between stages provide
+backpressure so memory stays flat regardless of how many commits flow through.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+_DONE = object()
+
+
+class Stage:
+    """One step of the pipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        concurrency: int = 1,
+        queue_size: Optional[int] = None,
+    ):
+        """Create a stage.
+
+        Args:
+            name: Label used in the returned statistics
+            func: Blocking function applied to every item
+            concurrency: Number of items processed at the same time
+            queue_size: Capacity of the queue feeding this stage
+                (default: twice the concurrency)
+        """
+        self.name = name
+        self.func = func
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size or 2 * self.concurrency
+
+
+async def run_pipeline(
+    source: Iterable[Any],
+    stages: Sequence[Stage],
+    on_result: Optional[Callable[[Any], None]] = None,
+    on_error: Optional[Callable[[str, Any, Exception], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Push every item of ``source`` through ``stages``.
+
+    Args:
+        source: Iterable of input items; it is consumed in a worker thread
+        stages: Stages to apply in order
+        on_result: Called with the output of the last stage for each item
+        on_error: Called with ``(stage name, item, exception)`` when a stage
+            fails; the item is then dropped
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per-stage ``items``, ``errors`` and
+        ``busy`` seconds, plus ``total`` wall-clock ``elapsed`` seconds
+    """
+    loop = asyncio.get_running_loop()
+    queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in stages]
+    stats: Dict[str, Dict[str, Any]] = {
+        name: {"items": 0, "errors": 0, "busy": 0.0}
+        for name in ["extract"] + [stage.name for stage in stages]
+    }
+    started = time.monotonic()
+    executor = ThreadPoolExecutor(
+        max_workers=1 + sum(stage.concurrency for stage in stages),
+        thread_name_prefix="pipeline",
+    )
+
+    async def feed() -> None:
+        iterator = iter(source)
+        while True:
+            start = time.monotonic()
+            item = await loop.run_in_executor(executor, next, iterator, _DONE)
+            stats["extract"]["busy"] += time.monotonic() - start
+            if item is _DONE:
+                break
+            stats["extract"]["items"] += 1
+            await queues[0].put(item)
+        for _ in range(stages[0].concurrency):
+            await queues[0].put(_DONE)
+
+    async def work(index: int, stage: Stage) -> None:
+        inbox = queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        stage_stats = stats[stage.name]
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            start = time.monotonic()
+            try:
+                result = await loop.run_in_executor(executor, stage.func, item)
+            except Exception as e:
+                stage_stats["errors"] += 1
+                if on_error:
+                    on_error(stage.name, item, e)
+                continue
+            finally:
+                stage_stats["busy"] += time.monotonic() - start
+            stage_stats["items"] += 1
+            if outbox is not None:
+                await outbox.put(result)
+            elif on_result:
+                on_result(result)
+
+    async def run_stage(index: int, stage: Stage) -> None:
+        await asyncio.gather(*(work(index, stage) for _ in range(stage.concurrency)))
+        if index + 1 < len(stages):
+            for _ in range(stages[index + 1].concurrency):
+                await queues[index + 1].put(_DONE)
+
+    try:
+        await asyncio.gather(
+            feed(), *(run_stage(i, stage) for i, stage in enumerate(stages))
+        )
+    finally:
+        executor.shutdown(wait=False)
+
+    stats["total"] = {"elapsed": time.monotonic() - started}
+    return stats
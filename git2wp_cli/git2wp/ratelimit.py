@@ -0,0 +1,253 @@
+"""
+Process-wide rate and concurrency limits per backend.
+
+Every backend (a WordPress site, an Ollama server) gets one :class:`Limiter`
+shared by all threads of the process. It combines:
+
+* a token bucket bounding the request rate, which a ``Retry-After`` (or a
+  429/503 without one) pauses for everybody, not only the thread that was
+  throttled, and
+* an AIMD concurrency limit: it grows by about one slot per round trip while
+  requests succeed at normal latency, and halves when the backend throttles,
+  fails or slows down well beyond the fastest latency seen, at most once per
+  round trip.
+
+Batch runs therefore settle just below the throughput the backend accepts
+instead of tripping its protection and losing work.
+"""
+import email.utils
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Longest Retry-After we honour; longer pauses are capped
+MAX_RETRY_AFTER = 300.0
+# Pause used for a throttling response without a usable Retry-After
+DEFAULT_THROTTLE_PAUSE = 1.0
+DECREASE_FACTOR = 0.5
+# An EWMA latency above this multiple of its lowest value counts as congestion
+DEFAULT_LATENCY_TOLERANCE = 3.0
+EWMA_ALPHA = 0.2
+BEST_LATENCY_DRIFT = 1.01
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds of a ``Retry-After`` header, if valid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when is None:
+            return None
+        delay = when.timestamp() - time.time()
+    return min(MAX_RETRY_AFTER, max(0.0, delay))
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` 0 disables the rate limit."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` (e.g. after a Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def _delay(self) -> float:
+        """Take a token, or return how long to wait for one (lock held)."""
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if not self.rate:
+            return 0.0
+        refill = (now - max(self.updated, self.paused_until)) * self.rate
+        self.tokens = min(self.capacity, self.tokens + refill)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self._delay()
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+class Permit:
+    """One admitted request; report its outcome before the block ends."""
+
+    __slots__ = ("started", "outcome", "retry_after")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        # "ok", "failed", "throttled" or None (not counted, e.g. cancelled)
+        self.outcome: Optional[str] = "ok"
+        self.retry_after: Optional[float] = None
+
+    def failed(self) -> None:
+        self.outcome = "failed"
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        self.outcome = "throttled"
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """Token bucket plus AIMD concurrency limit for one backend."""
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: Optional[float] = None,
+        max_concurrency: int = 8,
+        initial_concurrency: Optional[int] = None,
+        latency_tolerance: Optional[float] = DEFAULT_LATENCY_TOLERANCE,
+    ):
+        """Create a limiter.
+
+        Args:
+            rate: Requests per second (0 for no rate limit)
+            burst: Bucket size (default: one second worth of requests)
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            initial_concurrency: Starting limit (default: half the maximum)
+            latency_tolerance: Treat latencies above this multiple of the
+                fastest EWMA as congestion; None disables the latency signal
+                (for LLM generations, whose latency depends on the prompt)
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        initial = initial_concurrency or max(1, self.max_concurrency // 2)
+        self.limit = float(min(self.max_concurrency, initial))
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.ewma_latency: Optional[float] = None
+        self.best_latency: Optional[float] = None
+        self.last_decrease = 0.0
+        self.stats = {"ok": 0, "failed": 0, "throttled": 0}
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def permit(self) -> Iterator[Permit]:
+        """Wait for a concurrency slot and a token, then yield a :class:`Permit`.
+
+        Raising inside the block counts as a failure unless the permit was
+        already marked throttled, and ``GeneratorExit`` (a consumer stopped
+        reading a stream) is not counted at all.
+        """
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+        permit = Permit()
+        try:
+            self.bucket.acquire()
+            permit.started = time.monotonic()
+            yield permit
+        except GeneratorExit:
+            permit.outcome = None
+            raise
+        except BaseException:
+            if permit.outcome == "ok":
+                permit.failed()
+            raise
+        finally:
+            self._release(permit)
+
+    def _release(self, permit: Permit) -> None:
+        latency = time.monotonic() - permit.started
+        if permit.outcome == "throttled":
+            pause = permit.retry_after
+            self.bucket.pause(DEFAULT_THROTTLE_PAUSE if pause is None else pause)
+        with self._cond:
+            self.in_flight -= 1
+            if permit.outcome is not None:
+                self.stats[permit.outcome] += 1
+            if permit.outcome == "ok":
+                self._observe(latency)
+                if self._congested():
+                    self._decrease(permit)
+                else:
+                    # Additive increase: about +1 per limit's worth of successes
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            elif permit.outcome is not None:
+                self._decrease(permit)
+            self._cond.notify_all()
+
+    def _observe(self, latency: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += EWMA_ALPHA * (latency - self.ewma_latency)
+        # The floor drifts up slowly so a permanently slower backend is relearned
+        if self.best_latency is None:
+            self.best_latency = self.ewma_latency
+        else:
+            self.best_latency = min(self.ewma_latency, self.best_latency * BEST_LATENCY_DRIFT)
+
+    def _congested(self) -> bool:
+        return (
+            self.latency_tolerance is not None
+            and self.best_latency is not None
+            and self.ewma_latency > self.latency_tolerance * self.best_latency
+        )
+
+    def _decrease(self, permit: Permit) -> None:
+        # Requests already in flight at the last decrease saw the old limit
+        if permit.started < self.last_decrease:
+            return
+        self.limit = max(1.0, self.limit * DECREASE_FACTOR)
+        self.last_decrease = time.monotonic()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return the current limit, load and outcome counters."""
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "ewma_latency": self.ewma_latency or 0.0,
+                **self.stats,
+            }
+
+
+_limiters: Dict[str, Limiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(key: str, **settings) -> Limiter:
+    """Return the process-wide limiter for a backend, creating it on first use.
+
+    ``key`` names the backend, e.g. ``wordpress:https://example.com`` or
+    ``ollama:http://gpu1:11434``; ``settings`` only apply on creation.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = _limiters[key] = Limiter(**settings)
+        return limiter
+
+
+def limiters() -> Dict[str, Limiter]:
+    """Return every limiter created in this process, by backend."""
+    with _limiters_lock:
+        return dict(_limiters)
@@ -0,0 +1,225 @@
+"""
+Parallel, incremental discovery of Git repositories under ``GIT_PATH``.
+
+Repositories are detected and their HEAD resolved by reading ``.git`` directly,
+without spawning ``git``. A small on-disk index remembers the mtimes of each
+repository's HEAD and refs so that a rescan only re-reads repositories whose
+refs changed since the previous run.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = 1
+
+
+def find_git_dir(path: str) -> Optional[str]:
+    """Return the git directory of a working tree, or None if it has none."""
+    dot_git = os.path.join(path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git if os.path.isfile(os.path.join(dot_git, "HEAD")) else None
+    if os.path.isfile(dot_git):
+        # Worktrees and submodules use a "gitdir: <path>" file
+        try:
+            with open(dot_git, "r", encoding="utf-8") as f:
+                line = f.readline().strip()
+        except OSError:
+            return None
+        if line.startswith("gitdir:"):
+            git_dir = os.path.join(path, line[len("gitdir:"):].strip())
+            if os.path.isfile(os.path.join(git_dir, "HEAD")):
+                return os.path.normpath(git_dir)
+    return None
+
+
+def _common_dir(git_dir: str) -> str:
+    """Return the directory holding shared refs (differs for worktrees)."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _mtime_ns(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _lookup_packed_ref(common_dir: str, ref: str) -> Optional[str]:
+    packed = os.path.join(common_dir, "packed-refs")
+    try:
+        with open(packed, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return None
+
+
+def read_head(git_dir: str) -> Tuple[Optional[str], Optional[str]]:
+    """Resolve HEAD without running git.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: ``(branch, sha)``; ``branch`` is
+        None for a detached HEAD and ``sha`` is None for an unborn branch
+    """
+    head = _read_text(os.path.join(git_dir, "HEAD"))
+    if not head:
+        return None, None
+    if not head.startswith("ref:"):
+        return None, head
+
+    ref = head[len("ref:"):].strip()
+    branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    common_dir = _common_dir(git_dir)
+    sha = _read_text(os.path.join(common_dir, ref))
+    if sha is None:
+        sha = _lookup_packed_ref(common_dir, ref)
+    return branch, sha
+
+
+def refs_fingerprint(git_dir: str) -> List[int]:
+    """Return the mtimes that change whenever HEAD or a branch tip moves."""
+    common_dir = _common_dir(git_dir)
+    head = _read_text(os.path.join(git_dir, "HEAD")) or ""
+    current_ref = head[len("ref:"):].strip() if head.startswith("ref:") else ""
+    return [
+        _mtime_ns(os.path.join(git_dir, "HEAD")),
+        _mtime_ns(os.path.join(common_dir, current_ref)) if current_ref else 0,
+        _mtime_ns(os.path.join(common_dir, "refs", "heads")),
+        _mtime_ns(os.path.join(common_dir, "packed-refs")),
+    ]
+
+
+def iter_candidates(root: str, depth: int = 2) -> Iterator[str]:
+    """Yield directories exactly ``depth`` levels below ``root`` (``*/*``)."""
+    if depth <= 0:
+        yield root
+        return
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+            continue
+        yield from iter_candidates(entry.path, depth - 1)
+
+
+def scan_repository(
+    path: str, previous: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Inspect one candidate directory.
+
+    Args:
+        path: Directory to inspect
+        previous: Index entry from the last scan, if any
+
+    Returns:
+        Optional[Dict[str, Any]]: Index entry with a ``changed`` flag, or None
+        if ``path`` is not a Git repository
+    """
+    git_dir = find_git_dir(path)
+    if git_dir is None:
+        return None
+
+    fingerprint = refs_fingerprint(git_dir)
+    if previous and previous.get("fingerprint") == fingerprint:
+        return {**previous, "changed": False}
+
+    branch, head = read_head(git_dir)
+    return {
+        "path": path,
+        "name": os.path.basename(path),
+        "git_dir": git_dir,
+        "branch": branch,
+        "head": head,
+        "fingerprint": fingerprint,
+        "changed": previous is None or previous.get("head") != head,
+    }
+
+
+class ScanIndex:
+    """JSON file mapping repository paths to their last scanned state."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> "ScanIndex":
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if data.get("version") == INDEX_VERSION:
+            self.entries = data.get("repositories", {})
+        return self
+
+    def save(self) -> None:
+        """Write the index atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "repositories": self.entries}, f)
+        os.replace(tmp_path, self.path)
+
+
+def scan_repositories(
+    root: str,
+    index_path: Optional[str] = None,
+    depth: int = 2,
+    max_workers: int = 16,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Scan ``root`` for repositories in parallel, updating the scan index.
+
+    Args:
+        root: Directory to scan (``GIT_PATH``)
+        index_path: Where to persist the scan index (None disables it)
+        depth: How many directory levels below ``root`` repositories live
+        max_workers: Size of the thread pool used to inspect candidates
+        limit: Maximum number of repositories to return
+
+    Returns:
+        List[Dict[str, Any]]: One entry per repository, sorted by path
+    """
+    # Imported here so git hooks reading HEAD through this module stay cheap
+    from concurrent.futures import ThreadPoolExecutor
+
+    root = os.path.abspath(os.path.expanduser(root))
+    index = ScanIndex(index_path).load() if index_path else None
+    previous = index.entries if index else {}
+
+    candidates = list(iter_candidates(root, depth))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        results = executor.map(
+            lambda path: scan_repository(path, previous.get(path)), candidates
+        )
+        repositories = [r for r in results if r is not None]
+
+    if index is not None:
+        index.entries = {
+            r["path"]: {k: v for k, v in r.items() if k != "changed"}
+            for r in repositories
+        }
+        index.save()
+
+    if limit is not None:
+        repositories = repositories[:limit]
+    return repositories
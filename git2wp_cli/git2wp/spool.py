@@ -0,0 +1,174 @@
+"""
+Spool directory that decouples git hooks from publishing.
+
+A hook only appends a small JSON file naming the repository and commit, which
+takes a few milliseconds and never runs git, the LLM or HTTP. ``git2wp
+worker`` drains the spool later through the normal publish path.
+
+The layout follows maildir: entries are written to ``tmp/`` and renamed into
+``new/``, so readers never see partial files. A worker claims an entry by
+renaming it to ``cur/`` (only one of several workers can win that rename)
+and removes it once it is in the job queue; unreadable entries are moved to
+``failed/``.
+
+This module is the hook entry point (``git2wp-hook``), so it must stay cheap
+to import: standard library, the scanner and the config loader only.
+"""
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Entries claimed longer ago than this belong to a worker that died
+DEFAULT_STALE_AFTER = 3600.0
+
+
+def default_spool_dir() -> str:
+    """Return the spool directory ``git2wp worker`` drains.
+
+    ``~/.config/git2wp/.env`` is loaded first, as the CLI does, so a
+    GIT2WP_SPOOL_DIR or GIT2WP_DATA_DIR set only there is honoured. The
+    rest of the configuration is not validated: the hook must not fail.
+    """
+    from . import config
+
+    config.load_env()
+    spool_dir = os.environ.get("GIT2WP_SPOOL_DIR")
+    if spool_dir:
+        return os.path.expanduser(spool_dir)
+    data_dir = os.environ.get("GIT2WP_DATA_DIR") or os.path.join("~", ".config", "git2wp")
+    return os.path.join(os.path.expanduser(data_dir), "spool")
+
+
+class Spool:
+    """Directory queue of ``{"repo", "sha", "queued_at"}`` entries."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.dirs = {
+            name: os.path.join(path, name) for name in ("tmp", "new", "cur", "failed")
+        }
+
+    def put(self, repo_path: str, sha: str) -> str:
+        """Atomically add an entry and return its name."""
+        for name in ("tmp", "new"):
+            os.makedirs(self.dirs[name], exist_ok=True)
+        # Names sort in arrival order, so workers publish oldest first
+        name = f"{time.time_ns():020d}-{os.getpid()}-{sha[:12]}.json"
+        tmp_path = os.path.join(self.dirs["tmp"], name)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"repo": repo_path, "sha": sha, "queued_at": time.time()}, f)
+        os.rename(tmp_path, os.path.join(self.dirs["new"], name))
+        return name
+
+    def _names(self, state: str) -> List[str]:
+        try:
+            return sorted(n for n in os.listdir(self.dirs[state]) if n.endswith(".json"))
+        except FileNotFoundError:
+            return []
+
+    def pending(self) -> int:
+        return len(self._names("new"))
+
+    def claim(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Move up to ``limit`` of the oldest entries to ``cur/`` and return them."""
+        os.makedirs(self.dirs["cur"], exist_ok=True)
+        entries = []
+        for name in self._names("new"):
+            if len(entries) >= limit:
+                break
+            path = os.path.join(self.dirs["cur"], name)
+            try:
+                os.rename(os.path.join(self.dirs["new"], name), path)
+            except FileNotFoundError:
+                continue  # Claimed by another worker
+            try:
+                # Rename keeps the mtime; stale detection needs the claim time
+                os.utime(path)
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                self._move(name, "cur", "failed", {"error": f"unreadable entry: {e}"})
+                continue
+            entry["name"] = name
+            entries.append(entry)
+        return entries
+
+    def ack(self, entry: Dict[str, Any]) -> None:
+        """Remove a published entry."""
+        try:
+            os.remove(os.path.join(self.dirs["cur"], entry["name"]))
+        except FileNotFoundError:
+            pass
+
+    def recover(self, stale_after: float = DEFAULT_STALE_AFTER) -> int:
+        """Return entries claimed by workers that died to ``new/``."""
+        recovered = 0
+        now = time.time()
+        for name in self._names("cur"):
+            try:
+                claimed_at = os.stat(os.path.join(self.dirs["cur"], name)).st_mtime
+            except FileNotFoundError:
+                continue
+            if now - claimed_at < stale_after:
+                continue
+            self._move(name, "cur", "new")
+            recovered += 1
+        return recovered
+
+    def _move(
+        self, name: str, source: str, target: str, data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        os.makedirs(self.dirs[target], exist_ok=True)
+        source_path = os.path.join(self.dirs[source], name)
+        target_path = os.path.join(self.dirs[target], name)
+        if data is not None:
+            data = {k: v for k, v in data.items() if k != "name"}
+            tmp_path = os.path.join(self.dirs["tmp"], name)
+            os.makedirs(self.dirs["tmp"], exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, target_path)
+            try:
+                os.remove(source_path)
+            except FileNotFoundError:
+                pass
+            return
+        try:
+            os.replace(source_path, target_path)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Hook entry point: ``git2wp-hook [REPO] [SHA]``.
+
+    Defaults to the current directory and its HEAD, which is what a
+    post-commit hook needs. Always exits 0 so a problem here never fails
+    the commit.
+    """
+    args = sys.argv[1:] if argv is None else argv
+    repo_path = os.path.abspath(args[0] if args else os.getcwd())
+    sha = args[1] if len(args) > 1 else None
+    try:
+        if sha is None:
+            from .scanner import find_git_dir, read_head
+
+            git_dir = find_git_dir(repo_path)
+            sha = read_head(git_dir)[1] if git_dir else None
+        if not sha:
+            print(f"git2wp-hook: no commit to queue in {repo_path}", file=sys.stderr)
+            return 0
+        Spool(default_spool_dir()).put(repo_path, sha)
+    except Exception as e:
+        # Anything, including a broken .env: the commit itself must go through
+        print(
+            f"git2wp-hook: could not queue {repo_path}: {type(e).__name__}: {e}",
+            file=sys.stderr,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
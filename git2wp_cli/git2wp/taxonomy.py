@@ -0,0 +1,154 @@
+"""
+Persistent cache of WordPress categories and tags.
+
+Every page of a taxonomy is fetched once and kept in a JSON file next to the
+other Git2WP data. After the TTL, pages are revalidated with ``If-None-Match``
+so an unchanged taxonomy costs only ``304 Not Modified`` responses, and slug
+lookups on the publish path are answered from memory.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .wordpress import WordPressClient, WordPressError
+
+CACHE_VERSION = 1
+DEFAULT_TTL = 3600.0
+PER_PAGE = 100
+
+
+class TaxonomyCache:
+    """Slug to ID mapping for the taxonomies of one WordPress site."""
+
+    def __init__(
+        self,
+        client: WordPressClient,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+    ):
+        """Create a cache.
+
+        Args:
+            client: Client of the site whose terms are cached
+            path: JSON file shared by all sites (None: memory only)
+            ttl: Seconds before cached pages are revalidated
+        """
+        self.client = client
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # taxonomy -> {"fetched_at", "pages": [{"etag", "terms": {slug: id}}]}
+        self._taxonomies: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self._taxonomies = data.get("sites", {}).get(self.client.base_url, {})
+
+    def _save(self) -> None:
+        """Merge this site's entry into the cache file and write it atomically."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != CACHE_VERSION:
+            data = {"version": CACHE_VERSION, "sites": {}}
+        data.setdefault("sites", {})[self.client.base_url] = self._taxonomies
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _fetch_page(
+        self, taxonomy: str, page: int, etag: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Return a page entry, or None when the server answered 304."""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.client.get(
+            f"/wp/v2/{taxonomy}",
+            params={"per_page": PER_PAGE, "page": page, "_fields": "id,slug"},
+            headers=headers,
+        )
+        if response.status_code == 304:
+            return None
+        if response.status_code != 200:
+            raise WordPressError(
+                f"GET /wp/v2/{taxonomy} page {page}: HTTP {response.status_code}"
+            )
+        return {
+            "etag": response.headers.get("ETag"),
+            "total_pages": int(response.headers.get("X-WP-TotalPages") or 1),
+            "terms": {term["slug"]: term["id"] for term in response.json()},
+        }
+
+    def refresh(self, taxonomy: str) -> None:
+        """Fetch or revalidate every page of ``taxonomy``."""
+        cached = self._taxonomies.get(taxonomy, {}).get("pages", [])
+        pages: List[Dict[str, Any]] = []
+        total_pages = 1
+        page = 1
+        while page <= total_pages:
+            previous = cached[page - 1] if page <= len(cached) else None
+            fetched = self._fetch_page(
+                taxonomy, page, previous["etag"] if previous else None
+            )
+            entry = previous if fetched is None else fetched
+            total_pages = entry.get("total_pages", 1)
+            pages.append(entry)
+            page += 1
+
+        self._taxonomies[taxonomy] = {"fetched_at": time.time(), "pages": pages}
+        self._save()
+
+    def terms(self, taxonomy: str) -> Dict[str, int]:
+        """Return the slug to ID mapping of ``taxonomy``, refreshing it if stale.
+
+        Raises:
+            WordPressError: If the taxonomy was never fetched and cannot be now
+        """
+        with self._lock:
+            entry = self._taxonomies.get(taxonomy)
+            if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+                try:
+                    self.refresh(taxonomy)
+                except WordPressError:
+                    # Serve stale terms rather than failing the publish
+                    if entry is None:
+                        raise
+                    entry["fetched_at"] = time.time()
+            terms: Dict[str, int] = {}
+            for page in self._taxonomies[taxonomy]["pages"]:
+                terms.update(page["terms"])
+            return terms
+
+    def lookup(self, taxonomy: str, slug: str) -> Optional[int]:
+        """Return the ID of the term with ``slug``, or None if there is none."""
+        return self.terms(taxonomy).get(slug)
+
+    def default_category_id(self) -> Optional[int]:
+        """Return the "uncategorized" category, else the first one known."""
+        categories = self.terms("categories")
+        if "uncategorized" in categories:
+            return categories["uncategorized"]
+        return next(iter(categories.values()), None)
+
+    def invalidate(self, taxonomy: Optional[str] = None) -> None:
+        """Force the next lookup to revalidate one or all taxonomies."""
+        with self._lock:
+            for name in [taxonomy] if taxonomy else list(self._taxonomies):
+                if name in self._taxonomies:
+                    self._taxonomies[name]["fetched_at"] = 0.0
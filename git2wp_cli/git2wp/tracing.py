@@ -0,0 +1,245 @@
+"""
+Opt-in tracing of the publish pipeline (``git2wp --profile trace.json``).
+
+Code marks its stages with :func:`span` (or the :func:`traced` decorator).
+While no tracer is active a span is a shared no-op object, so instrumented
+code pays one global lookup. With :func:`start`, every finished span is kept
+as a Chrome trace "complete" event, which chrome://tracing and
+https://ui.perfetto.dev display per thread, and :func:`format_summary`
+prints the time spent per stage.
+
+With ``memory=True`` the tracer also runs :mod:`tracemalloc`: each span
+records how much traced memory it left allocated, and a ``memory`` counter
+track shows current and peak usage over time.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _NoopSpan:
+    """What :func:`span` returns while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed stage; :meth:`set` adds arguments shown in the trace."""
+
+    __slots__ = ("tracer", "name", "cat", "args", "start", "memory")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+        self.memory = 0
+
+    def __enter__(self) -> "Span":
+        if self.tracer.memory:
+            self.memory = self.tracer.traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self, end)
+
+    def set(self, **args: Any) -> None:
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects finished spans as Chrome trace events."""
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.events: List[Dict[str, Any]] = []
+        self.threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        if memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+    @staticmethod
+    def traced_memory() -> tuple:
+        import tracemalloc
+
+        return tracemalloc.get_traced_memory()
+
+    def record(self, span: Span, end: int) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": span.name,
+            "cat": span.cat,
+            "ph": "X",
+            "ts": (span.start - self.origin) / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": self.pid,
+            "tid": thread.ident,
+            "args": span.args,
+        }
+        counter = None
+        if self.memory:
+            current, peak = self.traced_memory()
+            span.args["memory_delta_kb"] = round((current - span.memory) / 1024, 1)
+            counter = {
+                "name": "memory",
+                "ph": "C",
+                "ts": event["ts"] + event["dur"],
+                "pid": self.pid,
+                "args": {"current_kb": current // 1024, "peak_kb": peak // 1024},
+            }
+        with self._lock:
+            self.threads[thread.ident] = thread.name
+            self.events.append(event)
+            if counter:
+                self.events.append(counter)
+
+    def close(self) -> None:
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Return the trace in the Chrome trace event format."""
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "git2wp"}}
+        ]
+        for tid, name in threads.items():
+            metadata.append(
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                 "args": {"name": name}}
+            )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        """Write the Chrome trace JSON to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Return count and timings (ms) per span name, most total time first."""
+        with self._lock:
+            events = [e for e in self.events if e["ph"] == "X"]
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for event in events:
+            by_name.setdefault(event["name"], []).append(event)
+        rows = []
+        for name, group in by_name.items():
+            durations = sorted(e["dur"] / 1000 for e in group)
+            row = {
+                "name": name,
+                "count": len(durations),
+                "total_ms": sum(durations),
+                "mean_ms": sum(durations) / len(durations),
+                "p95_ms": durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+                "max_ms": durations[-1],
+            }
+            if self.memory:
+                row["memory_delta_kb"] = max(
+                    e["args"].get("memory_delta_kb", 0.0) for e in group
+                )
+            rows.append(row)
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+
+_tracer: Optional[Tracer] = None
+
+
+def start(memory: bool = False) -> Tracer:
+    """Start collecting spans in this process."""
+    global _tracer
+    _tracer = Tracer(memory=memory)
+    return _tracer
+
+
+def stop() -> Optional[Tracer]:
+    """Stop collecting and return the tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None:
+        tracer.close()
+    return tracer
+
+
+def active() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, cat: str = "git2wp", **args: Any):
+    """Time a block: ``with span("git.commit", sha=sha) as sp: ...``."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return Span(tracer, name, cat, args)
+
+
+def traced(name: str, cat: str = "git2wp") -> Callable[[F], F]:
+    """Decorator form of :func:`span`."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            with Span(tracer, name, cat, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def format_summary(rows: List[Dict[str, Any]]) -> str:
+    """Render :meth:`Tracer.summary` rows as a text table."""
+    memory = any("memory_delta_kb" in row for row in rows)
+    header = (
+        f"{'stage':<28}{'count':>7}{'total ms':>12}"
+        f"{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}"
+    )
+    if memory:
+        header += f"{'mem KB':>10}"
+    lines = [header]
+    for row in rows:
+        line = (
+            f"{row['name']:<28}{row['count']:>7}{row['total_ms']:>12.1f}"
+            f"{row['mean_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['max_ms']:>10.1f}"
+        )
+        if memory:
+            line += f"{row.get('memory_delta_kb', 0.0):>10.1f}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,245 @@
+"""
+Long-running watcher that reacts to new commits under ``GIT_PATH``.
+
+Repositories are found with the scanner, and their refs are watched through
+inotify on Linux (via ``ctypes``, no extra dependency) or by polling the ref
+mtimes otherwise. Bursts of ref updates are debounced per repository, and the
+callback for a repository whose HEAD moved runs on a bounded thread pool,
+never twice at the same time for one repository.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from . import scanner
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_DEBOUNCE = 5.0
+DEFAULT_RESCAN_INTERVAL = 60.0
+# With inotify, refs are still polled this much less often as a safety net
+# (e.g. for branches in nested ref directories)
+INOTIFY_POLL_FACTOR = 15
+
+_EVENT_HEADER = struct.Struct("iIII")
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+class Inotify:
+    """Minimal inotify binding; raises OSError where inotify is unavailable."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("libc has no inotify support")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path: str, mask: int = IN_WATCH_MASK) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        return wd
+
+    def read(self, timeout: float) -> List[int]:
+        """Wait up to ``timeout`` seconds and return the watch descriptors that fired."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        wds = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            wds.append(wd)
+            offset += _EVENT_HEADER.size + length
+        return wds
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class RefWatcher:
+    """Call ``on_change(repo_path, old_head, new_head)`` when a HEAD moves."""
+
+    def __init__(
+        self,
+        root: str,
+        on_change: Callable[[str, Optional[str], str], None],
+        depth: int = 2,
+        interval: float = DEFAULT_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_workers: int = 2,
+        rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+        use_inotify: Optional[bool] = None,
+    ):
+        """Create a watcher.
+
+        Args:
+            root: Directory containing the repositories (``GIT_PATH``)
+            on_change: Called on a worker thread with the previous and new
+                HEAD of a repository (``old_head`` is None for a new
+                repository or branch)
+            depth: How many directory levels below ``root`` repositories live
+            interval: Seconds between ref polls (without inotify)
+            debounce: Quiet period after the last ref change before acting
+            max_workers: Maximum number of callbacks running at once
+            rescan_interval: Seconds between scans for new repositories
+            use_inotify: Force inotify on or off (default: use it if available)
+        """
+        self.root = root
+        self.on_change = on_change
+        self.depth = depth
+        self.interval = interval
+        self.debounce = debounce
+        self.rescan_interval = rescan_interval
+        self.repositories: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, float] = {}
+        self._running: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="watch"
+        )
+        self._inotify: Optional[Inotify] = None
+        self._watches: Dict[int, str] = {}
+        self._looping = False
+        if use_inotify is not False:
+            try:
+                self._inotify = Inotify()
+            except OSError:
+                if use_inotify:
+                    raise
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def rescan(self) -> None:
+        """Pick up repositories added under the root since the last scan."""
+        for repo in scanner.scan_repositories(self.root, depth=self.depth):
+            if repo["path"] not in self.repositories:
+                self.repositories[repo["path"]] = repo
+                self._watch(repo)
+
+    def _watch(self, repo: Dict[str, Any]) -> None:
+        if not self._inotify:
+            return
+        git_dir = repo["git_dir"]
+        common_dir = scanner._common_dir(git_dir)
+        paths = {git_dir, common_dir, os.path.join(common_dir, "refs", "heads")}
+        if repo.get("branch"):
+            ref_dir = os.path.dirname(
+                os.path.join(common_dir, "refs", "heads", repo["branch"])
+            )
+            paths.add(ref_dir)
+        for path in paths:
+            try:
+                self._watches[self._inotify.add_watch(path)] = repo["path"]
+            except OSError:
+                pass
+
+    def poll(self) -> None:
+        """Mark repositories whose ref mtimes changed as pending."""
+        now = time.monotonic()
+        for path, repo in list(self.repositories.items()):
+            fingerprint = scanner.refs_fingerprint(repo["git_dir"])
+            if fingerprint != repo["fingerprint"]:
+                repo["fingerprint"] = fingerprint
+                self._pending[path] = now
+
+    def _wait_for_events(self, timeout: float) -> None:
+        if not self._inotify:
+            self._stop.wait(timeout)
+            return
+        now = time.monotonic()
+        for wd in self._inotify.read(timeout):
+            path = self._watches.get(wd)
+            if path:
+                self._pending[path] = now
+
+    def dispatch(self) -> None:
+        """Act on repositories that have been quiet for the debounce period."""
+        now = time.monotonic()
+        for path, changed_at in list(self._pending.items()):
+            if now - changed_at < self.debounce:
+                continue
+            with self._lock:
+                if path in self._running:
+                    # Re-checked once the running callback is done
+                    continue
+                del self._pending[path]
+                repo = self.repositories[path]
+                branch, head = scanner.read_head(repo["git_dir"])
+                old_head = repo["head"] if branch == repo.get("branch") else None
+                if head is None or head == repo["head"]:
+                    repo["branch"] = branch
+                    continue
+                repo["branch"], repo["head"] = branch, head
+                self._running.add(path)
+            try:
+                self._executor.submit(self._run, path, old_head, head)
+            except RuntimeError:
+                # Stopped while dispatching; shutdown refuses new work
+                with self._lock:
+                    self._running.discard(path)
+                return
+
+    def _run(self, path: str, old_head: Optional[str], new_head: str) -> None:
+        try:
+            self.on_change(path, old_head, new_head)
+        finally:
+            with self._lock:
+                self._running.discard(path)
+
+    def run(self) -> None:
+        """Watch until :meth:`stop` is called."""
+        self._looping = True
+        try:
+            self.rescan()
+            last_rescan = last_poll = time.monotonic()
+            poll_every = self.interval * (INOTIFY_POLL_FACTOR if self._inotify else 1)
+            while not self._stop.is_set():
+                timeout = min(self.interval, self.debounce / 2) if self._pending else self.interval
+                self._wait_for_events(timeout)
+                now = time.monotonic()
+                if now - last_poll >= poll_every:
+                    self.poll()
+                    last_poll = now
+                if now - last_rescan >= self.rescan_interval:
+                    self.rescan()
+                    last_rescan = now
+                self.dispatch()
+        finally:
+            self._looping = False
+            self._close_inotify()
+
+    def _close_inotify(self) -> None:
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop watching; with ``wait``, let running callbacks finish first."""
+        self._stop.set()
+        self._executor.shutdown(wait=wait)
+        if not self._looping:
+            # Otherwise the loop closes inotify once it notices the stop
+            self._close_inotify()
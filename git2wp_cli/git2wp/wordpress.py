@@ -0,0 +1,316 @@
+"""
+WordPress REST API client shared by both CLIs.
+
+A single ``requests.Session`` keeps a keep-alive connection pool, the
+authentication header is built once, and requests are retried with jittered
+exponential backoff on connection errors and 5xx responses. All clients of a
+site share one adaptive limiter (see :mod:`git2wp.ratelimit`): throttling
+responses (429, or 503 with ``Retry-After``) pause the whole process for the
+requested time and are retried instead of failing the post.
+"""
+import base64
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from . import metrics, ratelimit, tracing
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Throttling responses retried (after their Retry-After) before giving up
+THROTTLE_RETRIES = 8
+DEFAULT_MAX_CONCURRENCY = 8
+USER_AGENT = "Git2WP/1.0"
+# WordPress rejects batch requests with more sub-requests than this
+MAX_BATCH_SIZE = 25
+# Methods that are safe to resend after the server may have processed them
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+class WordPressError(RuntimeError):
+    """Raised when WordPress cannot be reached after all retries."""
+
+
+def _never_sent(error: Exception) -> bool:
+    """Whether a request failed before any of it could reach the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # Refused connections and DNS failures: MaxRetryError(reason=NewConnectionError)
+    reason = error.args[0] if error.args else None
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
+class WordPressClient:
+    """Pooled, retrying client for one WordPress site."""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str = "",
+        password: str = "",
+        token: str = "",
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        pool_size: int = 10,
+        rate: float = 0.0,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ):
+        """Create a client.
+
+        Args:
+            base_url: Site URL, without ``/wp-json``
+            username: User for Basic auth (application password)
+            password: Password for Basic auth
+            token: Bearer token, used when no username/password is given
+            timeout: Per-request timeout in seconds (``WORDPRESS_TIMEOUT``)
+            retries: Extra attempts after a connection error or 5xx response
+                (only failures to connect, for POST)
+            backoff: Base delay in seconds for the exponential backoff
+            pool_size: Maximum number of pooled keep-alive connections
+            rate: Requests per second to the site, 0 for no limit
+                (``WORDPRESS_RATE``; shared by every client of the site)
+            max_concurrency: Upper bound of the adaptive number of concurrent
+                requests (``WORDPRESS_MAX_CONCURRENCY``)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        # None until the first batch call tells us whether /batch/v1 exists
+        self.supports_batch: Optional[bool] = None
+        self.limiter = ratelimit.get_limiter(
+            f"wordpress:{self.base_url}", rate=rate, max_concurrency=max_concurrency
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+
+        username, password = username.strip(), password.strip()
+        if username and password:
+            credentials = f"{username}:{password}".encode("utf-8")
+            self.session.headers["Authorization"] = (
+                f"Basic {base64.b64encode(credentials).decode('ascii')}"
+            )
+        elif token:
+            self.session.headers["Authorization"] = f"Bearer {token.strip()}"
+
+    @property
+    def has_auth(self) -> bool:
+        return "Authorization" in self.session.headers
+
+    def api_url(self, path: str) -> str:
+        """Return the absolute URL of a REST route such as ``/wp/v2/posts``."""
+        return f"{self.base_url}/wp-json{path}"
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: spreads retries from concurrent workers apart
+        time.sleep(random.uniform(0, min(MAX_BACKOFF, self.backoff * 2 ** attempt)))
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """Send a request, retrying connection errors, 5xx and throttling.
+
+        POSTs are not idempotent: WordPress may have stored the post before a
+        5xx, a read timeout or a dropped connection, so those are only
+        retried when the connection could not be opened or was throttled.
+
+        Returns:
+            requests.Response: The last response received
+
+        Raises:
+            WordPressError: If every attempt failed to get a response
+        """
+        with tracing.span("wordpress.request", method=method, path=path) as trace:
+            response = self._request(method, path, **kwargs)
+            trace.set(status=response.status_code)
+            return response
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        url = path if path.startswith(("http://", "https://")) else self.api_url(path)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        last_error: Optional[Exception] = None
+        errors = throttles = 0
+        while True:
+            response: Optional[requests.Response] = None
+            with self.limiter.permit() as permit:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    permit.failed()
+                    last_error = e
+                    metrics.inc("git2wp_wordpress_responses_total", code="error")
+                else:
+                    # Every attempt counts, so retried 429s and 5xx show up too
+                    metrics.inc("git2wp_wordpress_responses_total", code=response.status_code)
+                    retry_after = response.headers.get("Retry-After")
+                    if response.status_code == 429 or (
+                        response.status_code == 503 and retry_after
+                    ):
+                        permit.throttled(ratelimit.parse_retry_after(retry_after))
+                    elif response.status_code >= 500:
+                        permit.failed()
+
+            if response is not None and permit.outcome == "throttled":
+                if throttles == THROTTLE_RETRIES:
+                    return response
+                # The limiter holds every request to this site until Retry-After
+                throttles += 1
+                response.close()
+                continue
+            if response is not None and (
+                response.status_code < 500 or errors == self.retries or not idempotent
+            ):
+                return response
+            if response is None and not idempotent and not _never_sent(last_error):
+                # The request was sent (the connection dropped or the response
+                # timed out) and may have been processed
+                raise WordPressError(f"{method} {url} failed after sending: {last_error}")
+            if errors == self.retries:
+                raise WordPressError(f"{method} {url} failed: {last_error}")
+            if response is not None:
+                response.close()
+            self._sleep_before_retry(errors)
+            errors += 1
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def current_user(self) -> requests.Response:
+        return self.get("/wp/v2/users/me")
+
+    def create_post(self, data: Dict[str, Any]) -> requests.Response:
+        return self.post("/wp/v2/posts", json=data)
+
+    def batch(
+        self, operations: List[Dict[str, Any]]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Run many write operations through ``/batch/v1`` (WordPress 5.6+).
+
+        Operations are sent :data:`MAX_BATCH_SIZE` at a time. Servers without
+        the batch endpoint get the operations as individual requests, and
+        this is remembered for later calls.
+
+        Args:
+            operations: Dicts with ``path`` (e.g. ``/wp/v2/posts``), ``body``
+                and optional ``method`` (default ``POST``)
+
+        Returns:
+            List[Union[Dict[str, Any], Exception]]: ``{"status", "body"}`` for
+            each operation in input order, or the error that prevented it
+            from getting a response
+        """
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for start in range(0, len(operations), MAX_BATCH_SIZE):
+            chunk = operations[start:start + MAX_BATCH_SIZE]
+            chunk_results = None
+            if self.supports_batch is not False:
+                chunk_results = self._send_batch(chunk)
+            if chunk_results is None:
+                chunk_results = [self._send_single(op) for op in chunk]
+            results.extend(chunk_results)
+        return results
+
+    def _send_batch(
+        self, operations: List[Dict[str, Any]]
+    ) -> Optional[List[Union[Dict[str, Any], Exception]]]:
+        """Send one batch; None means the server has no batch endpoint."""
+        payload = {
+            "validation": "normal",
+            "requests": [
+                {
+                    "method": op.get("method", "POST"),
+                    "path": op["path"],
+                    "body": op.get("body", {}),
+                }
+                for op in operations
+            ],
+        }
+        try:
+            response = self.post("/batch/v1", json=payload)
+        except WordPressError as e:
+            return [e] * len(operations)
+
+        if response.status_code in (404, 405, 501):
+            self.supports_batch = False
+            return None
+        try:
+            responses = response.json().get("responses")
+        except (ValueError, AttributeError):
+            responses = None
+        if response.status_code not in (200, 207) or not isinstance(responses, list):
+            error = WordPressError(f"POST /batch/v1: HTTP {response.status_code}")
+            return [error] * len(operations)
+
+        self.supports_batch = True
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for index in range(len(operations)):
+            if index < len(responses):
+                item = responses[index]
+                results.append({"status": item.get("status", 0), "body": item.get("body")})
+            else:
+                results.append(WordPressError("Missing response in batch result"))
+        return results
+
+    def _send_single(self, operation: Dict[str, Any]) -> Union[Dict[str, Any], Exception]:
+        try:
+            response = self.request(
+                operation.get("method", "POST"),
+                operation["path"],
+                json=operation.get("body", {}),
+            )
+        except WordPressError as e:
+            return e
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        return {"status": response.status_code, "body": body}
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[tuple, WordPressClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(
+    base_url: str,
+    username: str = "",
+    password: str = "",
+    token: str = "",
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    rate: float = 0.0,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> WordPressClient:
+    """Return the shared client for a site and set of credentials."""
+    key = (base_url.rstrip("/"), username, password, token, timeout, retries)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = WordPressClient(
+                base_url,
+                username,
+                password,
+                token,
+                timeout=timeout,
+                retries=retries,
+                rate=rate,
+                max_concurrency=max_concurrency,
+            )
+        return client
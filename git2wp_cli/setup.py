@@ -27,6 +27,7 @@ setup(
     entry_points={
         "console_scripts": [
             "git2wp=cli:main",
+            "git2wp-hook=git2wp.spool:main",
         ],
     },
     classifiers=[
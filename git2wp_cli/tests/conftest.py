@@ -0,0 +1,68 @@
+"""Shared fixtures for Git2WP tests."""
+import subprocess
+
+import pytest
+
+from git2wp.fakes import FakeOllama
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+@pytest.fixture(autouse=True)
+def metrics_db(tmp_path, monkeypatch):
+    """Point CLI runs at a temporary metrics store, not ~/.config/git2wp."""
+    from git2wp import __main__ as main
+
+    path = tmp_path / "metrics.db"
+    monkeypatch.setitem(main.CONFIG, "metrics_db", str(path))
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """A small repository with a quoted subject, a rename and a binary file."""
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.name", "Test User")
+    _git(tmp_path, "config", "user.email", "test@example.com")
+    (tmp_path / "a.txt").write_text("a\n")
+    (tmp_path / "b.txt").write_text("b\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", 'Add "quoted" files')
+    (tmp_path / "a.txt").write_text("a\nmore\n")
+    _git(tmp_path, "mv", "b.txt", "c.txt")
+    (tmp_path / "blob.bin").write_bytes(b"\x00\x01\x02")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "Second commit\n\nWith a body.")
+    return tmp_path
+
+
+@pytest.fixture
+def ollama_server():
+    """Factory for local :class:`git2wp.fakes.FakeOllama` servers.
+
+    They serve the models ``m`` and ``test`` and answer ``chunks`` or
+    ``summary of <prompt[:20]>``, instantly unless ``tokens_per_sec`` is given.
+    """
+    servers = []
+
+    def start(chunks=None, delay=0.0, tokens_per_sec=0.0):
+        server = FakeOllama(
+            models=["m", "test"],
+            latency=delay,
+            tokens_per_sec=tokens_per_sec,
+            parallel=8,
+            reply=lambda prompt: chunks or [f"summary of {prompt[:20]}"],
+        )
+        servers.append(server.start())
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
@@ -0,0 +1,128 @@
+"""Tests for the multi-server work queue."""
+import time
+
+import pytest
+import requests
+
+from git2wp import config, git2text
+from git2wp.batch import ServerPool
+from git2wp.git2text import OllamaClient, parse_server_list
+from git2wp.health import HealthRegistry
+
+
+def _client(monkeypatch, servers):
+    monkeypatch.setitem(config.get_config(), "enable_cache", False)
+    client = OllamaClient()
+    client.servers = servers
+    client.health = HealthRegistry()
+    return client
+
+
+def test_parse_server_list(monkeypatch):
+    monkeypatch.setenv("OLLAMA_TIMEOUT", "60000")
+    servers = parse_server_list("http://gpu1:11434/;concurrency=2;model=m, http://gpu2:11434")
+    assert [s["url"] for s in servers] == ["http://gpu1:11434", "http://gpu2:11434"]
+    assert servers[0]["concurrency"] == 2 and servers[0]["model"] == "m"
+    assert servers[1]["concurrency"] == 1 and servers[1]["timeout"] == 60.0
+
+
+def test_jobs_are_spread_across_all_servers(monkeypatch, ollama_server):
+    backends = [ollama_server(delay=0.2) for _ in range(2)]
+    client = _client(monkeypatch, [
+        {"url": b.url, "model": "m", "timeout": 5, "concurrency": 2, "name": str(i)}
+        for i, b in enumerate(backends)
+    ])
+    pool = ServerPool(client)
+    assert pool.slots == 4
+
+    start = time.monotonic()
+    results = pool.map([{"prompt": f"commit {i}"} for i in range(8)])
+    elapsed = time.monotonic() - start
+
+    assert results == [f"summary of commit {i}" for i in range(8)]
+    assert all(len(b.generations) == 4 for b in backends)
+    assert elapsed < 8 * 0.2 / 2  # at least twice as fast as serial
+
+
+def test_throttled_jobs_do_not_use_up_attempts(monkeypatch, ollama_server):
+    server = ollama_server()
+    for _ in range(3):
+        server.respond_next(429, headers={"Retry-After": "0.05"})
+    client = _client(monkeypatch, [
+        {"url": server.url, "model": "m", "timeout": 5, "name": "busy"},
+    ])
+    results = ServerPool(client, max_attempts=1).map([{"prompt": "commit 0"}])
+    assert results == ["summary of commit 0"]
+    assert server.statuses[429] == 3
+
+
+def test_failed_jobs_move_to_healthy_servers(monkeypatch, ollama_server):
+    healthy = ollama_server()
+    client = _client(monkeypatch, [
+        {"url": "http://127.0.0.1:9", "model": "m", "timeout": 1, "name": "down"},
+        {"url": healthy.url, "model": "m", "timeout": 5, "name": "up"},
+    ])
+    results = ServerPool(client).map([{"prompt": f"commit {i}"} for i in range(4)])
+    assert results == [f"summary of commit {i}" for i in range(4)]
+    assert len(healthy.generations) == 4
+
+
+def test_generation_fails_over_within_one_call(monkeypatch, ollama_server):
+    hung = ollama_server(delay=1.0)
+    healthy = ollama_server()
+    client = _client(monkeypatch, [
+        {"url": hung.url, "model": "m", "timeout": 0.2, "name": "hung"},
+        {"url": healthy.url, "model": "m", "timeout": 5, "name": "up"},
+    ])
+    client.health = HealthRegistry(failure_threshold=1, reset_timeout=60)
+    client.health.record_probe(hung.url, 0.01)
+    client.health.record_probe(healthy.url, 0.5)
+
+    assert client.generate_text("first commit") == "summary of first commit"
+    assert len(hung.generations) == 1
+    assert client.health.breaker_state(hung.url) == "open"
+
+    # The open breaker is shared: later calls skip the server even once
+    # probes report it up again
+    client.health.record_probe(hung.url, 0.01)
+    assert client.generate_text("second commit") == "summary of second commit"
+    assert len(hung.generations) == 1
+    assert len(healthy.generations) == 2
+
+
+def test_invalid_response_body_fails_over(monkeypatch, ollama_server):
+    healthy = ollama_server()
+    post = requests.post
+
+    def garbled(url, **kwargs):
+        if url.startswith("http://garbled"):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b"<html>proxy error</html>"
+            return response
+        return post(url, **kwargs)
+
+    monkeypatch.setattr(git2text.requests, "post", garbled)
+    client = _client(monkeypatch, [
+        {"url": "http://garbled", "model": "m", "timeout": 5, "name": "garbled"},
+        {"url": healthy.url, "model": "m", "timeout": 5, "name": "up"},
+    ])
+    client.health.record_probe("http://garbled", 0.01)
+    client.health.record_probe(healthy.url, 0.5)
+
+    assert client.generate_text("first commit") == "summary of first commit"
+    assert client.health.state("http://garbled").breaker.failures == 1
+
+
+def test_one_server_error_does_not_take_the_only_server_out(monkeypatch, ollama_server):
+    server = ollama_server()
+    client = _client(monkeypatch, [
+        {"url": server.url, "model": "m", "timeout": 5, "name": "only"},
+    ])
+    client.health.record_probe(server.url, 0.01)
+    server.respond_next(500)
+
+    with pytest.raises(RuntimeError, match="HTTP 500"):
+        client.generate_text("first commit")
+    assert client.generate_text("second commit") == "summary of second commit"
+    assert client.health.breaker_state(server.url) == "closed"
@@ -0,0 +1,39 @@
+"""Tests for the synthetic-repository benchmark suite."""
+import json
+
+from git2wp import bench
+from git2wp.gitlog import iter_commits
+
+
+def test_synthetic_repositories_are_reproducible(tmp_path):
+    first = bench.make_repo(str(tmp_path / "a"), commits=5, files_per_commit=2, seed=7)
+    second = bench.make_repo(str(tmp_path / "b"), commits=5, files_per_commit=2, seed=7)
+    assert first == second
+    assert bench.make_repo(str(tmp_path / "c"), commits=5, seed=8) != first
+
+    commits = list(iter_commits(str(tmp_path / "a"), ["HEAD"]))
+    assert [c["hash"] for c in commits] == first[::-1]
+    assert all(len(c["changed_files"]) == 2 for c in commits)
+
+
+def test_suite_times_every_stage(tmp_path):
+    result = bench.run_suite(commits=6, files_per_commit=2, file_size=200)
+    json.dumps(result)
+    assert result["schema"] == bench.SCHEMA_VERSION
+    assert result["params"]["commits"] == 6
+    assert list(result["stages"]) == list(bench.STAGES)
+    for timing in result["stages"].values():
+        assert timing["count"] == 6
+        assert timing["throughput_per_s"] > 0
+        assert timing["p50_ms"] <= timing["p95_ms"] <= timing["max_ms"]
+
+
+def test_compare_reports_slower_stages():
+    def result(throughput, p95):
+        timing = {"throughput_per_s": throughput, "p95_ms": p95}
+        return {"stages": {"render": timing}}
+
+    assert bench.compare(result(100, 10), result(90, 11)) == []
+    regressions = bench.compare(result(100, 10), result(50, 20))
+    assert len(regressions) == 2
+    assert all(r.startswith("render:") for r in regressions)
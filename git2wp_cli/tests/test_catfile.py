@@ -0,0 +1,48 @@
+"""Tests for the persistent cat-file reader."""
+import pytest
+
+from git2wp import catfile, gitlog
+
+
+@pytest.fixture
+def reader(repo):
+    reader = catfile.CatFileReader(str(repo))
+    yield reader
+    reader.close()
+
+
+def test_commit_info_matches_git_log(repo, reader):
+    for rev in ("HEAD", "HEAD~1"):
+        expected = gitlog.get_commit(str(repo), rev)
+        info = reader.commit_info(rev)
+        for key in ("hash", "short_hash", "author", "email", "date", "subject", "body"):
+            assert info[key] == expected[key]
+        assert info["parents"] == expected["parents"]
+
+
+def test_changed_files_without_rename_detection(reader):
+    changes = {c["path"]: c["status"] for c in reader.commit_info("HEAD")["changed_files"]}
+    assert changes == {"a.txt": "M", "b.txt": "D", "c.txt": "A", "blob.bin": "A"}
+
+
+def test_blob_tree_and_missing_objects(reader):
+    assert reader.blob("HEAD:a.txt") == b"a\nmore\n"
+    assert set(reader.tree("HEAD")) == {"a.txt", "c.txt", "blob.bin"}
+    assert reader.info("HEAD")[1] == "commit"
+    assert reader.info("does-not-exist") is None
+    with pytest.raises(gitlog.GitError):
+        reader.read("does-not-exist")
+
+
+def test_revs_with_spaces_or_newlines(reader):
+    assert reader.info("no such rev") is None
+    with pytest.raises(gitlog.GitError):
+        reader.read("HEAD:no such file.txt")
+    with pytest.raises(gitlog.GitError):
+        reader.info("HEAD\nHEAD")
+    # The pipe is still in sync afterwards
+    assert reader.info("HEAD")[1] == "commit"
+
+
+def test_get_reader_is_shared(repo):
+    assert catfile.get_reader(str(repo)) is catfile.get_reader(str(repo) + "/")
@@ -0,0 +1,67 @@
+"""Tests for the SQLite commit index."""
+import subprocess
+from datetime import datetime
+
+from git2wp.commitindex import CommitIndex
+
+
+def test_ingest_is_incremental(repo, tmp_path):
+    with CommitIndex(str(tmp_path / "commits.db")) as index:
+        assert index.ingest(str(repo)) == 2
+        assert index.ingest(str(repo)) == 0
+
+        subprocess.run(
+            ["git", "-C", str(repo), "commit", "-q", "--allow-empty", "-m", "Third"],
+            check=True,
+        )
+        assert index.ingest(str(repo)) == 1
+
+        subjects = [c["subject"] for c in index.query(repo_path=str(repo))]
+        assert sorted(subjects) == sorted(
+            ["Third", "Second commit", 'Add "quoted" files']
+        )
+
+
+def test_query_filters_and_row_shape(repo, tmp_path):
+    with CommitIndex(str(tmp_path / "commits.db")) as index:
+        index.ingest(str(repo))
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        on_day = list(index.commits_on_day(today))
+        assert len(on_day) == 2
+        assert list(index.query(author="nobody@example.com")) == []
+        by_author = list(index.query(author="test@example.com", since=0))
+        assert len(by_author) == 2
+
+        second = next(c for c in by_author if c["subject"] == "Second commit")
+        assert second["body"] == "With a body."
+        assert second["repo_name"] == repo.name
+        assert {c["path"] for c in second["changed_files"]} == {
+            "a.txt", "c.txt", "blob.bin"
+        }
+        assert second["additions"] == 1
+
+        assert index.get_commit(str(repo), second["short_hash"])["hash"] == second["hash"]
+
+
+def test_publish_from_index_needs_a_date(repo):
+    from click.testing import CliRunner
+
+    from git2wp import __main__ as main
+
+    result = CliRunner().invoke(main.cli, ["publish", str(repo), "--from-index", "--dry-run"])
+    assert result.exit_code == 2
+    assert "--from-index needs --since or --until" in result.output
+
+
+def test_all_repos_only_with_digest_or_enqueue(repo):
+    from click.testing import CliRunner
+
+    from git2wp import __main__ as main
+
+    result = CliRunner().invoke(
+        main.cli,
+        ["publish", str(repo), "--from-index", "--all-repos", "--since", "2020-01-01", "--dry-run"],
+    )
+    assert result.exit_code == 2
+    assert "--all-repos needs --from-index with --digest or --enqueue" in result.output
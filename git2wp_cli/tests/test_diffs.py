@@ -0,0 +1,104 @@
+"""Tests for budgeted diff extraction and diff-aware prompts."""
+import subprocess
+import sys
+
+import pytest
+
+from git2wp import config, diffs, git2text
+from git2wp.git2text import OllamaClient
+from git2wp.gitlog import get_commit
+from git2wp.health import HealthRegistry
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, stdout=subprocess.PIPE)
+
+
+def _big_commit(repo, files=30, lines=200):
+    for i in range(files):
+        path = repo / "src" / f"mod{i % 3}" / f"file{i}.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(f"value_{i}_{n} = {n}\n" for n in range(lines)))
+    (repo / "package-lock.json").write_text('{"lockfileVersion": 3}\n' * 500)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", "Add many modules")
+
+
+def test_is_generated():
+    assert diffs.is_generated("web/package-lock.json")
+    assert diffs.is_generated("static/app.min.js")
+    assert diffs.is_generated("vendor/lib/x.go")
+    assert not diffs.is_generated("src/vendoring.py")
+
+
+def test_file_diffs_skip_binary_and_generated(repo):
+    sections = dict(diffs.iter_file_diffs(str(repo), "HEAD"))
+    assert "blob.bin" not in sections
+    assert "+more" in sections["a.txt"]
+
+    _big_commit(repo, files=2, lines=5)
+    assert "package-lock.json" not in dict(diffs.iter_file_diffs(str(repo), "HEAD"))
+
+
+def test_budgets_bound_the_diff(repo):
+    _big_commit(repo)
+    sections = list(diffs.iter_file_diffs(str(repo), "HEAD", max_bytes=10_000, file_budget=1_000))
+    assert 5 <= len(sections) < 30
+    assert all(len(text) < 1_100 for _, text in sections)
+    assert "truncated" in sections[0][1]
+
+    groups = diffs.group_diffs(sections, 3_000)
+    assert len(groups) > 1
+    assert all(sum(len(t) for _, t in group) <= 3_000 for group in groups)
+
+
+def test_file_diffs_survive_a_full_stderr_pipe(repo, monkeypatch):
+    # More warnings than a pipe buffer holds, written before any output
+    script = "import sys; sys.stderr.write('w' * 1_000_000); sys.exit(1)"
+    monkeypatch.setattr(
+        diffs, "_diff_tree_command", lambda *args: [sys.executable, "-c", script]
+    )
+    with pytest.raises(diffs.GitError, match="www"):
+        list(diffs.iter_file_diffs(str(repo), "HEAD"))
+
+
+def test_large_file_lists_are_aggregated_per_directory():
+    changes = [
+        {"status": "M", "path": f"src/api/f{i}.py", "additions": 2, "deletions": 1}
+        for i in range(150)
+    ] + [{"status": "A", "path": "README.md", "additions": 1, "deletions": 0}]
+    lines = diffs.describe_changed_files(changes)
+    assert lines == ["src/api/ (150 files: 150 M; +300/-150)", "./ (1 files: 1 A; +1/-0)"]
+
+
+def test_prompt_includes_small_diff(repo, monkeypatch):
+    monkeypatch.setitem(config.get_config(), "diff_budget_bytes", diffs.DEFAULT_PROMPT_BUDGET)
+    commit_info = get_commit(str(repo), "HEAD")
+    _, prompt = git2text.prepare_commit_prompt("repo", commit_info, repo_path=str(repo))
+    assert "Diff (generated and binary files omitted" in prompt
+    assert "+more" in prompt
+
+    monkeypatch.setitem(config.get_config(), "diff_budget_bytes", 0)
+    _, prompt = git2text.prepare_commit_prompt("repo", commit_info, repo_path=str(repo))
+    assert "Diff" not in prompt
+
+
+def test_oversized_commit_is_mapped_then_synthesized(repo, monkeypatch, ollama_server):
+    _big_commit(repo)
+    monkeypatch.setitem(config.get_config(), "enable_cache", False)
+    monkeypatch.setitem(config.get_config(), "diff_budget_bytes", 4000)
+    monkeypatch.setitem(config.get_config(), "diff_max_bytes", 20000)
+    server = ollama_server()
+    client = OllamaClient()
+    client.servers = [{"url": server.url, "model": "m", "timeout": 5, "concurrency": 4, "name": "s"}]
+    client.health = HealthRegistry()
+
+    commit_info = get_commit(str(repo), "HEAD")
+    commit_info["repo_path"] = str(repo)
+    _, prompt = git2text.prepare_commit_prompt("repo", commit_info, client)
+
+    map_calls = [r for r in server.generations if r["system"] == git2text.DIFF_MAP_SYSTEM_PROMPT]
+    assert 4 <= len(map_calls) <= 6
+    assert all(len(r["prompt"]) < 4_500 for r in map_calls)
+    assert prompt.count("- summary of Repository: repo") == len(map_calls)
+    assert "Diff (generated" not in prompt
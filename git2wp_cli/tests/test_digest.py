@@ -0,0 +1,92 @@
+"""Tests for daily/weekly digests."""
+from datetime import datetime
+
+from git2wp import config, digest
+from git2wp.git2text import OllamaClient
+from git2wp.health import HealthRegistry
+
+
+def _commit(i, day, repo="r1", body=""):
+    return {
+        "hash": f"{i:040x}",
+        "short_hash": f"{i:07x}",
+        "author": "Dev",
+        "subject": f"Change number {i}",
+        "body": body,
+        "timestamp": datetime(2024, 5, day, 12).timestamp(),
+        "repo_name": repo,
+        "changed_files": [{"status": "M", "path": f"src/file{i}.py"}],
+        "additions": 1,
+        "deletions": 0,
+    }
+
+
+def _client(monkeypatch, server):
+    monkeypatch.setitem(config.get_config(), "enable_cache", False)
+    client = OllamaClient()
+    client.servers = [
+        {"url": server.url, "model": "m", "timeout": 5, "concurrency": 4, "name": "s"}
+    ]
+    client.health = HealthRegistry()
+    return client
+
+
+def test_period_keys_and_grouping():
+    assert digest.period_key(datetime(2024, 5, 31, 23).timestamp(), "day") == "2024-05-31"
+    assert digest.period_key(datetime(2024, 5, 31).timestamp(), "week") == "2024-W22"
+
+    commits = [_commit(1, 27), _commit(2, 28, "r2"), _commit(3, 27), _commit(4, 30)]
+    assert list(digest.group_commits(commits, "day")) == [
+        ("2024-05-27", None), ("2024-05-28", None), ("2024-05-30", None)
+    ]
+    by_repo = digest.group_commits(commits, "week", by_repo=True)
+    assert [len(group) for group in by_repo.values()] == [3, 1]
+    assert list(by_repo) == [("2024-W22", "r1"), ("2024-W22", "r2")]
+
+
+def test_line_counts_come_from_index_totals_or_numstat():
+    assert "1 files, +1/-0)" in digest.describe_commit(_commit(1, 27))
+
+    # Commits from the git log stream only have per-file numstat counts
+    streamed = {**_commit(2, 27), "changed_files": [
+        {"status": "M", "path": "a.py", "additions": 3, "deletions": 1},
+        {"status": "M", "path": "logo.png", "additions": None, "deletions": None},
+    ]}
+    del streamed["additions"], streamed["deletions"]
+    assert "(Dev, 2 files, +3/-1)" in digest.describe_commit(streamed)
+
+    streamed["changed_files"] = streamed["changed_files"][1:]
+    assert "(Dev, 1 files)" in digest.describe_commit(streamed)
+
+
+def test_pack_respects_budget():
+    chunks = digest.pack(["a" * 40, "b" * 40, "c" * 40, "d" * 500], 100)
+    assert [len(chunk) for chunk in chunks] == [2, 1, 1]
+    assert all(sum(len(t) + 1 for t in chunk) <= 101 for chunk in chunks)
+
+
+def test_small_group_needs_one_generation(monkeypatch, ollama_server):
+    server = ollama_server()
+    client = _client(monkeypatch, server)
+    article = digest.summarize_group(client, "r1, 2024-05-27", [_commit(1, 27)])
+    assert article.startswith("summary of")
+    assert len(server.generations) == 1
+    assert server.generations[0]["system"] == digest.REDUCE_SYSTEM_PROMPT
+
+
+def test_large_group_maps_in_parallel_then_reduces(monkeypatch, ollama_server):
+    server = ollama_server(delay=0.1)
+    client = _client(monkeypatch, server)
+    commits = [_commit(i, 27, body="details " * 40) for i in range(40)]
+
+    article = digest.summarize_group(client, "r1, 2024-05-27", commits, token_budget=500)
+
+    systems = [request["system"] for request in server.generations]
+    assert systems.count(digest.MAP_SYSTEM_PROMPT) > 1
+    assert systems[-1] == digest.REDUCE_SYSTEM_PROMPT
+    assert systems.count(digest.REDUCE_SYSTEM_PROMPT) == 1
+    assert all(len(request["prompt"]) <= 2500 for request in server.generations)
+    assert article.startswith("summary of")
+
+    content = digest.render_digest("r1", commits[:2], article)
+    assert "<code>0000001</code> Change number 1" in content
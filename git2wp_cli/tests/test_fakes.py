@@ -0,0 +1,116 @@
+"""Tests for the fake WordPress and Ollama servers, driven by the real clients."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from git2wp import config, wordpress
+from git2wp.fakes import FakeOllama, FakeWordPress, Latency
+from git2wp.git2text import OllamaClient
+from git2wp.health import HealthRegistry
+from git2wp.taxonomy import TaxonomyCache
+
+
+def _ollama_client(monkeypatch, *fakes, timeout=5):
+    monkeypatch.setitem(config.get_config(), "enable_cache", False)
+    client = OllamaClient()
+    client.servers = [
+        {"url": fake.url, "model": "llama3:latest", "timeout": timeout, "name": str(n)}
+        for n, fake in enumerate(fakes)
+    ]
+    client.health = HealthRegistry()
+    return client
+
+
+def test_latency_specs():
+    assert Latency.parse("0.25").kind == "fixed"
+    assert repr(Latency.parse("lognormal:0.1,0.5")) == "lognormal:0.1,0.5"
+    with pytest.raises(ValueError):
+        Latency.parse("uniform:1")
+    with pytest.raises(ValueError):
+        Latency.parse("gamma:1,2")
+
+
+def test_wordpress_posts_batches_and_auth():
+    with FakeWordPress() as site:
+        client = wordpress.WordPressClient(site.url, "admin", "secret", backoff=0)
+        assert client.current_user().json()["name"] == "Admin"
+        created = client.create_post({"title": "t", "content": "c"}).json()
+        assert created["title"]["raw"] == "t"
+
+        results = client.batch(
+            [{"path": "/wp/v2/posts", "body": {"title": str(n)}} for n in range(30)]
+        )
+        assert [r["status"] for r in results] == [201] * 30
+        assert len(site.posts) == 31
+        # 30 operations take two /batch/v1 calls
+        assert sum(1 for r in site.requests if r.path.endswith("/batch/v1")) == 2
+
+        anonymous = wordpress.WordPressClient(site.url, backoff=0)
+        assert anonymous.current_user().status_code == 401
+
+
+def test_taxonomy_pages_revalidate_with_etags():
+    with FakeWordPress(categories=[f"c{n}" for n in range(150)]) as site:
+        client = wordpress.WordPressClient(site.url, "admin", "secret", backoff=0)
+        cache = TaxonomyCache(client, ttl=0)
+        assert len(cache.terms("categories")) == 150
+        cache.terms("categories")
+        assert site.statuses[304] == 2
+
+
+def test_wordpress_throttling_is_seeded_and_honoured():
+    with FakeWordPress(throttle_rate=0.5, retry_after=0.01, seed=3) as site:
+        client = wordpress.WordPressClient(site.url, "admin", "secret", backoff=0)
+        for _ in range(5):
+            assert client.create_post({"title": "t"}).status_code == 201
+        throttled = site.statuses[429]
+    assert throttled > 0
+    with FakeWordPress(throttle_rate=0.5, retry_after=0.01, seed=3) as site:
+        client = wordpress.WordPressClient(site.url, "admin", "secret", backoff=0)
+        for _ in range(5):
+            client.create_post({"title": "t"})
+        assert site.statuses[429] == throttled
+
+
+def test_ollama_generates_at_the_configured_speed(monkeypatch):
+    with FakeOllama(tokens_per_sec=100, response_tokens=10) as ollama:
+        client = _ollama_client(monkeypatch, ollama)
+        received = []
+        start = time.monotonic()
+        text = client.generate_text("a commit", on_token=received.append)
+        assert time.monotonic() - start >= 0.1
+        assert len(received) == 10 and text == "".join(received)
+        assert client.last_stats["tokens_per_sec"] == pytest.approx(100)
+        assert client.generate_text("a commit").startswith("Summary of a commit")
+
+        models = requests.get(f"{ollama.url}/api/ps").json()["models"]
+        assert [m["name"] for m in models] == ["llama3:latest"]
+
+
+def test_ollama_parallel_slots_queue_and_overflow():
+    with FakeOllama(tokens_per_sec=20, response_tokens=4, max_queue=1) as ollama:
+        payload = {"model": "llama3:latest", "prompt": "p", "stream": False}
+
+        def generate(delay):
+            time.sleep(delay)
+            return requests.post(f"{ollama.url}/api/generate", json=payload).status_code
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            statuses = sorted(executor.map(generate, (0, 0.05, 0.1)))
+        # One generates, one waits for the slot, the third finds the queue full
+        assert statuses == [200, 200, 503]
+
+
+def test_dropped_stream_fails_over_to_the_next_server(monkeypatch):
+    with FakeOllama(disconnect_rate=1.0, tokens_per_sec=0) as broken, FakeOllama(
+        tokens_per_sec=0
+    ) as healthy:
+        client = _ollama_client(monkeypatch, broken, healthy)
+        client.health.record_probe(broken.url, 0.01)
+        client.health.record_probe(healthy.url, 0.5)
+        received = []
+        text = client.generate_text("a commit", on_token=received.append)
+        assert text.startswith("Summary of a commit")
+        assert any("retrying on 1" in token for token in received)
@@ -0,0 +1,55 @@
+"""Tests for streaming commit extraction."""
+import io
+import sys
+
+import pytest
+
+from git2wp import gitlog
+
+
+def test_iter_commits_parses_messages_and_changes(repo):
+    commits = list(gitlog.iter_commits(str(repo)))
+
+    assert [c["subject"] for c in commits] == ["Second commit", 'Add "quoted" files']
+    second, first = commits
+    assert second["body"] == "With a body."
+    assert second["parents"] == [first["hash"]]
+    assert first["parents"] == []
+
+    changes = {c["path"]: c for c in second["changed_files"]}
+    assert changes["a.txt"]["status"] == "M"
+    assert (changes["a.txt"]["additions"], changes["a.txt"]["deletions"]) == (1, 0)
+    assert changes["c.txt"]["status"].startswith("R")
+    assert changes["c.txt"]["old_path"] == "b.txt"
+    assert changes["blob.bin"]["status"] == "A"
+    assert changes["blob.bin"]["additions"] is None
+
+
+def test_get_commit_and_range(repo):
+    first = gitlog.get_commit(str(repo), "HEAD~1")
+    assert first["subject"] == 'Add "quoted" files'
+    assert sorted(c["path"] for c in first["changed_files"]) == ["a.txt", "b.txt"]
+
+    in_range = list(gitlog.iter_commits(str(repo), ["HEAD~1..HEAD"]))
+    assert [c["subject"] for c in in_range] == ["Second commit"]
+
+
+def test_iter_commits_bad_revision(repo):
+    with pytest.raises(gitlog.GitError):
+        list(gitlog.iter_commits(str(repo), ["does-not-exist"]))
+
+
+def test_iter_commits_survives_a_full_stderr_pipe(repo, monkeypatch):
+    # More warnings than a pipe buffer holds, written before any output
+    script = "import sys; sys.stderr.write('w' * 1_000_000); sys.exit(1)"
+    monkeypatch.setattr(
+        gitlog, "_build_log_command", lambda *args: [sys.executable, "-c", script]
+    )
+    with pytest.raises(gitlog.GitError, match="www"):
+        list(gitlog.iter_commits(str(repo)))
+
+
+def test_iter_records_handles_split_chunks():
+    data = b"\x1eone\x00x\x1etwo\x00y\x1ethree"
+    records = list(gitlog.iter_records(io.BytesIO(data), chunk_size=3))
+    assert records == [b"one\x00x", b"two\x00y", b"three"]
@@ -0,0 +1,116 @@
+"""Tests for cached Ollama server health and EWMA routing."""
+import time
+
+from git2wp.health import HealthRegistry
+
+SERVERS = [{"url": "http://a", "name": "A"}, {"url": "http://b", "name": "B"}]
+
+
+def test_first_rank_probes_then_uses_cache():
+    probes = []
+
+    def probe(server):
+        probes.append(server["url"])
+        return {"http://a": 0.2, "http://b": 0.1}[server["url"]]
+
+    registry = HealthRegistry(ttl=60)
+    assert [s["url"] for s in registry.rank(SERVERS, probe)] == ["http://b", "http://a"]
+    assert len(probes) == 2
+
+    registry.rank(SERVERS, probe)
+    assert len(probes) == 2
+
+
+def test_ewma_generation_latency_overrides_probe_latency():
+    registry = HealthRegistry(ttl=60, alpha=0.5)
+    registry.rank(SERVERS, lambda s: 0.01)
+    registry.record_success("http://a", 1.0)
+    registry.record_success("http://a", 3.0)
+    registry.record_success("http://b", 5.0)
+
+    ranked = registry.rank(SERVERS, lambda s: 0.01)
+    assert [s["url"] for s in ranked] == ["http://a", "http://b"]
+    assert ranked[0]["response_time"] == 2.0
+
+
+def test_unused_server_is_ranked_on_probes_not_against_generations():
+    registry = HealthRegistry(ttl=60)
+    registry.rank(SERVERS, lambda s: {"http://a": 0.01, "http://b": 0.02}[s["url"]])
+    registry.record_success("http://b", 0.5)
+    # A has never generated: both are compared on probe latency
+    ranked = registry.rank(SERVERS, lambda s: 0.01)
+    assert [(s["url"], s["response_time"]) for s in ranked] == [
+        ("http://a", 0.01),
+        ("http://b", 0.02),
+    ]
+
+    registry.record_success("http://a", 1.0)
+    ranked = registry.rank(SERVERS, lambda s: 0.01)
+    assert [(s["url"], s["response_time"]) for s in ranked] == [
+        ("http://b", 0.5),
+        ("http://a", 1.0),
+    ]
+
+
+def test_failed_server_is_skipped_and_refreshed_in_background():
+    registry = HealthRegistry(ttl=0.05)
+    registry.rank(SERVERS, lambda s: 0.1)
+    registry.record_probe("http://a", None)
+    assert [s["url"] for s in registry.rank(SERVERS, lambda s: 0.1)] == ["http://b"]
+
+    time.sleep(0.1)
+    registry.rank(SERVERS, lambda s: 0.1)  # stale: triggers a background probe
+    for _ in range(50):
+        if registry.state("http://a").available:
+            break
+        time.sleep(0.01)
+    assert registry.state("http://a").available
+
+
+def test_generation_failures_below_the_threshold_keep_the_server():
+    registry = HealthRegistry(ttl=60, failure_threshold=3)
+    registry.rank(SERVERS, lambda s: 0.1)
+    registry.record_failure("http://a")
+    registry.record_failure("http://a")
+    assert registry.breaker_state("http://a") == "closed"
+    assert len(registry.rank(SERVERS, lambda s: 0.1)) == 2
+
+
+def test_all_down_reprobes_only_after_ttl():
+    probes = []
+
+    def probe(server):
+        probes.append(server["url"])
+        return None
+
+    registry = HealthRegistry(ttl=60)
+    assert registry.rank(SERVERS, probe) == []
+    assert registry.rank(SERVERS, probe) == []
+    assert len(probes) == 2
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    registry = HealthRegistry(ttl=60, failure_threshold=2, reset_timeout=0.05)
+    registry.rank(SERVERS, lambda s: 0.1)
+    registry.record_failure("http://a")
+    registry.record_probe("http://a", 0.1)
+    assert registry.breaker_state("http://a") == "closed"
+    registry.record_failure("http://a")
+    registry.record_probe("http://a", 0.1)
+    # Probes say the server is up, but the breaker keeps it out of rotation
+    assert registry.breaker_state("http://a") == "open"
+    assert [s["url"] for s in registry.rank(SERVERS, lambda s: 0.1)] == ["http://b"]
+
+    time.sleep(0.06)
+    assert registry.allow("http://a")
+    assert registry.breaker_state("http://a") == "half-open"
+    assert not registry.allow("http://a")
+    registry.record_failure("http://a")
+    # A failed trial doubles the wait before the next one
+    time.sleep(0.06)
+    assert not registry.allow("http://a")
+    time.sleep(0.05)
+    assert registry.allow("http://a")
+    registry.record_success("http://a", 0.1)
+    assert registry.breaker_state("http://a") == "closed"
+    assert registry.allow("http://a") and registry.allow("http://a")
@@ -0,0 +1,88 @@
+"""Tests for the SQLite publish job queue."""
+import threading
+import time
+
+from git2wp import jobqueue
+
+
+def test_jobs_are_deduplicated_and_leased(tmp_path):
+    with jobqueue.JobQueue(str(tmp_path / "jobs.db")) as queue:
+        first = queue.enqueue("publish", "k1", {"n": 1})
+        assert queue.enqueue("publish", "k1", {"n": 1}) == first
+        queue.enqueue("publish", "k2", {"n": 2})
+
+        (job,) = queue.claim("a")
+        assert (job["id"], job["payload"], job["state"], job["attempts"]) == (
+            first, {"n": 1}, jobqueue.RUNNING, 1,
+        )
+        assert [j["payload"]["n"] for j in queue.claim("b", limit=5)] == [2]
+        assert queue.claim("c") == []
+
+        assert not queue.complete("b", first)
+        assert queue.complete("a", first)
+        # A finished key can be queued again
+        queue.enqueue("publish", "k1", {"n": 1})
+        assert queue.counts() == {"pending": 1, "running": 1, "done": 0, "failed": 0}
+
+
+def test_failures_back_off_then_dead_letter(tmp_path):
+    with jobqueue.JobQueue(str(tmp_path / "jobs.db"), max_attempts=2, backoff=0) as queue:
+        job_id = queue.enqueue("publish", "k", {})
+        queue.claim("w")
+        assert queue.fail("w", job_id, "timeout") == jobqueue.PENDING
+        queue.claim("w")
+        assert queue.fail("w", job_id, "timeout again") == jobqueue.FAILED
+        assert queue.claim("w") == []
+
+        (dead,) = queue.jobs(jobqueue.FAILED)
+        assert (dead["attempts"], dead["last_error"]) == (2, "timeout again")
+        assert queue.replay() == 1
+        assert queue.claim("w")[0]["attempts"] == 1
+
+    with jobqueue.JobQueue(str(tmp_path / "slow.db"), backoff=60) as queue:
+        job_id = queue.enqueue("publish", "k", {})
+        queue.claim("w")
+        queue.fail("w", job_id, "boom")
+        assert queue.claim("w") == []
+
+
+def test_expired_leases_are_taken_over(tmp_path):
+    with jobqueue.JobQueue(str(tmp_path / "jobs.db"), lease=0.05) as queue:
+        job_id = queue.enqueue("publish", "k", {})
+        queue.claim("crashed")
+        assert queue.heartbeat("crashed", [job_id]) == 1
+        time.sleep(0.1)
+        assert [j["id"] for j in queue.claim("survivor")] == [job_id]
+        assert queue.heartbeat("crashed", [job_id]) == 0
+        assert queue.fail("crashed", job_id, "late") is None
+        assert queue.complete("survivor", job_id)
+
+
+def test_concurrent_workers_claim_each_job_once(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    with jobqueue.JobQueue(path) as queue:
+        for n in range(200):
+            queue.enqueue("publish", f"k{n}", {"n": n})
+
+    claimed = []
+
+    def work(owner):
+        # One connection per worker, like separate processes
+        with jobqueue.JobQueue(path) as queue:
+            while True:
+                jobs = queue.claim(owner, limit=7)
+                if not jobs:
+                    return
+                for job in jobs:
+                    claimed.append(job["id"])
+                    queue.complete(owner, job["id"])
+
+    threads = [threading.Thread(target=work, args=(f"w{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(1, 201))
+    with jobqueue.JobQueue(path) as queue:
+        assert queue.counts()["done"] == 200
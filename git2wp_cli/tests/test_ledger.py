@@ -0,0 +1,66 @@
+"""Tests for the idempotent publish ledger."""
+import pytest
+
+from git2wp import ledger
+from git2wp import __main__ as main
+from git2wp.gitlog import get_commit
+
+
+def test_record_and_plan(tmp_path, repo):
+    with ledger.PublishLedger(str(tmp_path / "ledger.db")) as book:
+        assert book.get("https://wp", str(repo), "abc") is None
+        assert ledger.plan(None, "h1") == ledger.CREATE
+
+        book.record("https://wp", str(repo), "abc", 7, "src", "h1", link="https://wp/?p=7")
+        entry = book.get("https://wp", str(repo / "."), "abc")
+        assert entry["post_id"] == 7
+        assert ledger.plan(entry, "h1") == ledger.SKIP
+        assert ledger.plan(entry, "h2") == ledger.UPDATE
+
+        # Updates keep the link when WordPress did not return one
+        book.record("https://wp", str(repo), "abc", 7, "src", "h2")
+        assert book.get("https://wp", str(repo), "abc")["link"] == "https://wp/?p=7"
+        assert book.get("https://other", str(repo), "abc") is None
+
+
+def test_digest_separates_parts():
+    assert ledger.digest("ab", "c") != ledger.digest("a", "bc")
+
+
+@pytest.fixture
+def publisher(tmp_path, monkeypatch):
+    """Route ``save_post`` to a fake WordPress that records its calls."""
+    calls = []
+
+    def publish_to_wordpress(title, content, status="draft", post_id=None):
+        calls.append(post_id)
+        return {"id": post_id or 100 + len(calls), "link": "https://wp/?p=1"}
+
+    monkeypatch.setitem(main.CONFIG, "data_dir", str(tmp_path))
+    monkeypatch.setitem(main.CONFIG, "wordpress_url", "https://wp")
+    monkeypatch.setattr(main, "publish_to_wordpress", publish_to_wordpress)
+    return calls
+
+
+def test_save_post_creates_skips_and_updates(publisher, repo):
+    commit_info = get_commit(str(repo), "HEAD")
+    post = {"title": "t", "content": "c", "status": "draft"}
+
+    assert main.published_entry(str(repo), commit_info) is None
+    assert main.save_post(str(repo), commit_info, post)["id"] == 101
+    assert main.published_entry(str(repo), commit_info)["post_id"] == 101
+
+    assert main.save_post(str(repo), commit_info, post)["id"] == 101
+    assert publisher == [None]
+
+    main.save_post(str(repo), commit_info, {**post, "content": "changed"})
+    assert publisher == [None, 101]
+
+
+def test_unpublished_commits_skips_recorded_commits(publisher, repo):
+    commits = [get_commit(str(repo), "HEAD~1"), get_commit(str(repo), "HEAD")]
+    main.save_post(str(repo), commits[1], {"title": "t", "content": "c", "status": "draft"})
+
+    remaining = list(main.unpublished_commits(str(repo), commits))
+    assert [c["hash"] for c in remaining] == [commits[0]["hash"]]
+    assert len(list(main.unpublished_commits(str(repo), commits, force=True))) == 2
@@ -0,0 +1,84 @@
+"""Tests for the LLM summary cache."""
+import sqlite3
+import threading
+import time
+
+from git2wp.llmcache import SummaryCache
+
+
+def test_memory_and_disk_levels(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    key = SummaryCache.make_key("prompt", "system", "llama3", {"temperature": 0})
+    assert key != SummaryCache.make_key("prompt", "system", "mistral", None)
+
+    cache = SummaryCache(db_path, ttl=0, max_memory_entries=1)
+    cache.set(key, "summary")
+    cache.set("other", "value")  # pushes ``key`` out of the memory LRU
+    assert cache.get(key) == "summary"
+
+    # A fresh instance (e.g. the next CLI run) reads from disk
+    assert SummaryCache(db_path).get(key) == "summary"
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.db"), ttl=0.05, max_disk_bytes=10)
+    cache.set("a", "12345")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+
+    cache.ttl = 0
+    cache.set("b", "123456")
+    cache.set("c", "123456")
+    assert SummaryCache(str(tmp_path / "cache.db")).get("b") is None
+    assert cache.get("c") == "123456"
+
+
+def test_concurrent_requests_are_coalesced():
+    cache = SummaryCache()
+    calls = []
+    started = threading.Event()
+
+    def generate():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "generated"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_generate("k", generate))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["generated"] * 5
+    assert len(calls) == 1
+
+
+def test_cache_write_failure_does_not_strand_waiters(monkeypatch):
+    cache = SummaryCache()
+    started = threading.Event()
+
+    def generate():
+        started.set()
+        time.sleep(0.1)
+        return "generated"
+
+    def locked(key, value):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(cache, "set", locked)
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_generate("k", generate)))
+    owner.start()
+    started.wait()
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_generate("k", generate)))
+    waiter.start()
+    owner.join(2)
+    waiter.join(2)
+    assert results == ["generated"] * 2
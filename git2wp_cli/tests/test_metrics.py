@@ -0,0 +1,129 @@
+"""Tests for the shared pipeline metrics store and the /metrics endpoint."""
+import importlib.util
+import os
+import threading
+import urllib.request
+
+import pytest
+
+from git2wp import metrics
+
+SERVER = os.path.join(os.path.dirname(__file__), "..", "..", "public", "simple_server.py")
+
+
+def test_processes_add_up_in_the_shared_store(tmp_path):
+    path = str(tmp_path / "metrics.db")
+    with metrics.MetricsStore(path) as first, metrics.MetricsStore(path) as second:
+        for store in (first, second):
+            registry = metrics.Registry(store)
+            registry.inc("git2wp_commits_processed_total", result="published")
+            registry.inc("git2wp_llm_tokens_total", 40, server='gpu "1"')
+            registry.observe("git2wp_llm_request_duration_seconds", 0.3, server="gpu1")
+            registry.set_gauge("git2wp_queue_jobs", 7, state="pending")
+            registry.flush()
+        registry.set_gauge("git2wp_queue_jobs", 2, state="pending")
+        registry.flush()
+        text = first.exposition()
+
+    lines = text.splitlines()
+    assert "# TYPE git2wp_commits_processed_total counter" in lines
+    assert 'git2wp_commits_processed_total{result="published"} 2' in lines
+    assert 'git2wp_llm_tokens_total{server="gpu \\"1\\""} 80' in lines
+    assert 'git2wp_queue_jobs{state="pending"} 2' in lines
+    histogram = [line for line in lines if line.startswith("git2wp_llm_request_duration")]
+    assert histogram[0] == 'git2wp_llm_request_duration_seconds_bucket{server="gpu1",le="0.05"} 0'
+    assert 'git2wp_llm_request_duration_seconds_bucket{server="gpu1",le="0.5"} 2' in histogram
+    assert histogram[-3:] == [
+        'git2wp_llm_request_duration_seconds_bucket{server="gpu1",le="+Inf"} 2',
+        'git2wp_llm_request_duration_seconds_count{server="gpu1"} 2',
+        'git2wp_llm_request_duration_seconds_sum{server="gpu1"} 0.6',
+    ]
+
+
+def test_recording_is_a_noop_until_configured(tmp_path):
+    metrics.inc("git2wp_commits_processed_total", result="published")
+    assert not metrics.enabled()
+
+    path = str(tmp_path / "metrics.db")
+    metrics.configure(path, interval=60)
+    try:
+        metrics.inc("git2wp_commits_processed_total", result="published")
+    finally:
+        metrics.close()
+    with metrics.MetricsStore(path) as store:
+        assert 'git2wp_commits_processed_total{result="published"} 1' in store.exposition()
+
+
+def test_publish_records_commits(repo, metrics_db, monkeypatch):
+    from click.testing import CliRunner
+
+    from git2wp import __main__ as main
+
+    monkeypatch.setattr(main, "generate_llm_summary", lambda *args: ("title", "content"))
+    result = CliRunner().invoke(main.cli, ["publish", str(repo), "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert not metrics.enabled()
+    with metrics.MetricsStore(str(metrics_db)) as store:
+        assert 'git2wp_commits_processed_total{result="dry_run"} 1' in store.exposition()
+
+
+@pytest.fixture
+def simple_server():
+    if not os.path.exists(SERVER):
+        pytest.skip("public/simple_server.py not found")
+    spec = importlib.util.spec_from_file_location("simple_server", SERVER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_simple_server_renders_like_the_store(tmp_path, simple_server):
+    # The web server keeps its own copy of the renderer (it runs without the
+    # package installed); both must produce the same exposition
+    with metrics.MetricsStore(str(tmp_path / "metrics.db")) as store:
+        registry = metrics.Registry(store)
+        registry.inc("git2wp_llm_tokens_total", 40, server='gpu "1"\n')
+        registry.inc("git2wp_commits_processed_total", 0.5)
+        registry.observe("git2wp_llm_request_duration_seconds", 0.3, server="gpu1")
+        registry.observe("git2wp_llm_request_duration_seconds", 400, server="gpu2")
+        registry.set_gauge("git2wp_queue_jobs", 2, state="pending")
+        registry.flush()
+        store.conn.execute("INSERT INTO families VALUES ('unused', 'gauge', 'No samples')")
+        families = store.conn.execute("SELECT family, type, help FROM families").fetchall()
+        samples = store.conn.execute(
+            "SELECT family, name, labels, le, value FROM samples"
+        ).fetchall()
+
+    expected = metrics.render(families, samples)
+    assert "unused" not in expected
+    assert "\n".join(simple_server.render_families(families, samples)) + "\n" == expected
+    assert simple_server.render_families([], []) == []
+
+
+def test_simple_server_serves_metrics(tmp_path, simple_server):
+    path = str(tmp_path / "metrics.db")
+    with metrics.MetricsStore(path) as store:
+        registry = metrics.Registry(store)
+        registry.inc("git2wp_wordpress_responses_total", code=201)
+        registry.flush()
+
+    httpd = simple_server.EnhancedHTTPServer(
+        ("127.0.0.1", 0), simple_server.EnhancedHandler, metrics_db=path
+    )
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05})
+    thread.start()
+    url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    try:
+        urllib.request.urlopen(f"{url}/health").read()
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            content_type = response.headers["Content-Type"]
+            lines = response.read().decode().splitlines()
+    finally:
+        httpd.shutdown()
+        httpd.socket.close()
+        thread.join()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{code="200",method="GET",route="/health"} 1' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"} 1' in lines
+    assert 'git2wp_wordpress_responses_total{code="201"} 1' in lines
@@ -0,0 +1,51 @@
+"""Tests for the asyncio publishing pipeline."""
+import asyncio
+import time
+
+from git2wp.pipeline import Stage, run_pipeline
+
+
+def test_stages_overlap_and_results_flow_through():
+    def slow_double(x):
+        time.sleep(0.1)
+        return x * 2
+
+    def slow_increment(x):
+        time.sleep(0.05)
+        return x + 1
+
+    results = []
+    stats = asyncio.run(
+        run_pipeline(
+            range(8),
+            [Stage("double", slow_double, 4), Stage("increment", slow_increment, 2)],
+            on_result=results.append,
+        )
+    )
+
+    assert sorted(results) == [x * 2 + 1 for x in range(8)]
+    assert stats["extract"]["items"] == 8
+    assert stats["double"]["items"] == stats["increment"]["items"] == 8
+    # Serial would take 8 * 0.15s; overlapped stages take roughly the slowest one
+    assert stats["total"]["elapsed"] < 0.6
+
+
+def test_failing_items_are_reported_and_dropped():
+    def fail_on_odd(x):
+        if x % 2:
+            raise ValueError(x)
+        return x
+
+    errors, results = [], []
+    stats = asyncio.run(
+        run_pipeline(
+            range(6),
+            [Stage("check", fail_on_odd, 2), Stage("identity", lambda x: x)],
+            on_result=results.append,
+            on_error=lambda stage, item, e: errors.append((stage, item)),
+        )
+    )
+
+    assert sorted(results) == [0, 2, 4]
+    assert sorted(errors) == [("check", 1), ("check", 3), ("check", 5)]
+    assert stats["check"]["errors"] == 3
@@ -0,0 +1,77 @@
+"""Tests for the shared token-bucket/AIMD limiter."""
+import email.utils
+import threading
+import time
+
+from git2wp import ratelimit
+
+
+def test_parse_retry_after():
+    assert ratelimit.parse_retry_after("2") == 2.0
+    assert ratelimit.parse_retry_after("100000") == ratelimit.MAX_RETRY_AFTER
+    assert ratelimit.parse_retry_after("soon") is None
+    assert ratelimit.parse_retry_after(None) is None
+    later = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 25 < ratelimit.parse_retry_after(later) <= 30
+
+
+def test_bucket_bounds_the_rate():
+    bucket = ratelimit.TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+
+
+def test_aimd_grows_on_success_and_halves_once_per_round_trip():
+    limiter = ratelimit.Limiter(max_concurrency=8, initial_concurrency=4)
+    for _ in range(12):
+        with limiter.permit():
+            pass
+    assert 6 < limiter.limit <= 8
+
+    grown = limiter.limit
+    # Two requests in flight together are throttled: one decrease, not two
+    first, second = limiter.permit(), limiter.permit()
+    for context in (first, second):
+        context.__enter__().throttled(0.2)
+    first.__exit__(None, None, None)
+    second.__exit__(None, None, None)
+    assert limiter.limit == grown / 2
+    assert limiter.snapshot()["throttled"] == 2
+
+    # The Retry-After pauses the next request
+    start = time.monotonic()
+    with limiter.permit():
+        pass
+    assert time.monotonic() - start >= 0.15
+
+
+def test_errors_in_the_block_count_as_failures():
+    limiter = ratelimit.Limiter(max_concurrency=4, initial_concurrency=4)
+    try:
+        with limiter.permit():
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert (limiter.limit, limiter.snapshot()["failed"]) == (2.0, 1)
+
+
+def test_concurrency_is_bounded_across_threads():
+    limiter = ratelimit.Limiter(max_concurrency=2, initial_concurrency=2)
+    peak = [0]
+    lock = threading.Lock()
+
+    def work():
+        with limiter.permit():
+            with lock:
+                peak[0] = max(peak[0], limiter.in_flight)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert ratelimit.get_limiter("test:x", rate=1) is ratelimit.get_limiter("test:x")
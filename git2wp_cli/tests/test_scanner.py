@@ -0,0 +1,52 @@
+"""Tests for the incremental repository scanner."""
+import os
+import subprocess
+
+from git2wp import scanner
+
+
+def _commit(path, message):
+    subprocess.run(
+        ["git", "-C", str(path), "-c", "user.name=T", "-c", "user.email=t@e",
+         "commit", "-q", "--allow-empty", "-m", message],
+        check=True,
+    )
+
+
+def _rev_parse(path):
+    return subprocess.run(
+        ["git", "-C", str(path), "rev-parse", "HEAD"],
+        check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout.strip()
+
+
+def test_scan_detects_repositories_and_changes(tmp_path):
+    root = tmp_path / "github"
+    for name in ("one", "two"):
+        repo = root / "org" / name
+        repo.mkdir(parents=True)
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+        _commit(repo, "initial")
+    (root / "org" / "not-a-repo").mkdir()
+    index_path = str(tmp_path / "scan-index.json")
+
+    first = scanner.scan_repositories(str(root), index_path=index_path)
+    assert [r["name"] for r in first] == ["one", "two"]
+    assert all(r["changed"] for r in first)
+    assert first[0]["head"] == _rev_parse(root / "org" / "one")
+
+    second = scanner.scan_repositories(str(root), index_path=index_path)
+    assert not any(r["changed"] for r in second)
+
+    _commit(root / "org" / "two", "second")
+    third = scanner.scan_repositories(str(root), index_path=index_path)
+    assert [r["name"] for r in third if r["changed"]] == ["two"]
+    assert third[1]["head"] == _rev_parse(root / "org" / "two")
+
+
+def test_read_head_uses_packed_refs(repo):
+    subprocess.run(["git", "-C", str(repo), "pack-refs", "--all"], check=True)
+    git_dir = scanner.find_git_dir(str(repo))
+    branch, sha = scanner.read_head(git_dir)
+    assert not os.path.exists(os.path.join(git_dir, "refs", "heads", branch))
+    assert sha == _rev_parse(repo)
@@ -0,0 +1,164 @@
+"""Tests for the hook spool and the worker that drains it."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from git2wp import __main__ as main
+from git2wp import jobqueue, spool
+from git2wp.gitlog import get_commit
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_entries_move_through_the_spool(tmp_path):
+    queue = spool.Spool(str(tmp_path / "spool"))
+    first = queue.put("/repo", "a" * 40)
+    queue.put("/repo", "b" * 40)
+    assert queue.pending() == 2
+    assert os.listdir(queue.dirs["tmp"]) == []
+
+    claimed = queue.claim(limit=1)
+    assert [(e["name"], e["sha"]) for e in claimed] == [(first, "a" * 40)]
+    # A second worker only sees what is left
+    others = spool.Spool(queue.path).claim()
+    assert [e["sha"] for e in others] == ["b" * 40]
+
+    for entry in claimed + others:
+        queue.ack(entry)
+    assert os.listdir(queue.dirs["cur"]) == []
+    assert queue.pending() == 0
+
+
+def test_unreadable_entries_are_set_aside(tmp_path):
+    queue = spool.Spool(str(tmp_path))
+    name = queue.put("/repo", "a" * 40)
+    with open(os.path.join(queue.dirs["new"], name), "w") as f:
+        f.write("{")
+    assert queue.claim() == []
+    with open(os.path.join(queue.dirs["failed"], name)) as f:
+        assert "unreadable entry" in json.load(f)["error"]
+
+
+def test_stale_claims_are_recovered(tmp_path):
+    queue = spool.Spool(str(tmp_path))
+    queue.put("/repo", "a" * 40)
+    queue.claim()
+    assert queue.recover(stale_after=3600) == 0
+    assert queue.recover(stale_after=0) == 1
+    assert queue.pending() == 1
+
+
+def test_hook_queues_head_without_heavy_imports(tmp_path, repo):
+    # The spool dir is only set in .env, which the worker reads too
+    home = tmp_path / "home"
+    (home / ".config" / "git2wp").mkdir(parents=True)
+    (home / ".config" / "git2wp" / ".env").write_text(
+        f"GIT2WP_SPOOL_DIR={tmp_path / 'spool'}\n"
+    )
+    env = {k: v for k, v in os.environ.items() if not k.startswith("GIT2WP_")}
+    env.update(PYTHONPATH=PACKAGE_ROOT, HOME=str(home))
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, git2wp.spool as s; s.main([]);"
+            " print([m for m in ('click', 'requests') if m in sys.modules])",
+        ],
+        cwd=str(repo),
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+        text=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+    (entry,) = spool.Spool(str(tmp_path / "spool")).claim()
+    assert entry["repo"] == str(repo)
+    assert entry["sha"] == get_commit(str(repo), "HEAD")["hash"]
+
+
+def test_hook_never_fails_the_commit(repo, monkeypatch, capsys):
+    def broken_env():
+        raise ValueError("could not parse .env")
+
+    monkeypatch.setattr(spool, "default_spool_dir", broken_env)
+    assert spool.main([str(repo)]) == 0
+    assert "ValueError: could not parse .env" in capsys.readouterr().err
+
+
+@pytest.fixture
+def publish_jobs(tmp_path, monkeypatch):
+    """Run ``publish_jobs`` with stub summaries and a given ``publish_commit``.
+
+    Returns the number of published jobs and the error each job was settled
+    with, by job id.
+    """
+
+    def summarize_in_batches(repo_path, commits, stream=False):
+        for commit_info in commits:
+            yield commit_info, "summary"
+
+    monkeypatch.setitem(main.CONFIG, "data_dir", str(tmp_path))
+    monkeypatch.setattr(main, "summarize_in_batches", summarize_in_batches)
+
+    def run(jobs, publish_commit):
+        settled = {}
+
+        def settle(done_jobs, error):
+            for job in done_jobs:
+                settled[job["id"]] = error
+
+        monkeypatch.setattr(main, "publish_commit", publish_commit)
+        return main.publish_jobs(jobs, settle), settled
+
+    return run
+
+
+def test_worker_settles_each_job(repo, publish_jobs):
+    head = get_commit(str(repo), "HEAD")["hash"]
+    parent = get_commit(str(repo), "HEAD~1")["hash"]
+    jobs = [
+        {"id": n, "repo": str(repo), "sha": sha}
+        for n, sha in enumerate((parent, head, head, "0" * 40))
+    ]
+    published = []
+
+    def publish_commit(repo_path, commit_info, dry_run, status, stream=False, summary=None):
+        published.append(commit_info["hash"])
+        return commit_info["hash"] == head
+
+    count, settled = publish_jobs(jobs, publish_commit)
+    assert count == 2
+    # The duplicate job is published once
+    assert published == [parent, head]
+    assert settled[1] is None and settled[2] is None
+    assert "WordPress" in settled[0]
+    assert "cannot read commit" in settled[3]
+
+
+def test_worker_settles_jobs_whose_publish_raised(repo, publish_jobs):
+    head = get_commit(str(repo), "HEAD")["hash"]
+    parent = get_commit(str(repo), "HEAD~1")["hash"]
+    jobs = [{"id": n, "repo": str(repo), "sha": sha} for n, sha in enumerate((parent, head))]
+
+    def publish_commit(repo_path, commit_info, *args, **kwargs):
+        if commit_info["hash"] == parent:
+            raise ValueError("bad response")
+        return True
+
+    assert publish_jobs(jobs, publish_commit) == (
+        1, {0: "ValueError: bad response", 1: None}
+    )
+
+
+def test_spooled_commits_move_to_the_job_queue(tmp_path, repo, monkeypatch):
+    monkeypatch.setitem(main.CONFIG, "spool_dir", str(tmp_path / "spool"))
+    spool.Spool(str(tmp_path / "spool")).put(str(repo), "a" * 40)
+    with jobqueue.JobQueue(str(tmp_path / "jobs.db")) as queue:
+        assert main.drain_spool(queue) == 1
+        (job,) = queue.claim("w")
+    assert job["payload"] == {"repo": os.path.realpath(str(repo)), "sha": "a" * 40}
+    assert spool.Spool(str(tmp_path / "spool")).pending() == 0
@@ -0,0 +1,83 @@
+"""Startup cost and configuration tests for the CLI."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from git2wp import config
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Importing the CLI (for --help, scan or a git hook) must not pull these in
+HEAVY_MODULES = ("requests", "urllib3", "asyncio", "sqlite3", "dotenv", "git2wp.git2text")
+
+# Budget for git2wp's own import time, excluding click, in milliseconds
+IMPORT_BUDGET_MS = 50
+
+
+def _python(code, tmp_path, *args):
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=PACKAGE_ROOT)
+    for name in ("WORDPRESS_URL", "GIT_BACKEND", "WORDPRESS_TIMEOUT"):
+        env.pop(name, None)
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+
+
+def test_import_is_silent_and_lightweight(tmp_path):
+    env_dir = tmp_path / ".config" / "git2wp"
+    env_dir.mkdir(parents=True)
+    (env_dir / ".env").write_text("WORDPRESS_URL=https://wp.example\nWORDPRESS_PASSWORD=secret\n")
+
+    result = _python(
+        "import json, sys, git2wp.__main__ as m\n"
+        f"print(json.dumps([[n for n in {HEAVY_MODULES!r} if n in sys.modules],"
+        " m.CONFIG['wordpress_url']]))",
+        tmp_path,
+    )
+    loaded, url = json.loads(result.stdout)
+    # dotenv is only imported because this home has a .env file
+    assert loaded == ["dotenv"]
+    assert url == "https://wp.example"
+    assert "secret" not in result.stdout + result.stderr
+
+
+def test_import_time_budget(tmp_path):
+    def own_import_ms():
+        stderr = _python("import git2wp.__main__", tmp_path, "-X", "importtime").stderr
+        cumulative = {}
+        for line in stderr.splitlines():
+            _, us, name = [part.strip() for part in line.split("|")]
+            if us.isdigit():
+                cumulative[name] = int(us)
+        return (cumulative["git2wp.__main__"] - cumulative.get("click", 0)) / 1000
+
+    assert min(own_import_ms() for _ in range(3)) < IMPORT_BUDGET_MS
+
+
+def test_config_is_validated(monkeypatch):
+    monkeypatch.setenv("WORDPRESS_TIMEOUT", "soon")
+    with pytest.raises(config.ConfigError, match="WORDPRESS_TIMEOUT"):
+        config.build_config()
+
+    monkeypatch.setenv("WORDPRESS_TIMEOUT", "1500")
+    monkeypatch.setenv("GIT_BACKEND", "CatFile")
+    built = config.build_config()
+    assert built["wordpress_timeout"] == 1.5
+    assert built["git_backend"] == "catfile"
+
+    monkeypatch.setenv("ENABLE_CACHE", "true")
+    monkeypatch.setenv("OLLAMA_RATE", "2.5")
+    built = config.build_config()
+    assert built["enable_cache"] is True and built["ollama_rate"] == 2.5
+
+    monkeypatch.setenv("GIT_BACKEND", "libgit2")
+    with pytest.raises(config.ConfigError, match="GIT_BACKEND"):
+        config.build_config()
@@ -0,0 +1,46 @@
+"""Tests for streaming generation in OllamaClient."""
+import pytest
+
+from git2wp import config
+from git2wp.git2text import OllamaClient
+from git2wp.health import HealthRegistry
+
+CHUNKS = ["Hello", ", ", "world"]
+
+
+@pytest.fixture
+def server_url(ollama_server):
+    return ollama_server(chunks=CHUNKS, tokens_per_sec=20).url
+
+
+@pytest.fixture
+def client(server_url, monkeypatch):
+    monkeypatch.setitem(config.get_config(), "enable_cache", False)
+    client = OllamaClient()
+    client.servers = [{"url": server_url, "model": "test", "timeout": 0.5, "name": "Test"}]
+    client.health = HealthRegistry()
+    return client
+
+
+def test_streaming_calls_back_per_chunk(client):
+    received = []
+    text = client.generate_text("prompt", on_token=received.append)
+
+    assert received == CHUNKS
+    assert text == "Hello, world"
+    stats = client.last_stats
+    assert stats["time_to_first_token"] is not None
+    assert stats["tokens"] == 3
+    assert stats["tokens_per_sec"] == pytest.approx(20.0)
+
+
+def test_timeout_bounds_inactivity_not_total_duration(ollama_server, client):
+    # Each gap (0.3s) is below the 0.5s timeout, the total (0.9s) is not
+    slow = ollama_server(chunks=CHUNKS, tokens_per_sec=1 / 0.3)
+    client.servers[0]["url"] = slow.url
+    assert "".join(client.iter_text("prompt")) == "Hello, world"
+
+
+def test_non_streaming_still_supported(client):
+    assert client.generate_text("prompt") == "Hello, world"
+    assert client.last_stats["time_to_first_token"] is None
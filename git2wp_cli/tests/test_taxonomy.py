@@ -0,0 +1,53 @@
+"""Tests for the persistent category/tag cache."""
+import time
+
+import pytest
+
+from git2wp import taxonomy
+from git2wp.fakes import FakeWordPress
+from git2wp.taxonomy import TaxonomyCache
+from git2wp.wordpress import WordPressClient
+
+CATEGORIES = ["news", "releases", "python", "git", "uncategorized"]
+
+
+@pytest.fixture
+def wp_server(monkeypatch):
+    # Three pages of two categories each; "uncategorized" is on the last page
+    monkeypatch.setattr(taxonomy, "PER_PAGE", 2)
+    with FakeWordPress(require_auth=False, categories=CATEGORIES) as site:
+        yield site
+
+
+def _etags(site):
+    return [r.headers.get("If-None-Match") for r in site.requests]
+
+
+def test_fetches_all_pages_once_and_answers_from_memory(wp_server, tmp_path):
+    cache = TaxonomyCache(WordPressClient(wp_server.url), str(tmp_path / "tax.json"))
+    assert cache.default_category_id() == 5
+    assert cache.lookup("categories", "git") == 4
+    assert cache.lookup("categories", "missing") is None
+    assert _etags(wp_server) == [None, None, None]
+
+
+def test_revalidates_with_etag_after_ttl(wp_server, tmp_path):
+    path = str(tmp_path / "tax.json")
+    TaxonomyCache(WordPressClient(wp_server.url), path).terms("categories")
+    wp_server.requests.clear()
+
+    # A new process loads the file and only revalidates once the TTL passed
+    cache = TaxonomyCache(WordPressClient(wp_server.url), path, ttl=0.05)
+    assert cache.lookup("categories", "news") == 1
+    assert wp_server.requests == []
+    time.sleep(0.1)
+    assert cache.lookup("categories", "news") == 1
+    assert all(_etags(wp_server)) and len(set(_etags(wp_server))) == 3
+    assert wp_server.statuses[304] == 3
+
+
+def test_serves_stale_terms_when_site_is_down(wp_server):
+    cache = TaxonomyCache(WordPressClient(wp_server.url), ttl=0)
+    cache.terms("categories")
+    cache.client = WordPressClient("http://127.0.0.1:9", retries=0, timeout=1)
+    assert cache.lookup("categories", "python") == 3
@@ -0,0 +1,84 @@
+"""Tests for the opt-in stage tracing."""
+import json
+import threading
+
+import pytest
+
+from git2wp import tracing
+
+
+@pytest.fixture(autouse=True)
+def stop_tracing():
+    yield
+    tracing.stop()
+
+
+def test_spans_are_free_when_tracing_is_off():
+    assert tracing.span("a") is tracing.span("b", sha="x")
+    with tracing.span("a") as sp:
+        sp.set(status=200)
+    assert not tracing.active()
+
+
+def test_spans_become_chrome_trace_events(tmp_path):
+    @tracing.traced("outer")
+    def outer(fail):
+        with tracing.span("inner", sha="abc") as sp:
+            sp.set(status=201)
+        if fail:
+            raise ValueError("boom")
+
+    tracer = tracing.start()
+    outer(False)
+    with pytest.raises(ValueError):
+        outer(True)
+    worker = threading.Thread(target=outer, args=(False,), name="worker")
+    worker.start()
+    worker.join()
+
+    path = tmp_path / "trace.json"
+    tracer.write(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    complete = [e for e in events if e["ph"] == "X"]
+    assert [e["name"] for e in complete].count("outer") == 3
+    inner = next(e for e in complete if e["name"] == "inner")
+    assert inner["args"] == {"sha": "abc", "status": 201}
+    assert [e["args"] for e in complete if e["name"] == "outer"][1] == {"error": "ValueError"}
+    threads = {e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert {"MainThread", "worker"} <= threads
+
+    rows = {row["name"]: row for row in tracer.summary()}
+    assert rows["outer"]["count"] == 3 and rows["inner"]["count"] == 3
+    assert rows["outer"]["total_ms"] >= rows["inner"]["total_ms"]
+    assert "outer" in tracing.format_summary(tracer.summary())
+
+
+def test_memory_tracking_adds_deltas_and_a_counter_track():
+    tracer = tracing.start(memory=True)
+    with tracing.span("allocate"):
+        data = [bytes(1024) for _ in range(512)]
+    tracing.stop()
+    del data
+
+    (event,) = [e for e in tracer.events if e["ph"] == "X"]
+    assert event["args"]["memory_delta_kb"] >= 500
+    assert any(e["ph"] == "C" and e["name"] == "memory" for e in tracer.events)
+    assert "mem KB" in tracing.format_summary(tracer.summary())
+
+
+def test_profile_option_writes_a_trace(tmp_path, repo, monkeypatch):
+    from click.testing import CliRunner
+
+    from git2wp import __main__ as main
+
+    monkeypatch.setitem(main.CONFIG, "data_dir", str(tmp_path))
+    monkeypatch.setattr(main, "generate_llm_summary", lambda *args: ("title", "content"))
+    path = tmp_path / "trace.json"
+    result = CliRunner().invoke(
+        main.cli, ["--profile", str(path), "publish", str(repo), "--dry-run"]
+    )
+    assert result.exit_code == 0, result.output
+    names = {e["name"] for e in json.loads(path.read_text())["traceEvents"]}
+    assert {"git.commit_info", "publish.commit"} <= names
+    assert "publish.commit" in result.output
+    assert not tracing.active()
@@ -0,0 +1,98 @@
+"""Tests for the ref watcher behind ``git2wp watch``."""
+import subprocess
+import threading
+
+import pytest
+
+from git2wp import watcher
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), *args],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _commit(repo, message):
+    (repo / "file.txt").write_text(message)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", message)
+    return subprocess.check_output(["git", "-C", str(repo), "rev-parse", "HEAD"], text=True).strip()
+
+
+@pytest.fixture
+def git_root(tmp_path):
+    repo = tmp_path / "org" / "r1"
+    repo.mkdir(parents=True)
+    _git(repo, "init", "-q")
+    _git(repo, "config", "user.name", "Test User")
+    _git(repo, "config", "user.email", "test@example.com")
+    _commit(repo, "first")
+    return tmp_path
+
+
+def _watch(root, use_inotify):
+    changes = []
+    done = threading.Event()
+
+    def on_change(path, old_head, new_head):
+        changes.append((path, old_head, new_head))
+        done.set()
+
+    ref_watcher = watcher.RefWatcher(
+        str(root), on_change, interval=0.05, debounce=0.3, use_inotify=use_inotify
+    )
+    ref_watcher.rescan()
+    thread = threading.Thread(target=ref_watcher.run, daemon=True)
+    thread.start()
+    return ref_watcher, thread, changes, done
+
+
+def _inotify_available():
+    try:
+        watcher.Inotify().close()
+        return True
+    except OSError:
+        return False
+
+
+@pytest.mark.parametrize(
+    "use_inotify",
+    [
+        False,
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(not _inotify_available(), reason="no inotify"),
+        ),
+    ],
+)
+def test_burst_of_commits_is_debounced_into_one_change(git_root, use_inotify):
+    repo = git_root / "org" / "r1"
+    ref_watcher, thread, changes, done = _watch(git_root, use_inotify)
+    assert ref_watcher.backend == ("inotify" if use_inotify else "polling")
+    old_head = ref_watcher.repositories[str(repo)]["head"]
+    try:
+        for n in range(3):
+            new_head = _commit(repo, f"change {n}")
+        assert done.wait(5)
+    finally:
+        ref_watcher.stop()
+        thread.join(5)
+
+    assert changes == [(str(repo), old_head, new_head)]
+
+
+def test_new_repositories_are_picked_up(git_root):
+    ref_watcher = watcher.RefWatcher(str(git_root), lambda *args: None, use_inotify=False)
+    ref_watcher.rescan()
+    assert len(ref_watcher.repositories) == 1
+
+    repo = git_root / "org" / "r2"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    ref_watcher.rescan()
+    ref_watcher.stop()
+    assert str(repo) in ref_watcher.repositories
@@ -0,0 +1,142 @@
+"""Tests for the pooled, retrying WordPress client."""
+import time
+
+import pytest
+
+from git2wp import wordpress
+from git2wp.fakes import FakeWordPress
+
+
+@pytest.fixture
+def wp_server():
+    with FakeWordPress(require_auth=False) as site:
+        yield site
+
+
+def test_reuses_connection_and_sends_auth(wp_server):
+    client = wordpress.WordPressClient(wp_server.url, "admin", "secret", backoff=0)
+    for _ in range(3):
+        assert client.current_user().status_code == 200
+    assert client.create_post({"title": "t"}).status_code == 201
+
+    ports = {r.client[1] for r in wp_server.requests}
+    assert len(ports) == 1
+    auth = {r.headers["Authorization"].split()[0] for r in wp_server.requests}
+    assert auth == {"Basic"}
+    assert wp_server.requests[-1][:2] == ("POST", "/wp-json/wp/v2/posts")
+
+
+def test_retries_server_errors(wp_server):
+    wp_server.respond_next(503)
+    wp_server.respond_next(502)
+    client = wordpress.WordPressClient(wp_server.url, token="t", retries=2, backoff=0)
+    response = client.current_user()
+    assert response.status_code == 200
+    assert len(wp_server.requests) == 3
+    assert wp_server.requests[0].headers["Authorization"] == "Bearer t"
+
+
+def test_posts_are_not_resent_after_server_errors(wp_server):
+    wp_server.respond_next(502)
+    client = wordpress.WordPressClient(wp_server.url, retries=2, backoff=0)
+    assert client.create_post({"title": "t"}).status_code == 502
+    assert len(wp_server.requests) == 1
+    assert wp_server.posts == {}
+
+
+def test_post_read_timeout_is_not_resent():
+    with FakeWordPress(latency=0.3) as site:
+        client = wordpress.WordPressClient(site.url, "u", "p", retries=2, backoff=0, timeout=0.1)
+        with pytest.raises(wordpress.WordPressError, match="timed out"):
+            client.create_post({"title": "t"})
+        assert len(site.requests) == 1
+
+
+def test_post_is_not_resent_after_the_connection_drops(wp_server):
+    wp_server.disconnect_next()
+    client = wordpress.WordPressClient(wp_server.url, retries=2, backoff=0)
+    with pytest.raises(wordpress.WordPressError, match="after sending"):
+        client.create_post({"title": "t"})
+    assert len(wp_server.requests) == 1
+
+    # Reads are safe to resend
+    wp_server.disconnect_next()
+    assert client.current_user().status_code == 200
+    assert len(wp_server.requests) == 3
+
+
+def test_post_is_retried_when_the_connection_is_refused(monkeypatch):
+    client = wordpress.WordPressClient("http://127.0.0.1:9", retries=2, backoff=0, timeout=1)
+    attempts = []
+    send = client.session.request
+    monkeypatch.setattr(
+        client.session, "request", lambda *a, **kw: attempts.append(1) or send(*a, **kw)
+    )
+    with pytest.raises(wordpress.WordPressError, match="failed:"):
+        client.create_post({"title": "t"})
+    assert len(attempts) == 3
+
+
+def test_throttling_waits_for_retry_after(wp_server):
+    wp_server.respond_next(429, headers={"Retry-After": "0.3"})
+    client = wordpress.WordPressClient(wp_server.url, retries=0, backoff=0)
+    start = time.monotonic()
+    assert client.create_post({"title": "t"}).status_code == 201
+    assert time.monotonic() - start >= 0.3
+    assert len(wp_server.requests) == 2
+    assert client.limiter.snapshot()["throttled"] == 1
+
+
+def test_returns_last_server_error_and_does_not_retry_client_errors(wp_server):
+    wp_server.respond_next(500)
+    wp_server.respond_next(500)
+    client = wordpress.WordPressClient(wp_server.url, retries=1, backoff=0)
+    assert client.get("/wp/v2/posts").status_code == 500
+    assert client.get("/wp/v2/posts/999").status_code == 404
+    assert len(wp_server.requests) == 3
+
+
+def test_connection_errors_raise_after_retries():
+    client = wordpress.WordPressClient("http://127.0.0.1:9", retries=1, backoff=0, timeout=1)
+    with pytest.raises(wordpress.WordPressError):
+        client.get("/")
+
+
+def test_get_client_is_shared():
+    first = wordpress.get_client("http://wp.example/", "u", "p")
+    assert wordpress.get_client("http://wp.example", "u", "p") is first
+    assert wordpress.get_client("http://wp.example", "u", "other") is not first
+
+
+def _operations(count):
+    # The fourth operation updates a post that does not exist
+    return [
+        {
+            "path": "/wp/v2/posts/999" if i == 3 else "/wp/v2/posts",
+            "body": {"title": f"post {i}"},
+        }
+        for i in range(count)
+    ]
+
+
+def test_batch_groups_operations_and_maps_results(wp_server):
+    client = wordpress.WordPressClient(wp_server.url, backoff=0)
+    results = client.batch(_operations(30))
+
+    assert [r.path for r in wp_server.requests] == ["/wp-json/batch/v1"] * 2
+    assert [r["status"] for r in results].count(201) == 29
+    assert results[3]["status"] == 404
+    assert results[29]["body"]["title"]["raw"] == "post 29"
+    assert client.supports_batch is True
+
+
+def test_batch_falls_back_to_single_requests(wp_server):
+    wp_server.batch_supported = False
+    client = wordpress.WordPressClient(wp_server.url, backoff=0)
+    results = client.batch(_operations(5))
+    assert client.supports_batch is False
+    assert [r["status"] for r in results] == [201, 201, 201, 404, 201]
+    assert len(wp_server.requests) == 6
+
+    client.batch(_operations(2))
+    assert "/wp-json/batch/v1" not in [r.path for r in wp_server.requests[6:]]
@@ -7,8 +7,126 @@ import socket
 import logging
 import signal
 import json
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Prometheus text exposition format
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def metrics_db_path() -> str:
+    """Where the git2wp CLI and workers write their metrics (git2wp/metrics.py)."""
+    if os.getenv('GIT2WP_METRICS_DB'):
+        return os.path.expanduser(os.environ['GIT2WP_METRICS_DB'])
+    data_dir = os.getenv('GIT2WP_DATA_DIR', str(Path.home() / '.config' / 'git2wp'))
+    return os.path.join(os.path.expanduser(data_dir), 'metrics.db')
+
+
+# format_value and render_families mirror git2wp.metrics._format_value and
+# render, so this server runs without git2wp installed; tests/test_metrics.py
+# checks that both produce the same output
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_families(families, samples) -> List[str]:
+    """Render (family, type, help) and (family, name, labels, le, value) rows."""
+    by_family: Dict[str, list] = {}
+    for family, name, labels, le, value in samples:
+        by_family.setdefault(family, []).append((name, labels, le, value))
+    lines = []
+    for family, kind, help_text in sorted(families):
+        rows = by_family.get(family)
+        if not rows:
+            continue
+        rows.sort(key=lambda r: (r[1], r[0], float(r[2]) if r[2] else 0.0))
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        for name, labels, le, value in rows:
+            if le:
+                labels = f'{labels},le="{le}"' if labels else f'le="{le}"'
+            series = f'{name}{{{labels}}}' if labels else name
+            lines.append(f'{series} {format_value(value)}')
+    return lines
+
+
+def read_pipeline_metrics(db_path: str) -> List[str]:
+    """Render the metrics stored by git2wp; nothing when it has not run yet."""
+    if not os.path.exists(db_path):
+        return []
+    # Read-only: WAL lets this run while workers are flushing their counters
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=2)
+    try:
+        families = conn.execute('SELECT family, type, help FROM families').fetchall()
+        samples = conn.execute(
+            'SELECT family, name, labels, le, value FROM samples'
+        ).fetchall()
+    finally:
+        conn.close()
+    return render_families(families, samples)
+
+
+class ServerMetrics:
+    """Request counts and latency histograms of this server."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.durations: Dict[Tuple[str, str], List[float]] = {}
+
+    def record(self, method: str, route: str, code: int, duration: float):
+        with self.lock:
+            key = (method, route, code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            # Bucket counts, then the sum and the count
+            stats = self.durations.setdefault(
+                (method, route), [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            )
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    stats[i] += 1
+            stats[-2] += duration
+            stats[-1] += 1
+
+    def render(self, uptime: float) -> List[str]:
+        with self.lock:
+            requests = sorted(self.requests.items())
+            durations = sorted((k, list(v)) for k, v in self.durations.items())
+        lines = [
+            '# HELP http_requests_total HTTP requests served, by method, route and status code',
+            '# TYPE http_requests_total counter',
+        ]
+        for (method, route, code), count in requests:
+            lines.append(
+                f'http_requests_total{{code="{code}",method="{method}",route="{route}"}} {count}'
+            )
+        lines += [
+            '# HELP http_request_duration_seconds Time spent serving HTTP requests',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, route), stats in durations:
+            labels = f'method="{method}",route="{route}"'
+            for bound, count in zip(LATENCY_BUCKETS, stats):
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{format_value(bound)}"}} {count}'
+                )
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats[-1]}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats[-1]}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {format_value(stats[-2])}')
+        lines += [
+            '# HELP process_uptime_seconds Seconds since the server started',
+            '# TYPE process_uptime_seconds gauge',
+            f'process_uptime_seconds {format_value(round(uptime, 3))}',
+        ]
+        return lines
+
 
 def is_port_in_use(port: int) -> bool:
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -17,8 +135,22 @@ def is_port_in_use(port: int) -> bool:
 class EnhancedHandler(SimpleHTTPRequestHandler):
     def __init__(self, *args, **kwargs):
         self.logger = logging.getLogger('EnhancedServer')
+        self.status_code = None
         super().__init__(*args, **kwargs)
 
+    def route(self) -> str:
+        # Static files share one label so scrapes stay small
+        path = self.path.split('?', 1)[0]
+        return path if path in ('/health', '/metrics') else 'static'
+
+    def send_response(self, code, message=None):
+        self.status_code = code
+        super().send_response(code, message)
+
+    def send_error(self, code, message=None, explain=None):
+        self.status_code = code
+        super().send_error(code, message, explain)
+
     def handle_one_request(self):
         try:
             return super().handle_one_request()
@@ -38,7 +170,40 @@ class EnhancedHandler(SimpleHTTPRequestHandler):
             format % args
         )
 
+    def observe(self, serve):
+        started = time.perf_counter()
+        self.status_code = None
+        try:
+            return serve()
+        finally:
+            if self.status_code is not None:
+                self.server.metrics.record(
+                    self.command, self.route(), self.status_code,
+                    time.perf_counter() - started
+                )
+
     def do_GET(self):
+        return self.observe(self.serve_get)
+
+    def do_HEAD(self):
+        return self.observe(super().do_HEAD)
+
+    def serve_metrics(self):
+        lines = self.server.metrics.render(self.server.get_uptime())
+        try:
+            lines += read_pipeline_metrics(self.server.metrics_db)
+        except sqlite3.Error as e:
+            self.logger.warning(f'Cannot read pipeline metrics: {e}')
+        body = ('\n'.join(lines) + '\n').encode()
+        self.send_response(200)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_get(self):
+        if self.route() == '/metrics':
+            return self.serve_metrics()
         if self.path == '/health':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -53,8 +218,10 @@ class EnhancedHandler(SimpleHTTPRequestHandler):
         return super().do_GET()
 
 class EnhancedHTTPServer(socketserver.TCPServer):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, metrics_db: Optional[str] = None, **kwargs):
         self.start_time = datetime.now()
+        self.metrics = ServerMetrics()
+        self.metrics_db = metrics_db or metrics_db_path()
         super().__init__(*args, **kwargs)
 
     def get_uptime(self):
@@ -111,6 +278,7 @@ def run(port=8000, directory=None, log_file=None):
 
         logger.info(f'🚀 Server running on port {port}')
         logger.info(f'🏥 Health check available at: http://localhost:{port}/health')
+        logger.info(f'📈 Metrics available at: http://localhost:{port}/metrics')
         httpd.serve_forever()
     except Exception as e:
         logger.error(f'Server error: {str(e)}')